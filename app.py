@@ -3,6 +3,7 @@ import pandas as pd
 from pathlib import Path
 import sys
 import base64
+from itertools import chain
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
@@ -13,8 +14,22 @@ import numpy as np
 project_root = Path(__file__).parent
 sys.path.append(str(project_root))
 
-from utils.excel_processor import process_excel_file
-from utils.nlp_utils import process_query
+from utils.excel_processor import read_excel_preview, start_workbook_ingest, inspect_workbook
+from utils.sampling import is_approximate, population_size, estimate_mean, estimate_total
+from utils.upload_spool import spool_upload
+from utils.profiling import get_profile, suggest_bin_count
+from utils.heavy_hitters import column_top_values, group_long_tail
+from utils.aggregate_cube import get_cube
+from utils.correlation import strongest_relationships, describe_strength
+from utils.cleaning import plan_cleaning
+from utils.row_hash import get_row_index, find_cross_duplicates
+from utils.near_duplicates import near_duplicate_clusters
+from utils.outliers import get_outliers
+from utils.result_cache import memoize, cache_stats, fingerprint_frame
+from utils.response_cache import response_cache_stats
+from utils.export import FORMATS, cached_export, export_frame
+from utils.nlp_utils import stream_query
+from utils.chatgpt_utils import process_visualization_request
 from utils.visualization import create_visualization
 from resources.az_language import get_az_translations
 from config.settings import get_settings
@@ -761,6 +776,16 @@ if 'show_general_overview' not in st.session_state:
     st.session_state.show_general_overview = False
 if 'show_cleaned_data' not in st.session_state:
     st.session_state.show_cleaned_data = False
+if 'sheets' not in st.session_state:
+    st.session_state.sheets = {}
+if 'active_sheet' not in st.session_state:
+    st.session_state.active_sheet = None
+if 'ingest_job' not in st.session_state:
+    st.session_state.ingest_job = None
+if 'exact_statistics' not in st.session_state:
+    st.session_state.exact_statistics = settings["file"]["exact_statistics"]
+if 'isolation_forest' not in st.session_state:
+    st.session_state.isolation_forest = settings["cleaning"]["outlier_isolation_forest"]
 
 def create_upload_area():
     """Create a styled upload area with drag and drop functionality."""
@@ -784,7 +809,9 @@ def add_to_history(file_name, timestamp):
         'file_name': file_name,
         'timestamp': timestamp,
         'chat_history': [],
-        'df': st.session_state.df  # Store the DataFrame in history
+        'df': st.session_state.df,  # Store the DataFrame in history
+        'sheets': st.session_state.sheets,
+        'active_sheet': st.session_state.active_sheet
     }
     st.session_state.upload_history.append(history_item)
     st.session_state.selected_history = history_item
@@ -794,6 +821,8 @@ def load_history_item(history_item):
     st.session_state.selected_history = history_item
     st.session_state.chat_history = history_item['chat_history']
     st.session_state.df = history_item['df']  # Load the DataFrame from history
+    st.session_state.sheets = history_item.get('sheets', {})
+    st.session_state.active_sheet = history_item.get('active_sheet')
     st.session_state.show_chat = True
 
 def create_history_slider():
@@ -872,6 +901,9 @@ def create_sidebar_content():
     if st.button("🆕 Yeni Söhbət", key="new_chat", use_container_width=True):
         st.session_state.show_chat = False
         st.session_state.df = None
+        st.session_state.sheets = {}
+        st.session_state.active_sheet = None
+        st.session_state.ingest_job = None
         st.session_state.chat_history = []
         st.rerun()
     
@@ -906,9 +938,33 @@ def create_sidebar_content():
         st.session_state.selected_history = None
         st.session_state.chat_history = []
         st.session_state.df = None
+        st.session_state.sheets = {}
+        st.session_state.active_sheet = None
+        st.session_state.ingest_job = None
         st.session_state.show_chat = False
         st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
+    
+    # Distinct counts and quantiles of large sheets come from sketches unless exact mode is on
+    st.toggle(
+        "🎯 Dəqiq statistika",
+        key="exact_statistics",
+        help="Böyük cədvəllərdə unikal dəyər sayı və kvantillər təxmini eskizlər əvəzinə dəqiq hesablanır (daha yavaş)."
+    )
+    
+    # Reuse of cached statistics, cleaned data, charts and exports across reruns
+    stats = cache_stats()
+    st.caption(
+        f"⚡ Keş: {stats['hits']:,} tapıldı / {stats['misses']:,} tapılmadı "
+        f"({stats['hit_rate']:.0%}), {stats['entries']} nəticə, {stats['memory'] / (1024 * 1024):,.1f} MB"
+    )
+
+    # Answers to repeated questions come from the on-disk response cache
+    responses = response_cache_stats()
+    st.caption(
+        f"💬 Cavab keşi: {responses['hits']:,} tapıldı / {responses['misses']:,} tapılmadı "
+        f"({responses['hit_rate']:.0%}), {responses['entries']:,} cavab"
+    )
 
 def create_header():
     """Create the header with logo and app name."""
@@ -941,11 +997,12 @@ def display_data_preview(df):
         """, unsafe_allow_html=True)
         
         # Basic statistics
+        profile = get_profile(df, exact=st.session_state.exact_statistics)
         stats_data = {
-            "Sətir sayı": len(df),
+            "Sətir sayı": population_size(df),
             "Sütun sayı": len(df.columns),
-            "Boş dəyərlər": df.isnull().sum().sum(),
-            "Unikal dəyərlər": df.nunique().sum()
+            "Boş dəyərlər": profile.total_nulls,
+            "Unikal dəyərlər": profile.total_distinct
         }
         
         for stat_name, stat_value in stats_data.items():
@@ -959,14 +1016,62 @@ def display_data_preview(df):
         """, unsafe_allow_html=True)
         
         for col in df.columns:
-            col_type = str(df[col].dtype)
-            unique_vals = df[col].nunique()
+            col_type = profile[col]["dtype"]
+            unique_vals = f"{'≈ ' if profile.approximate else ''}{profile[col]['distinct']}"
             st.markdown(f"""
                 <div class='column-info'>
                     <strong>{col}</strong><br>
                     <small>Tip: {col_type} | Unikal: {unique_vals}</small>
                 </div>
             """, unsafe_allow_html=True)
+        
+        # Memory saved by storing columns in compact dtypes
+        memory_report = df.attrs.get("memory_report")
+        if memory_report:
+            saved_total = sum(item["bytes_saved"] for item in memory_report.values())
+            with st.expander(f"💾 Yaddaş qənaəti: {saved_total / 1024:,.1f} KB"):
+                st.dataframe(
+                    pd.DataFrame.from_dict(memory_report, orient="index"),
+                    use_container_width=True
+                )
+
+        # Cells that did not fit the detected number or date format were turned into blanks
+        column_types = df.attrs.get("column_types", {})
+        coerced = {column: info for column, info in column_types.items() if info.get("invalid")}
+        if coerced:
+            total_coerced = sum(info["invalid"] for info in coerced.values())
+            with st.expander(f"⚠️ Çevrilə bilməyən dəyərlər: {total_coerced:,}"):
+                st.caption("Bu xanalar sütunun tipinə uyğun gəlmədi və boş dəyər kimi saxlanıldı.")
+                st.dataframe(
+                    pd.DataFrame({
+                        "Sütun": list(coerced),
+                        "Tip": [info["type"] for info in coerced.values()],
+                        "Boş qalan dəyərlər": [info["invalid"] for info in coerced.values()]
+                    }),
+                    use_container_width=True,
+                    hide_index=True
+                )
+
+        # Rows of this upload that were already present in earlier uploads; samples
+        # of a pending ingest are skipped, since their rows stand for others
+        history = st.session_state.upload_history
+        selected = st.session_state.selected_history
+        position = next((idx for idx, item in enumerate(history) if item is selected), len(history))
+        earlier = [item for item in history[:position]
+                   if item.get('df') is not None and not is_approximate(item['df'])]
+        if earlier and not is_approximate(df):
+            counts = count_repeated_rows(df, *[item['df'] for item in earlier])
+            if len(counts):
+                with st.expander(f"🔁 Əvvəlki yükləmələrdə olan sətirlər: {counts.sum():,}"):
+                    st.dataframe(
+                        pd.DataFrame({
+                            "Fayl": [earlier[source]['file_name'] for source in counts.index],
+                            "Yükləmə vaxtı": [earlier[source]['timestamp'].strftime('%Y-%m-%d %H:%M') for source in counts.index],
+                            "Eyni sətirlər": counts.to_numpy()
+                        }),
+                        use_container_width=True,
+                        hide_index=True
+                    )
     
     with col2:
         # Display data preview
@@ -980,13 +1085,37 @@ def display_data_preview(df):
         st.dataframe(df.head(), use_container_width=True)
         
         # Add download button for the full data
-        csv = df.to_csv(index=False).encode('utf-8')
+        offer_download(df, "📥 Tam Məlumatı Yüklə", "data", 'download-csv')
+
+def offer_download(df, label, file_stem, key):
+    """Offer a download in a chosen format whose file is written only once the user asks for it."""
+    extension = st.selectbox(
+        "Fayl formatı",
+        settings["file"]["export_formats"],
+        format_func=lambda extension: FORMATS[extension][0],
+        key=f"format-{key}"
+    )
+    format_label, mime_type = FORMATS[extension]
+    # The download button loads the whole file into memory, so it only appears in the run
+    # where the file was asked for; later reruns show this button again, reusing the written file
+    if not st.button(f"📦 {format_label} faylını hazırla", key=f"prepare-{key}"):
+        return
+    path = cached_export(df, extension)
+    if path is None:
+        with st.spinner(f"{format_label} faylı hazırlanır..."):
+            try:
+                path = export_frame(df, extension)
+            except ValueError as e:
+                st.error(str(e))
+                return
+
+    with open(path, "rb") as handle:
         st.download_button(
-            "📥 Tam Məlumatı Yüklə",
-            csv,
-            "data.csv",
-            "text/csv",
-            key='download-csv'
+            label,
+            handle,
+            f"{file_stem}.{extension}",
+            mime_type,
+            key=key
         )
 
 def display_general_overview(df):
@@ -1004,13 +1133,18 @@ def display_general_overview(df):
         </div>
     """, unsafe_allow_html=True)
     
+    approximate = is_approximate(df)
+    profile = get_profile(df, exact=st.session_state.exact_statistics)
+    # Distinct counts and medians are estimates for samples and sketched sheets
+    prefix = "≈ " if approximate or profile.approximate else ""
+    
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Sətir sayı", f"{len(df):,}")
+        st.metric("Sətir sayı", f"{population_size(df):,}")
     with col2:
         st.metric("Sütun sayı", f"{len(df.columns):,}")
     with col3:
-        st.metric("Unikal kurslar", f"{df['Course Name'].nunique():,}")
+        st.metric("Unikal kurslar", f"{prefix}{profile['Course Name']['distinct']:,}")
     
     # Column Information
     st.markdown("""
@@ -1025,8 +1159,8 @@ def display_general_overview(df):
             st.markdown(f"""
                 <div class='column-box'>
                     <h5>{col}</h5>
-                    <p>Tip: {df[col].dtype}</p>
-                    <p>Unikal: {df[col].nunique():,}</p>
+                    <p>Tip: {profile[col]['dtype']}</p>
+                    <p>Unikal: {prefix}{profile[col]['distinct']:,}</p>
                 </div>
             """, unsafe_allow_html=True)
     
@@ -1037,27 +1171,33 @@ def display_general_overview(df):
         </div>
     """, unsafe_allow_html=True)
     
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    for col in numeric_cols:
+    for col in profile.numeric_columns():
+        column_stats = profile[col]
+        # A sample gives the mean with its 95% error bound
+        if approximate:
+            estimate = estimate_mean(df[col], population_size(df))
+            mean_text = f"≈ {estimate['mean']:,.0f} ± {estimate['error']:,.0f}"
+        else:
+            mean_text = f"{column_stats['mean']:,.0f}"
         st.markdown(f"""
             <div class='stats-box'>
                 <h5>{col}</h5>
                 <div class='stats-grid'>
                     <div class='stat-item'>
                         <span class='stat-label'>Minimum</span>
-                        <span class='stat-value'>{df[col].min():,.0f}</span>
+                        <span class='stat-value'>{column_stats['min']:,.0f}</span>
                     </div>
                     <div class='stat-item'>
                         <span class='stat-label'>Maksimum</span>
-                        <span class='stat-value'>{df[col].max():,.0f}</span>
+                        <span class='stat-value'>{column_stats['max']:,.0f}</span>
                     </div>
                     <div class='stat-item'>
                         <span class='stat-label'>Ortalama</span>
-                        <span class='stat-value'>{df[col].mean():,.0f}</span>
+                        <span class='stat-value'>{mean_text}</span>
                     </div>
                     <div class='stat-item'>
                         <span class='stat-label'>Median</span>
-                        <span class='stat-value'>{df[col].median():,.0f}</span>
+                        <span class='stat-value'>{prefix}{column_stats['median']:,.0f}</span>
                     </div>
                 </div>
             </div>
@@ -1070,17 +1210,18 @@ def display_general_overview(df):
         </div>
     """, unsafe_allow_html=True)
     
-    # Calculate key insights
-    top_enrollment = df.loc[df['Enrollments'].idxmax()]
-    top_active = df.loc[df['Active Enrollments'].idxmax()]
-    top_completion = df.loc[df['Completions'].idxmax()]
-    
-    insights = [
-        f"🎓 Ən çox qeydiyyat: {top_enrollment['Course Name']} ({top_enrollment['Enrollments']:,} tələbə)",
-        f"👥 Ən çox aktiv tələbə: {top_active['Course Name']} ({top_active['Active Enrollments']:,} tələbə)",
-        f"✅ Ən yüksək tamamlama: {top_completion['Course Name']} ({top_completion['Completions']:,} tələbə)",
-        f"📚 Ən populyar sahə: {df['Course Domain'].value_counts().index[0]} ({df['Course Domain'].value_counts().iloc[0]:,} kurs)"
-    ]
+    # Calculate key insights; columns without any value are left out
+    insights = []
+    for column, title in (('Enrollments', "🎓 Ən çox qeydiyyat"),
+                          ('Active Enrollments', "👥 Ən çox aktiv tələbə"),
+                          ('Completions', "✅ Ən yüksək tamamlama")):
+        if profile[column].get('max_index') is not None:
+            top_row = df.loc[profile[column]['max_index']]
+            insights.append(f"{title}: {top_row['Course Name']} ({top_row[column]:,} tələbə)")
+    top_domain = profile.most_frequent('Course Domain')
+    if top_domain is not None:
+        domain, domain_count = top_domain
+        insights.append(f"📚 Ən populyar sahə: {domain} ({domain_count:,} kurs)")
     
     for insight in insights:
         st.markdown(f"""
@@ -1099,7 +1240,7 @@ def get_general_overview_prompt(df):
 5. Məlumatların potensial istifadə sahələri
 
 Məlumatlar:
-- {len(df)} sətir
+- {population_size(df)} sətir{" (təxmini, məlumatlar hələ yüklənir)" if is_approximate(df) else ""}
 - {len(df.columns)} sütun
 - Sütunlar: {', '.join(df.columns)}
 """
@@ -1113,7 +1254,7 @@ def get_visualization_prompt(df):
 4. Hansı vizualizasiyalar ən çox insight verəcək?
 
 Məlumatlar:
-- {len(df)} sətir
+- {population_size(df)} sətir{" (təxmini, məlumatlar hələ yüklənir)" if is_approximate(df) else ""}
 - {len(df.columns)} sütun
 - Sütunlar və tipləri:
 {chr(10).join([f'- {col}: {df[col].dtype}' for col in df.columns])}
@@ -1121,6 +1262,8 @@ Məlumatlar:
 
 def get_cleaned_data_prompt(df):
     """Generate prompt for data cleaning suggestions."""
+    outlier_lines = get_outliers(df).summary_lines()
+    outlier_info = "\n".join(f"  - {line}" for line in outlier_lines) or "  - tapılmadı"
     return f"""Bu məlumatları təmizləmək üçün təkliflər ver. Aşağıdakı məqamları əhatə et:
 1. Boş dəyərlərin analizi və həlli
 2. Təkrarlanan məlumatların aşkarlanması
@@ -1129,11 +1272,31 @@ def get_cleaned_data_prompt(df):
 5. Məlumatların strukturunun yaxşılaşdırılması
 
 Məlumatlar:
-- {len(df)} sətir
+- {population_size(df)} sətir{" (təxmini, məlumatlar hələ yüklənir)" if is_approximate(df) else ""}
 - {len(df.columns)} sütun
 - Sütunlar: {', '.join(df.columns)}
+- Anomal dəyərlər (IQR / MAD qaydası üzrə say):
+{outlier_info}
 """
 
+@memoize
+def count_repeated_rows(df, *earlier):
+    """Count the rows of df that first occurred in each earlier frame, by position in `earlier`."""
+    repeated = find_cross_duplicates([*earlier, df])
+    return repeated.loc[repeated["source"] == len(earlier), "first_source"].value_counts()
+
+def format_column_total(df, column):
+    """Format a column sum, estimated with its 95% error bound when df is a sample."""
+    if not is_approximate(df):
+        return f"{df[column].sum():,}"
+    estimate = estimate_total(df[column], population_size(df))
+    return f"≈ {estimate['total']:,.0f} ± {estimate['error']:,.0f}"
+
+@memoize
+def add_completion_rate(df):
+    """Return the dataset with a 'Tamamlama Faizi' column (completions per enrollment, %), leaving df untouched."""
+    return df.assign(**{'Tamamlama Faizi': (df['Completions'] / df['Enrollments'] * 100).round(2)})
+
 def create_visualizations(df):
     """Create and display multiple visualizations for the data in a dashboard layout."""
     # Create a container for visualizations
@@ -1147,16 +1310,30 @@ def create_visualizations(df):
         """, unsafe_allow_html=True)
         
         try:
-            # Calculate all necessary statistics upfront
-            domain_stats = df.groupby('Course Domain').agg({
-                'Enrollments': 'sum',
-                'Active Enrollments': 'sum',
-                'Completions': 'sum'
-            }).reset_index()
+            # Calculate all necessary statistics upfront; domains outside the most
+            # frequent ones are summed into a single "Digər" group
+            domain_measures = ['Enrollments', 'Active Enrollments', 'Completions']
+            cube = get_cube(df)
+            if 'Course Domain' in cube:
+                domain_stats = cube.breakdown(
+                    'Course Domain', domain_measures, stats=("sum",),
+                    top_k=settings["visualization"]["top_k"]
+                ).drop(columns='rows')
+            else:
+                top_domains = [value for value, _ in column_top_values(df, 'Course Domain')["values"]]
+                domains = group_long_tail(df['Course Domain'], top_domains)
+                domain_stats = df.groupby(domains, observed=True)[domain_measures].sum().reset_index()
             
             # Calculate completion rates safely
             domain_stats['Tamamlama Faizi'] = (domain_stats['Completions'] / domain_stats['Enrollments'] * 100).round(2)
-            df['Tamamlama Faizi'] = (df['Completions'] / df['Enrollments'] * 100).round(2)
+            # A derived frame, since the uploaded one is shared and fingerprinted; memoized so
+            # reruns get the same object and its profile is computed once
+            df = add_completion_rate(df)
+            
+            # Scale sample sums up to the rows they stand for
+            if is_approximate(df):
+                scale = population_size(df) / len(df)
+                domain_stats[['Enrollments', 'Active Enrollments', 'Completions']] *= scale
             
             # Sort by enrollments
             domain_stats = domain_stats.sort_values('Enrollments', ascending=False)
@@ -1171,11 +1348,11 @@ def create_visualizations(df):
             # Key metrics in a row
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Ümumi Qeydiyyat", f"{df['Enrollments'].sum():,}")
+                st.metric("Ümumi Qeydiyyat", format_column_total(df, 'Enrollments'))
             with col2:
-                st.metric("Aktiv Tələbələr", f"{df['Active Enrollments'].sum():,}")
+                st.metric("Aktiv Tələbələr", format_column_total(df, 'Active Enrollments'))
             with col3:
-                st.metric("Tamamlanan Kurslar", f"{df['Completions'].sum():,}")
+                st.metric("Tamamlanan Kurslar", format_column_total(df, 'Completions'))
             with col4:
                 avg_completion = (df['Completions'].sum() / df['Enrollments'].sum() * 100).round(1)
                 st.metric("Orta Tamamlama Faizi", f"{avg_completion}%")
@@ -1313,7 +1490,7 @@ def create_visualizations(df):
                 fig_enroll_hist = px.histogram(
                     df,
                     x='Enrollments',
-                    nbins=20,
+                    nbins=suggest_bin_count(df, 'Enrollments', exact=st.session_state.exact_statistics),
                     title='Qeydiyyatların Paylanması',
                     color_discrete_sequence=['#1E88E5']
                 )
@@ -1331,7 +1508,7 @@ def create_visualizations(df):
                 fig_comp_hist = px.histogram(
                     df,
                     x='Tamamlama Faizi',
-                    nbins=20,
+                    nbins=suggest_bin_count(df, 'Tamamlama Faizi', exact=st.session_state.exact_statistics),
                     title='Tamamlama Faizinin Paylanması',
                     color_discrete_sequence=['#4CAF50']
                 )
@@ -1383,50 +1560,31 @@ def create_visualizations(df):
             
             st.plotly_chart(fig_scatter, use_container_width=True)
             
+            # Strongest pairwise relationships across all numeric columns
+            relationships = strongest_relationships(df, top_n=5)
+            if relationships:
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            'Sütun 1': pair['x'],
+                            'Sütun 2': pair['y'],
+                            'Korrelyasiya (r)': round(pair['r'], 3),
+                            'Əlaqə': describe_strength(pair['r'])
+                        }
+                        for pair in relationships
+                    ]),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            
         except Exception as e:
             st.error(f"Vizualizasiya yaradılarkən xəta baş verdi: {str(e)}")
 
-def clean_dataset(df):
+@memoize
+def clean_dataset(df, merge_clusters=None):
     """Clean the dataset and return both cleaned dataframe and cleaning steps."""
-    cleaning_steps = []
-    df_cleaned = df.copy()
-    
-    # 1. Handle missing values
-    missing_before = df_cleaned.isnull().sum().sum()
-    df_cleaned = df_cleaned.fillna({
-        'Enrollments': 0,
-        'Active Enrollments': 0,
-        'Completions': 0,
-        'Course Domain': 'Digər',
-        'Course Name': 'Adı Məlum Değil'
-    })
-    missing_after = df_cleaned.isnull().sum().sum()
-    if missing_before > 0:
-        cleaning_steps.append(f"✅ {missing_before} boş dəyər dolduruldu")
-    
-    # 2. Remove duplicates
-    duplicates_before = df_cleaned.duplicated().sum()
-    df_cleaned = df_cleaned.drop_duplicates()
-    duplicates_after = df_cleaned.duplicated().sum()
-    if duplicates_before > 0:
-        cleaning_steps.append(f"✅ {duplicates_before} təkrarlanan qeyd silindi")
-    
-    # 3. Format Course Names
-    df_cleaned['Course Name'] = df_cleaned['Course Name'].str.strip()
-    df_cleaned['Course Domain'] = df_cleaned['Course Domain'].str.strip()
-    
-    # 4. Calculate and add Completion Rate
-    df_cleaned['Tamamlama Faizi'] = (df_cleaned['Completions'] / df_cleaned['Enrollments'] * 100).round(2)
-    cleaning_steps.append("✅ Tamamlama faizi hesablandı")
-    
-    # 5. Round numeric columns
-    numeric_cols = ['Enrollments', 'Active Enrollments', 'Completions']
-    df_cleaned[numeric_cols] = df_cleaned[numeric_cols].round(0)
-    cleaning_steps.append("✅ Rəqəmsal dəyərlər yuvarlaqlaşdırıldı")
-    
-    # 6. Sort by enrollments
-    df_cleaned = df_cleaned.sort_values('Enrollments', ascending=False)
-    cleaning_steps.append("✅ Məlumatlar qeydiyyat sayına görə sıralandı")
+    df_cleaned, report = plan_cleaning(df, merge_clusters=merge_clusters).run(df)
+    cleaning_steps = [step["message"] for step in report if step["message"]]
     
     return df_cleaned, cleaning_steps
 
@@ -1438,8 +1596,46 @@ def display_cleaned_data(df):
         </div>
     """, unsafe_allow_html=True)
     
+    # Near-duplicate text values, merged on request before duplicates are dropped
+    clusters = {
+        col: near_duplicate_clusters(df, col)
+        for col in get_profile(df).text_columns()
+    }
+    clusters = {col: found for col, found in clusters.items() if found}
+    merge_clusters = {}
+    if clusters:
+        st.markdown("""
+            <div class='cleaning-steps-container'>
+                <h4 class='section-title'>🔎 Oxşar Dəyərlər</h4>
+            </div>
+        """, unsafe_allow_html=True)
+        
+        # Each group is merged only when ticked, so look-alike but distinct values can be kept apart
+        fingerprint = fingerprint_frame(df)
+        for col, found in clusters.items():
+            with st.expander(f"{col}: {len(found):,} qrup"):
+                edited = st.data_editor(
+                    pd.DataFrame([
+                        {
+                            'Birləşdir': False,
+                            'Birləşdiriləcək dəyər': cluster['canonical'],
+                            'Variantlar': ", ".join(f"«{value}» ({count:,})" for value, count in cluster['values']),
+                            'Sətir sayı': cluster['rows']
+                        }
+                        for cluster in found
+                    ]),
+                    column_config={'Birləşdir': st.column_config.CheckboxColumn('🔗 Birləşdir')},
+                    disabled=['Birləşdiriləcək dəyər', 'Variantlar', 'Sətir sayı'],
+                    use_container_width=True,
+                    hide_index=True,
+                    key=f"merge_clusters_{fingerprint}_{col}"
+                )
+                chosen = edited.loc[edited['Birləşdir'], 'Birləşdiriləcək dəyər']
+                if len(chosen):
+                    merge_clusters[col] = tuple(chosen)
+    
     # Clean the dataset
-    df_cleaned, cleaning_steps = clean_dataset(df)
+    df_cleaned, cleaning_steps = clean_dataset(df, merge_clusters or None)
     
     # Display cleaning steps
     st.markdown("""
@@ -1469,9 +1665,39 @@ def display_cleaned_data(df):
     with col2:
         st.metric("Sütun sayı", f"{len(df_cleaned.columns):,}")
     with col3:
-        st.metric("Boş dəyərlər", f"{df_cleaned.isnull().sum().sum():,}")
+        st.metric("Boş dəyərlər", f"{get_profile(df_cleaned).total_nulls:,}")
     with col4:
-        st.metric("Təkrarlanan qeydlər", f"{df_cleaned.duplicated().sum():,}")
+        st.metric("Təkrarlanan qeydlər", f"{get_row_index(df_cleaned).duplicate_count:,}")
+    
+    # Outlying numeric values of the cleaned data
+    st.markdown("""
+        <div class='stats-container'>
+            <h4 class='section-title'>🚨 Anomal Dəyərlər</h4>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    st.toggle("🌲 IsolationForest ilə yoxla", key="isolation_forest")
+    try:
+        outliers = get_outliers(df_cleaned, isolation_forest=st.session_state.isolation_forest)
+    except ImportError:
+        st.warning("IsolationForest üçün scikit-learn quraşdırılmalıdır")
+        outliers = get_outliers(df_cleaned, isolation_forest=False)
+    
+    if outliers.row_count:
+        st.dataframe(
+            outliers.columns.rename(columns={
+                'lower': 'Aşağı hədd',
+                'upper': 'Yuxarı hədd',
+                'iqr_outliers': 'IQR üzrə',
+                'mad_outliers': 'MAD üzrə'
+            }),
+            use_container_width=True
+        )
+        with st.expander(f"🔍 Anomal dəyərli sətirlər: {outliers.row_count:,}"):
+            flagged = df_cleaned[outliers.flagged.to_numpy()]
+            st.dataframe(flagged.head(settings["file"]["preview_rows"]), use_container_width=True)
+    else:
+        st.info("Anomal dəyər tapılmadı")
     
     # Display the cleaned data
     st.markdown("""
@@ -1481,26 +1707,109 @@ def display_cleaned_data(df):
     """, unsafe_allow_html=True)
     
     # Show the data with nice formatting
+    formats = settings["visualization"]["number_formats"]
     st.dataframe(
-        df_cleaned.style.format({
-            'Enrollments': '{:,.0f}',
-            'Active Enrollments': '{:,.0f}',
-            'Completions': '{:,.0f}',
-            'Tamamlama Faizi': '{:.2f}%'
-        }),
+        df_cleaned.style.format({col: fmt for col, fmt in formats.items() if col in df_cleaned.columns}),
         use_container_width=True,
         height=400
     )
     
     # Add download button for cleaned data
-    csv = df_cleaned.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        "📥 Təmizlənmiş Məlumatları Yüklə",
-        csv,
-        "temizlenmis_melumatlar.csv",
-        "text/csv",
-        key='download-cleaned-csv'
+    offer_download(df_cleaned, "📥 Təmizlənmiş Məlumatları Yüklə", "temizlenmis_melumatlar",
+                   'download-cleaned-csv')
+
+def display_sheet_selector():
+    """Let the user switch between the sheets of a multi-sheet workbook."""
+    sheets = st.session_state.sheets
+    if len(sheets) <= 1:
+        return
+    
+    sheet_names = list(sheets)
+    selected = st.selectbox(
+        "📑 Vərəq",
+        sheet_names,
+        index=sheet_names.index(st.session_state.active_sheet),
+        format_func=lambda name: f"{name} ({len(sheets[name]):,} sətir)"
     )
+    if selected != st.session_state.active_sheet:
+        st.session_state.active_sheet = selected
+        st.session_state.df = sheets[selected]
+        if st.session_state.selected_history is not None:
+            st.session_state.selected_history['df'] = st.session_state.df
+            st.session_state.selected_history['active_sheet'] = selected
+        st.rerun()
+
+def poll_ingest_job():
+    """Swap in the full dataset once background ingestion finishes; returns True while it is still running."""
+    job = st.session_state.ingest_job
+    if job is None:
+        return False
+    
+    future = job["future"]
+    if not future.done():
+        # Show the latest reservoir sample until the full pass completes; the
+        # snapshot stays the same object until new rows arrive
+        reservoir = job["progress"]["sample"]
+        sample = reservoir.snapshot() if reservoir is not None else None
+        history_item = job["history_item"]
+        if sample is not None and st.session_state.selected_history is history_item:
+            history_item['df'] = sample
+            st.session_state.df = sample
+
+        display_ingest_progress()
+        return True
+    
+    st.session_state.ingest_job = None
+    try:
+        sheets = future.result()
+    except Exception as e:
+        st.error(f"Tam məlumatlar yüklənərkən xəta baş verdi: {str(e)}")
+        return False
+    
+    active_sheet = next(iter(sheets))
+    history_item = job["history_item"]
+    history_item['sheets'] = sheets
+    history_item['active_sheet'] = active_sheet
+    history_item['df'] = sheets[active_sheet]
+    
+    # Only replace the data on screen if the user is still looking at this upload
+    if st.session_state.selected_history is history_item:
+        st.session_state.sheets = sheets
+        st.session_state.active_sheet = active_sheet
+        st.session_state.df = sheets[active_sheet]
+    return False
+
+@st.fragment(run_every=settings["file"]["ingest_poll_seconds"])
+def display_ingest_progress():
+    """
+    Show the progress of background ingestion.
+
+    Only this fragment reruns on every poll, so the rest of the page stays as
+    drawn; the whole app reruns once, when ingestion has finished, or when the
+    user asks for a fresh sample.
+    """
+    job = st.session_state.ingest_job
+    if job is None:
+        return
+    if job["future"].done():
+        st.rerun()
+
+    progress = job["progress"]
+    total = progress["total"]
+    if total:
+        st.progress(
+            progress["completed"] / total,
+            text=f"Tam məlumatlar arxa planda yüklənir... ({progress['completed']}/{total} vərəq)"
+        )
+    else:
+        estimate = job.get("estimated_seconds")
+        st.progress(
+            0.0,
+            text="Tam məlumatlar arxa planda yüklənir..." if estimate is None
+            else f"Tam məlumatlar arxa planda yüklənir... (təxminən {estimate:.0f} san)"
+        )
+    if st.button("🔄 Təxmini nəticələri yenilə", key="refresh-sample"):
+        st.rerun()
 
 def display_data_actions(df):
     """Display action buttons for different data views."""
@@ -1579,14 +1888,46 @@ def main():
             
             if uploaded_file is not None:
                 try:
-                    # Process the uploaded file
-                    df = process_excel_file(uploaded_file)
+                    # Check the name first, so no other file is ever opened as a zip archive
+                    if not validate_excel_file(uploaded_file):
+                        raise ValueError("Yanlış fayl formatı")
+                    # Then the size and estimated parse cost (size first, before the archive
+                    # is opened), before any cell is read
+                    inspection = inspect_workbook(uploaded_file)
+                    if inspection["mode"] == "rejected":
+                        raise ValueError(inspection["reason"])
+                    
+                    # Parse from a private spool (memory-mapped from TEMP_DIR for large files)
+                    # that is released as soon as ingestion finishes
+                    upload = spool_upload(uploaded_file)
+                    
+                    # Phase 1: header and first rows only, so the preview appears at once
+                    try:
+                        df = read_excel_preview(upload)
+                    except Exception:
+                        upload.close()
+                        raise
                     st.session_state.df = df
+                    st.session_state.sheets = {}
+                    st.session_state.active_sheet = None
                     st.session_state.show_chat = True
                     
                     # Add to history
                     add_to_history(uploaded_file.name, datetime.now())
                     
+                    # Phase 2: parse every sheet in the background in row batches;
+                    # re-uploads of the same file are served from the parsed-workbook cache
+                    job = start_workbook_ingest(
+                        upload,
+                        close_file=True,
+                        streaming=True,
+                        use_cache=True,
+                        max_rows=inspection["max_rows"]
+                    )
+                    job["history_item"] = st.session_state.selected_history
+                    job["estimated_seconds"] = inspection["estimated_seconds"]
+                    st.session_state.ingest_job = job
+                    
                     # Display file name prominently
                     st.markdown(f"""
                         <div class='file-info-container'>
@@ -1612,6 +1953,22 @@ def main():
 
         # Chat interface
         if st.session_state.show_chat and st.session_state.df is not None:
+            # Swap in the full dataset once background ingestion finishes
+            ingest_pending = poll_ingest_job()
+            
+            # Choose the sheet to analyze in multi-sheet workbooks
+            display_sheet_selector()
+            
+            sampled_rows = st.session_state.df.attrs.get("sampled_rows")
+            if sampled_rows:
+                st.warning(f"Fayl çox böyük olduğu üçün yalnız ilk {sampled_rows:,} sətir yükləndi.")
+            if is_approximate(st.session_state.df):
+                st.info(
+                    f"≈ Təxmini nəticələr: oxunmuş {population_size(st.session_state.df):,} sətirdən "
+                    f"{len(st.session_state.df):,} sətirlik təsadüfi seçmə göstərilir (± 95% xəta həddi). "
+                    "Tam yükləmə bitdikdə nəticələr avtomatik yenilənəcək."
+                )
+            
             # Display action buttons
             display_data_actions(st.session_state.df)
             
@@ -1631,6 +1988,10 @@ def main():
             if not (st.session_state.show_general_overview or 
                     st.session_state.show_visualizations or 
                     st.session_state.show_cleaned_data):
+                # Show the preview while the rest of the file is still loading
+                if ingest_pending:
+                    display_data_preview(st.session_state.df)
+                
                 st.markdown("""
                     <div class='chat-container'>
                         <h2 class='chat-title'>Sualınızı Yazın</h2>
@@ -1645,6 +2006,8 @@ def main():
                             st.markdown(f"**Siz:** {message['content']}")
                         else:
                             st.markdown(f"**Bot:** {message['content']}")
+                            if message.get("figure") is not None:
+                                st.plotly_chart(message["figure"], use_container_width=True)
                 
                 # Chat input
                 if prompt := st.chat_input("Sualınızı yazın..."):
@@ -1655,24 +2018,27 @@ def main():
                     with st.chat_message("user"):
                         st.write(prompt)
                     
-                    # Process query and get response
-                    with st.spinner("Sualınız emal edilir..."):
-                        response = process_query(prompt, st.session_state.df)
-                    
-                    # Add assistant response to chat history
-                    st.session_state.chat_history.append({"role": "assistant", "content": response})
-                    
-                    # Display assistant response
+                    # Stream the response as it is generated; the spinner runs until the first piece arrives
                     with st.chat_message("assistant"):
-                        st.write(response)
-                        
+                        with st.spinner("Sualınız emal edilir..."):
+                            pieces = stream_query(prompt, st.session_state.df)
+                            first_piece = next(pieces, "")
+                        response = st.write_stream(chain([first_piece], pieces))
+
+                        # The visualization keywords are checked on the complete response
+                        _, needs_visualization = process_visualization_request(response, st.session_state.df)
+
                         # If response includes visualization, display it
-                        if "visualization" in response:
+                        fig = None
+                        if needs_visualization:
                             try:
                                 fig = create_visualization(st.session_state.df, prompt)
                                 st.plotly_chart(fig, use_container_width=True)
                             except Exception as e:
                                 st.error(f"Vizualizasiya yaradılarkən xəta baş verdi: {str(e)}")
 
+                        # The figure is kept with the answer so later reruns draw it again
+                        st.session_state.chat_history.append({"role": "assistant", "content": response, "figure": fig})
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
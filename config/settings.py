@@ -12,6 +12,32 @@ ALLOWED_EXTENSIONS = {'.xlsx', '.xls'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 TEMP_DIR = Path("temp")
 UPLOAD_DIR = Path("uploads")
+EXPORT_DIR = TEMP_DIR / "exports"  # Download files, named by dataset fingerprint
+STREAM_BATCH_SIZE = 10000  # Rows per batch in streaming ingestion mode
+CATEGORY_MAX_RATIO = 0.5  # Max unique/non-null ratio for storing text columns as category
+MAX_PARSE_WORKERS = os.cpu_count() or 1  # Worker processes for parallel sheet parsing
+STATS_WORKERS = os.cpu_count() or 1  # Worker processes for chunk-parallel column statistics
+STATS_CHUNK_ROWS = 250_000  # Rows per chunk when computing column statistics
+XLSX_ENGINE = "openpyxl"  # Row reader for .xlsx sheets: "openpyxl" or "native"
+MAX_UNCOMPRESSED_SIZE = 512 * 1024 * 1024  # 512MB of XML inside an .xlsx archive
+MAX_PARSE_CELLS = 10_000_000  # Sheets above this are loaded in sampled mode
+SAMPLE_ROWS = 100_000  # Rows read per sheet in sampled mode
+PARSE_BYTES_PER_SECOND = 3 * 1024 * 1024  # Measured sheet-XML throughput of the streaming readers
+MEMORY_BYTES_PER_CELL = 32  # Average in-memory size of a parsed cell
+PREVIEW_ROWS = 100  # Rows read for the instant preview before full ingestion
+INGEST_POLL_SECONDS = 1.0  # How often the UI checks on background ingestion
+RESERVOIR_SIZE = 10_000  # Rows kept in the uniform sample shown while ingestion runs
+SPOOL_MAX_MEMORY = 1024 * 1024  # Uploads above 1MB are spooled to TEMP_DIR and memory-mapped
+TYPE_SAMPLE_SIZE = 1000  # Values sampled per column for type inference
+TYPE_MATCH_RATIO = 0.95  # Share of sampled values that must parse for a numeric/date column
+PROFILE_TOP_K = 10  # Most frequent values kept per column in the dataset profile
+SKETCH_MIN_ROWS = 100_000  # Sheets with at least this many rows get distinct-count/quantile sketches
+HLL_PRECISION = 14  # HyperLogLog register bits (16 KB per column, ~0.8% error)
+QUANTILE_SKETCH_K = 200  # Quantile sketch size (~1% rank error)
+EXACT_STATISTICS = False  # Compute distinct counts and quantiles exactly instead of from sketches
+HEAVY_HITTERS_CAPACITY = 1000  # Values tracked when counting the most frequent values of a column
+EXPORT_CHUNK_ROWS = 50_000  # Rows encoded at a time when writing export files
+EXPORT_FORMATS = ["csv", "xlsx", "parquet", "csv.gz", "csv.zst"]  # Download formats offered, the first is the default
 
 # Create necessary directories
 TEMP_DIR.mkdir(exist_ok=True)
@@ -36,15 +62,46 @@ STREAMLIT_CONFIG = {
 PLOTLY_TEMPLATE = "plotly_white"
 CHART_HEIGHT = 600
 CHART_WIDTH = 800
+CHART_TOP_K = 10  # Categories shown individually in pie/bar charts; the rest are grouped as "Digər"
+CUBE_MAX_CATEGORIES = 50  # Values kept per categorical column in the aggregate cube
+CORRELATION_BLOCK_SIZE = 64  # Columns processed together when computing correlations
+CORRELATION_MIN_PERIODS = 3  # Shared non-missing rows needed for a correlation
+NUMBER_FORMATS = {  # Display formats of known columns, also kept in Excel exports
+    "Enrollments": "{:,.0f}",
+    "Active Enrollments": "{:,.0f}",
+    "Completions": "{:,.0f}",
+    "Tamamlama Faizi": "{:.2f}%"
+}
 
 # NLP settings
 MAX_QUERY_LENGTH = 500
 SUPPORTED_LANGUAGES = ["az", "en"]
 DEFAULT_LANGUAGE = "az"
+LLM_MODEL = "gpt-3.5-turbo"
+LLM_TEMPERATURE = 0.7
+LLM_MAX_TOKENS = 500
+
+# Cleaning settings
+CLEANING_TEXT_FILL = "Məlum deyil"  # Fill value of missing free-text cells
+CLEANING_DECIMALS = 2  # Decimals kept by the rounding step and derived ratios
+CLEANING_DERIVED_RATIOS = {"Tamamlama Faizi": ("Completions", "Enrollments")}  # Percentage columns derived when both sources exist
+CLEANING_SORT_COLUMN = "Enrollments"  # Preferred sort column; the first numeric column otherwise
+NEAR_DUPLICATE_THRESHOLD = 0.7  # Minimum estimated Jaccard similarity of character shingles for near-duplicates
+SHINGLE_SIZE = 3  # Characters per shingle (at most 3)
+MINHASH_PERMUTATIONS = 128  # Hash functions per MinHash signature
+LSH_BANDS = 16  # Bands of the LSH index (signature rows per band = permutations / bands)
+OUTLIER_IQR_FACTOR = 1.5  # Values beyond this many IQRs outside the quartiles are outliers
+OUTLIER_MAD_THRESHOLD = 3.5  # Robust z-score (median/MAD) above which values are outliers
+OUTLIER_ISOLATION_FOREST = False  # Also score rows with an IsolationForest
+OUTLIER_SAMPLE_ROWS = 10_000  # Rows the IsolationForest is trained on
 
 # Cache settings
 CACHE_TTL = 3600  # 1 hour in seconds
 MAX_CACHE_SIZE = 100  # Maximum number of cached results
+CACHE_MAX_MEMORY = 256 * 1024 * 1024  # Memory budget of in-memory cached results (256MB)
+RESPONSE_CACHE_PATH = TEMP_DIR / "responses.sqlite3"  # On-disk cache of model responses
+RESPONSE_CACHE_TTL = 7 * 24 * 3600  # Cached responses expire after a week
+RESPONSE_CACHE_MAX_ENTRIES = 5000  # Maximum number of cached responses
 
 def get_settings() -> Dict[str, Any]:
     """
@@ -63,22 +120,72 @@ def get_settings() -> Dict[str, Any]:
             "allowed_extensions": ALLOWED_EXTENSIONS,
             "max_size": MAX_FILE_SIZE,
             "temp_dir": str(TEMP_DIR),
-            "upload_dir": str(UPLOAD_DIR)
+            "upload_dir": str(UPLOAD_DIR),
+            "export_dir": str(EXPORT_DIR),
+            "stream_batch_size": STREAM_BATCH_SIZE,
+            "category_max_ratio": CATEGORY_MAX_RATIO,
+            "max_parse_workers": MAX_PARSE_WORKERS,
+            "stats_workers": STATS_WORKERS,
+            "stats_chunk_rows": STATS_CHUNK_ROWS,
+            "xlsx_engine": XLSX_ENGINE,
+            "max_uncompressed_size": MAX_UNCOMPRESSED_SIZE,
+            "max_parse_cells": MAX_PARSE_CELLS,
+            "sample_rows": SAMPLE_ROWS,
+            "preview_rows": PREVIEW_ROWS,
+            "ingest_poll_seconds": INGEST_POLL_SECONDS,
+            "reservoir_size": RESERVOIR_SIZE,
+            "spool_max_memory": SPOOL_MAX_MEMORY,
+            "type_sample_size": TYPE_SAMPLE_SIZE,
+            "type_match_ratio": TYPE_MATCH_RATIO,
+            "profile_top_k": PROFILE_TOP_K,
+            "sketch_min_rows": SKETCH_MIN_ROWS,
+            "hll_precision": HLL_PRECISION,
+            "quantile_sketch_k": QUANTILE_SKETCH_K,
+            "exact_statistics": EXACT_STATISTICS,
+            "heavy_hitters_capacity": HEAVY_HITTERS_CAPACITY,
+            "export_chunk_rows": EXPORT_CHUNK_ROWS,
+            "export_formats": EXPORT_FORMATS
         },
         "streamlit": STREAMLIT_CONFIG,
         "visualization": {
             "template": PLOTLY_TEMPLATE,
             "height": CHART_HEIGHT,
-            "width": CHART_WIDTH
+            "width": CHART_WIDTH,
+            "top_k": CHART_TOP_K,
+            "cube_max_categories": CUBE_MAX_CATEGORIES,
+            "correlation_block_size": CORRELATION_BLOCK_SIZE,
+            "correlation_min_periods": CORRELATION_MIN_PERIODS,
+            "number_formats": NUMBER_FORMATS
         },
         "nlp": {
             "max_query_length": MAX_QUERY_LENGTH,
             "supported_languages": SUPPORTED_LANGUAGES,
-            "default_language": DEFAULT_LANGUAGE
+            "default_language": DEFAULT_LANGUAGE,
+            "llm_model": LLM_MODEL,
+            "llm_temperature": LLM_TEMPERATURE,
+            "llm_max_tokens": LLM_MAX_TOKENS
+        },
+        "cleaning": {
+            "text_fill": CLEANING_TEXT_FILL,
+            "decimals": CLEANING_DECIMALS,
+            "derived_ratios": CLEANING_DERIVED_RATIOS,
+            "sort_column": CLEANING_SORT_COLUMN,
+            "near_duplicate_threshold": NEAR_DUPLICATE_THRESHOLD,
+            "shingle_size": SHINGLE_SIZE,
+            "minhash_permutations": MINHASH_PERMUTATIONS,
+            "lsh_bands": LSH_BANDS,
+            "outlier_iqr_factor": OUTLIER_IQR_FACTOR,
+            "outlier_mad_threshold": OUTLIER_MAD_THRESHOLD,
+            "outlier_isolation_forest": OUTLIER_ISOLATION_FOREST,
+            "outlier_sample_rows": OUTLIER_SAMPLE_ROWS
         },
         "cache": {
             "ttl": CACHE_TTL,
-            "max_size": MAX_CACHE_SIZE
+            "max_size": MAX_CACHE_SIZE,
+            "max_memory": CACHE_MAX_MEMORY,
+            "response_path": str(RESPONSE_CACHE_PATH),
+            "response_ttl": RESPONSE_CACHE_TTL,
+            "response_max_entries": RESPONSE_CACHE_MAX_ENTRIES
         }
     }
 
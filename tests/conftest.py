@@ -0,0 +1,35 @@
+import os
+from datetime import datetime
+
+import pytest
+from openpyxl import Workbook
+
+# utils/__init__ imports the chat module, which refuses to load without an API key;
+# no test talks to the API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+@pytest.fixture
+def workbook_path(tmp_path):
+    """An .xlsx workbook with two sheets of mixed, partly blank columns."""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Satışlar"
+    sheet.append(["Məhsul", "Say", "Qiymət", "Tarix", "Aktiv", "Qeyd"])
+    for idx in range(250):
+        sheet.append([
+            f"Məhsul {idx % 7}",
+            idx if idx % 10 else None,
+            idx * 1.25,
+            datetime(2024, 1, 1 + idx % 28),
+            idx % 2 == 0,
+            "1.234,5" if idx % 3 == 0 else None
+        ])
+    # A value right of the header in a late row
+    sheet.cell(row=200, column=8, value="əlavə")
+    
+    other = workbook.create_sheet("Boş")
+    other.append(["A", "B"])
+    
+    path = tmp_path / "kitab.xlsx"
+    workbook.save(path)
+    return path
@@ -0,0 +1,93 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.excel_processor import (
+    process_excel_file, process_excel_workbook, iter_excel_batches, get_sheet_names,
+    inspect_workbook, read_excel_preview, compact_dtypes
+)
+from utils.xlsx_reader import list_xlsx_sheets
+
+def test_sheet_names_in_workbook_order(workbook_path):
+    assert get_sheet_names(workbook_path) == ["Satışlar", "Boş"]
+    assert list_xlsx_sheets(workbook_path) == ["Satışlar", "Boş"]
+
+@pytest.mark.parametrize("engine, streaming", [("native", True), ("openpyxl", True)])
+def test_row_readers_match_read_excel(workbook_path, engine, streaming):
+    expected = process_excel_file(workbook_path)
+    df = process_excel_file(workbook_path, streaming=streaming, batch_size=64, engine=engine)
+    pd.testing.assert_frame_equal(df, expected)
+    assert df.attrs["column_types"] == expected.attrs["column_types"]
+
+def test_batches_grow_columns_right_of_the_header(workbook_path):
+    batches = list(iter_excel_batches(workbook_path, batch_size=64, engine="native"))
+    assert [len(batch) for batch in batches] == [64, 64, 64, 58]
+    assert list(batches[0].columns) == ["Məhsul", "Say", "Qiymət", "Tarix", "Aktiv", "Qeyd"]
+    assert list(batches[-1].columns)[-2:] == ["Unnamed: 6", "Unnamed: 7"]
+    assert batches[-1]["Unnamed: 7"].notna().sum() == 1
+
+def test_batch_size_must_be_positive(workbook_path):
+    with pytest.raises(ValueError):
+        next(iter_excel_batches(workbook_path, batch_size=0))
+
+def test_parsed_types(workbook_path):
+    df = process_excel_file(workbook_path, engine="native")
+    assert df["Say"].dtype == "Int32"
+    assert df["Say"].isna().sum() == 25
+    assert pd.api.types.is_datetime64_any_dtype(df["Tarix"])
+    assert isinstance(df["Məhsul"].dtype, pd.CategoricalDtype)
+    # Numbers stored as text in the local layout
+    assert df["Qeyd"].dropna().unique().tolist() == [1234.5]
+    assert df.attrs["column_types"]["Qeyd"]["formats"] == ["comma_decimal"]
+
+def test_max_rows_reads_the_first_rows_only(workbook_path):
+    df = process_excel_file(workbook_path, engine="native", max_rows=100)
+    assert len(df) == 100
+    assert df.attrs["sampled_rows"] == 100
+
+def test_file_objects_and_paths_give_the_same_frame(workbook_path):
+    with open(workbook_path, "rb") as handle:
+        from_handle = process_excel_file(io.BytesIO(handle.read()), engine="native")
+    pd.testing.assert_frame_equal(from_handle, process_excel_file(workbook_path, engine="native"))
+
+def test_workbook_sheets_in_this_process(workbook_path):
+    seen = {}
+    sheets = process_excel_workbook(workbook_path, streaming=True, max_workers=1,
+                                    on_batch=lambda name, batch: seen.setdefault(name, []).append(len(batch)))
+    assert list(sheets) == ["Satışlar", "Boş"]
+    assert len(sheets["Satışlar"]) == 250
+    assert sheets["Boş"].empty and list(sheets["Boş"].columns) == ["A", "B"]
+    assert sum(seen["Satışlar"]) == 250
+
+def test_preview_reads_the_first_rows(workbook_path):
+    df = read_excel_preview(workbook_path, nrows=10)
+    assert len(df) == 10
+    assert df.attrs["preview"] is True
+
+def test_inspection_accepts_small_and_rejects_large_files(workbook_path, monkeypatch):
+    inspection = inspect_workbook(workbook_path)
+    assert inspection["mode"] == "full"
+    assert [sheet["name"] for sheet in inspection["sheets"]] == ["Satışlar", "Boş"]
+    
+    monkeypatch.setattr("utils.excel_processor.MAX_FILE_SIZE", 100)
+    inspection = inspect_workbook(workbook_path)
+    assert inspection["mode"] == "rejected"
+    assert inspection["reason"].startswith("Fayl çox böyükdür")
+
+def test_compaction_keeps_values_and_never_narrows_below_int32():
+    df = pd.DataFrame({
+        "small": [1, 2, 3],
+        "blank": [1.0, None, 3.0],
+        "fraction": [0.5, 0.25, 1.5],
+        "precise": [0.1, 0.2, 0.3],
+        "text": ["a", "a", "b"]
+    })
+    compacted, report = compact_dtypes(df, category_ratio=0.7)
+    assert compacted.dtypes.astype(str).tolist() == ["int32", "Int32", "float32", "float64", "category"]
+    assert (compacted["small"] + np.int32(2 ** 30)).min() > 0
+    pd.testing.assert_frame_equal(compacted.astype(object).where(compacted.notna(), None),
+                                  df.astype(object).where(df.notna(), None), check_dtype=False)
+    assert report["small"]["dtype_before"] == "int64" and report["small"]["dtype_after"] == "int32"
+    assert report["small"]["bytes_saved"] == 12
@@ -0,0 +1,82 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from utils.export import export_frame, cached_export, export_path, excel_number_format, prune_exports
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Ad": ["Əli", None, "Aynur"],
+        "Bal": pd.Series([90, None, 75], dtype="Int32"),
+        "Faiz": [12.5, 50.0, None],
+        "Tarix": pd.to_datetime(["2024-01-15", "2024-02-01", None]),
+        "Qarışıq": ["mətn", 3, None]
+    })
+
+@pytest.mark.parametrize("extension, opener", [("csv", open), ("csv.gz", gzip.open)])
+def test_csv_round_trip(frame, tmp_path, extension, opener):
+    path = export_frame(frame, extension, export_dir=tmp_path, chunk_rows=2)
+    with opener(path, "rt", encoding="utf-8") as handle:
+        loaded = pd.read_csv(handle, parse_dates=["Tarix"])
+    assert list(loaded.columns) == list(frame.columns)
+    assert loaded["Bal"].tolist()[::2] == [90, 75]
+    assert loaded["Faiz"].tolist()[:2] == [12.5, 50.0]
+    assert loaded["Tarix"].tolist()[:2] == frame["Tarix"].tolist()[:2]
+    assert loaded["Ad"].isna().tolist() == [False, True, False]
+
+def test_zstd_csv_round_trip(frame, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    path = export_frame(frame, "csv.zst", export_dir=tmp_path, chunk_rows=2)
+    with zstandard.open(path, "rt", encoding="utf-8") as handle:
+        loaded = pd.read_csv(handle)
+    assert loaded["Ad"].tolist()[0] == "Əli"
+    assert len(loaded) == 3
+
+def test_parquet_round_trip(frame, tmp_path):
+    pytest.importorskip("pyarrow")
+    path = export_frame(frame, "parquet", export_dir=tmp_path, chunk_rows=2)
+    loaded = pd.read_parquet(path)
+    pd.testing.assert_frame_equal(loaded.drop(columns="Qarışıq"), frame.drop(columns="Qarışıq"))
+    # Columns mixing text and numbers are written as text
+    assert loaded["Qarışıq"].tolist() == ["mətn", "3", None]
+
+def test_xlsx_round_trip_with_number_formats(frame, tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.export.NUMBER_FORMATS", {"Faiz": "{:.2f}%"})
+    path = export_frame(frame, "xlsx", export_dir=tmp_path, chunk_rows=2)
+    loaded = pd.read_excel(path)
+    assert list(loaded.columns) == list(frame.columns)
+    assert loaded["Bal"].tolist()[::2] == [90, 75]
+    assert loaded["Tarix"].tolist()[:2] == frame["Tarix"].tolist()[:2]
+    sheet = load_workbook(path).active
+    assert sheet["C2"].number_format == '0.00"%"'
+
+def test_xlsx_row_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.export._XLSX_MAX_ROWS", 3)
+    with pytest.raises(ValueError):
+        export_frame(pd.DataFrame({"a": np.arange(3)}), "xlsx", export_dir=tmp_path)
+
+def test_unknown_format(frame, tmp_path):
+    with pytest.raises(ValueError):
+        export_frame(frame, "docx", export_dir=tmp_path)
+
+def test_exports_are_written_once_per_contents(frame, tmp_path):
+    assert cached_export(frame, "csv", export_dir=tmp_path) is None
+    path = export_frame(frame, "csv", export_dir=tmp_path)
+    assert path == export_path(frame.copy(), "csv", export_dir=tmp_path)
+    assert cached_export(frame, "csv", export_dir=tmp_path) == path
+    assert export_path(frame.iloc[:2], "csv", export_dir=tmp_path) != path
+    assert not [entry for entry in tmp_path.iterdir() if entry.name.startswith(".")]
+    assert prune_exports(tmp_path, max_entries=0) == 1
+
+@pytest.mark.parametrize("python_format, excel_format", [
+    ("{:,.0f}", "#,##0"),
+    ("{:.2f}", "0.00"),
+    ("{:,.1f} ₼", '#,##0.0" ₼"'),
+    ("{:d}", None)
+])
+def test_excel_number_format(python_format, excel_format):
+    assert excel_number_format(python_format) == excel_format
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from utils.near_duplicates import find_near_duplicates, cluster_mapping, minhash_signatures
+from utils.text_utils import normalize_text
+
+def test_variants_in_case_and_spacing_form_one_cluster():
+    series = pd.Series(["Bakı Dövlət Universiteti"] * 5 + ["bakı  dövlət universiteti"] * 2
+                       + [" Bakı Dövlət Universiteti "] + ["Gəncə"] * 4)
+    clusters = find_near_duplicates(series)
+    assert len(clusters) == 1
+    assert clusters[0]["canonical"] == "Bakı Dövlət Universiteti"
+    assert clusters[0]["rows"] == 8
+    assert len(clusters[0]["values"]) == 3
+
+def test_spelling_variants_are_clustered():
+    series = pd.Series(["Azərbaycan Texniki Universiteti"] * 3 + ["Azərbaycan Texnik Universiteti",
+                       "Azərbaycan Texniki Universitet", "Tamamilə başqa ad"])
+    clusters = find_near_duplicates(series)
+    assert len(clusters) == 1
+    assert {value for value, _ in clusters[0]["values"]} == {
+        "Azərbaycan Texniki Universiteti", "Azərbaycan Texnik Universiteti", "Azərbaycan Texniki Universitet"
+    }
+
+@pytest.mark.parametrize("values", [
+    ["Python Basics", "Python Basics 2"],
+    ["Q1 hesabatı", "Q2 hesabatı"],
+    ["Mənzil 12", "Mənzil 13"]
+])
+def test_values_with_different_numbers_stay_apart(values):
+    assert find_near_duplicates(pd.Series(values * 3)) == []
+
+def test_mapping_sends_every_variant_to_the_canonical_value():
+    clusters = find_near_duplicates(pd.Series(["Sumqayıt"] * 3 + ["sumqayıt ", "SUMQAYIT"]))
+    mapping = cluster_mapping(clusters)
+    assert mapping == {normalize_text("Sumqayıt"): "Sumqayıt"}
+
+def test_identical_texts_have_identical_signatures():
+    signatures = minhash_signatures(["abcdef", "abcdef", "uvwxyz"])
+    assert (signatures[0] == signatures[1]).all()
+    assert not (signatures[0] == signatures[2]).all()
+
+def test_shingles_longer_than_three_characters_are_rejected():
+    with pytest.raises(ValueError):
+        minhash_signatures(["abcdef"], shingle_size=4)
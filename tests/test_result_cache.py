@@ -0,0 +1,77 @@
+import time
+
+import pandas as pd
+import pytest
+
+from utils.result_cache import ResultCache, fingerprint_frame, memoize
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+def test_fingerprints_follow_contents(frame):
+    assert fingerprint_frame(frame) == fingerprint_frame(frame.copy())
+    assert fingerprint_frame(frame) != fingerprint_frame(frame.assign(a=[1, 2, 4]))
+    assert fingerprint_frame(frame) != fingerprint_frame(frame.rename(columns={"a": "c"}))
+    assert fingerprint_frame(frame) != fingerprint_frame(frame.astype({"a": "float64"}))
+    assert fingerprint_frame(frame["a"]) == fingerprint_frame(frame["a"].copy())
+    assert fingerprint_frame(frame["a"]) != fingerprint_frame(frame["a"].rename("c"))
+
+def test_samples_and_previews_never_share_a_fingerprint_with_full_data(frame):
+    sample = frame.copy()
+    sample.attrs.update(approximate=True, rows_seen=1000, sample_size=3)
+    preview = frame.copy()
+    preview.attrs["preview"] = True
+    fingerprints = {fingerprint_frame(frame), fingerprint_frame(sample), fingerprint_frame(preview)}
+    assert len(fingerprints) == 3
+    
+    # Attributes set after a fingerprint was taken are noticed too
+    later = frame.copy()
+    fingerprint_frame(later)
+    later.attrs["approximate"] = True
+    marked = frame.copy()
+    marked.attrs["approximate"] = True
+    assert fingerprint_frame(later) == fingerprint_frame(marked) != fingerprint_frame(frame)
+
+def test_memoized_results_are_shared_by_equal_frames(frame):
+    calls = []
+    
+    @memoize(cache=ResultCache())
+    def summarize(df, column):
+        calls.append(column)
+        return {"values": df[column].tolist()}
+    
+    first = summarize(frame, "a")
+    first["values"].append(99)
+    assert summarize(frame.copy(), "a") == {"values": [1, 2, 3]}
+    summarize(frame, "b")
+    # Other contents, same column
+    summarize(frame[["a"]], "a")
+    assert calls == ["a", "b", "a"]
+
+def test_memoized_series_arguments(frame):
+    calls = []
+    
+    @memoize(cache=ResultCache())
+    def total(series):
+        calls.append(1)
+        return series.sum()
+    
+    assert total(frame["a"]) == total(frame["a"]) == 6
+    assert len(calls) == 1
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.stats()["evictions"] == 1
+
+def test_expired_entries_are_misses(monkeypatch):
+    cache = ResultCache(ttl=10)
+    cache.put("a", 1)
+    now = time.time()
+    monkeypatch.setattr("utils.result_cache.time.time", lambda: now + 11)
+    assert cache.get("a") == (False, None)
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from utils.row_hash import RowHashIndex, find_cross_duplicates
+
+def test_hashes_ignore_column_order_index_and_number_type():
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+    reordered = pd.DataFrame({"b": ["x", "y"], "a": [1.0, 2.0]}, index=[10, 11])
+    assert (RowHashIndex.from_frame(df).hashes == RowHashIndex.from_frame(reordered).hashes).all()
+
+def test_column_names_are_part_of_the_hash():
+    df = pd.DataFrame({"a": [1, 2]})
+    assert not (RowHashIndex.from_frame(df).hashes == RowHashIndex.from_frame(df.rename(columns={"a": "b"})).hashes).any()
+
+def test_duplicates_match_pandas():
+    df = pd.DataFrame({"a": [1, 2, 1, 1, None, None], "b": ["x", "y", "x", "z", None, None]})
+    index = RowHashIndex.from_frame(df)
+    assert index.duplicated().tolist() == df.duplicated().tolist()
+    assert index.duplicate_count == 2
+
+def test_rows_repeated_across_uploads():
+    first = pd.DataFrame({"a": [1, 2, 3]})
+    second = pd.DataFrame({"a": [3, 4, 1]})
+    repeated = find_cross_duplicates([first, second])
+    assert repeated[["source", "row", "first_source", "first_row"]].values.tolist() == [[1, 0, 0, 2], [1, 2, 0, 0]]
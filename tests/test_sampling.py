@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from utils.sampling import ReservoirSample, approximate_column_stats, estimate_mean, is_approximate
+
+def _batches(rows, size):
+    for start in range(0, rows, size):
+        stop = min(rows, start + size)
+        yield pd.DataFrame({"row": np.arange(start, stop), "value": [str(n) for n in range(start, stop)]})
+
+def test_reservoir_keeps_a_fixed_size_sample_of_distinct_rows():
+    sample = ReservoirSample(100, seed=0)
+    for batch in _batches(10_000, 333):
+        sample.add(batch)
+    assert sample.seen == 10_000
+    assert len(sample.frame) == 100
+    assert sample.frame["row"].is_unique
+
+def test_every_row_is_equally_likely_to_be_kept():
+    kept = np.zeros(1000)
+    for seed in range(300):
+        sample = ReservoirSample(50, seed=seed)
+        for batch in _batches(1000, 128):
+            sample.add(batch)
+        kept[sample.frame["row"].to_numpy()] += 1
+    # Each row is kept with probability 5%, i.e. 15 times in 300 runs
+    first, last = kept[:500].sum(), kept[500:].sum()
+    assert abs(first - last) < 0.1 * (first + last)
+
+def test_snapshot_is_typed_marked_and_reused_until_new_rows_arrive():
+    sample = ReservoirSample(20, seed=0)
+    assert sample.snapshot() is None
+    sample.add(next(_batches(100, 100)))
+    snapshot = sample.snapshot()
+    assert is_approximate(snapshot)
+    assert snapshot.attrs["rows_seen"] == 100 and snapshot.attrs["sample_size"] == 20
+    assert pd.api.types.is_numeric_dtype(snapshot["value"])
+    assert sample.snapshot() is snapshot
+    
+    sample.add(pd.DataFrame({"row": [100], "value": ["100"]}))
+    assert sample.snapshot() is not snapshot
+    assert sample.snapshot().attrs["rows_seen"] == 101
+
+def test_estimates_cover_the_full_data():
+    rng = np.random.default_rng(0)
+    population = pd.Series(rng.normal(50, 10, size=100_000))
+    sample = population.sample(1000, random_state=1)
+    estimate = estimate_mean(sample, len(population))
+    assert abs(estimate["mean"] - population.mean()) <= estimate["error"]
+    
+    frame = sample.to_frame("x")
+    frame.attrs.update(approximate=True, rows_seen=len(population))
+    stats = approximate_column_stats(frame)["x"]
+    assert abs(stats["total"] - population.sum()) <= stats["total_error"]
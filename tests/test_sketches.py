@@ -0,0 +1,101 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sketches import HyperLogLog, QuantileSketch
+from utils.partial_stats import PartialStats, compute_partial_stats
+
+@pytest.mark.parametrize("distinct", [50, 5_000, 200_000])
+def test_distinct_count_error_bound(distinct):
+    sketch = HyperLogLog()
+    values = pd.Series(np.arange(distinct)).sample(frac=1.0, replace=False, random_state=0)
+    sketch.add(pd.concat([values, values.iloc[:distinct // 2]]))
+    # About 0.8% standard error at the default precision; 4% is five standard errors
+    assert abs(sketch.estimate() - distinct) <= max(2, 0.04 * distinct)
+
+def test_distinct_sketches_merge_like_a_union():
+    left, right, whole = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.add(pd.Series(np.arange(0, 60_000)))
+    right.add(pd.Series(np.arange(40_000, 100_000)))
+    whole.add(pd.Series(np.arange(0, 100_000)))
+    left.merge(right)
+    assert np.array_equal(left.registers, whole.registers)
+
+def test_integers_and_floats_of_a_column_hash_alike():
+    ints, floats = HyperLogLog(), HyperLogLog()
+    ints.add(pd.Series([1, 2, 3], dtype="int32"))
+    floats.add(pd.Series([1.0, 2.0, 3.0, None]))
+    assert np.array_equal(ints.registers, floats.registers)
+
+def test_precisions_must_match():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+
+def test_quantile_rank_error_bound():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(size=200_000)
+    sketch = QuantileSketch(seed=0)
+    for batch in np.array_split(values, 37):
+        sketch.add(pd.Series(batch))
+    qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+    ranks = np.searchsorted(np.sort(values), sketch.quantiles(qs)) / len(values)
+    # About 1.7 / k rank error at k = 200; allow three times that
+    assert np.all(np.abs(ranks - qs) <= 0.026)
+    assert sketch.quantiles([0, 1]) == [values.min(), values.max()]
+
+def test_merged_quantile_sketches_stay_accurate():
+    rng = np.random.default_rng(2)
+    parts = [rng.normal(loc, size=50_000) for loc in (0, 5, 10)]
+    merged = QuantileSketch(seed=0)
+    for part in parts:
+        sketch = QuantileSketch(seed=1)
+        sketch.add(pd.Series(part))
+        merged.merge(sketch)
+    values = np.sort(np.concatenate(parts))
+    assert merged.count == len(values)
+    rank = np.searchsorted(values, merged.quantiles([0.5])[0]) / len(values)
+    assert abs(rank - 0.5) <= 0.026
+
+def test_sketches_survive_json():
+    distinct, quantiles = HyperLogLog(), QuantileSketch(seed=0)
+    distinct.add(pd.Series(np.arange(1000)))
+    quantiles.add(pd.Series(np.arange(10_000, dtype=float)))
+    distinct_back = HyperLogLog.from_dict(json.loads(json.dumps(distinct.to_dict())))
+    quantiles_back = QuantileSketch.from_dict(json.loads(json.dumps(quantiles.to_dict())))
+    assert distinct_back.estimate() == distinct.estimate()
+    assert quantiles_back.quantiles([0.1, 0.5, 0.9]) == quantiles.quantiles([0.1, 0.5, 0.9])
+
+def test_chunked_moments_match_a_single_pass():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "x": rng.normal(100, 15, size=10_001),
+        "n": pd.array(rng.integers(0, 50, size=10_001), dtype="Int32"),
+        "flag": rng.random(10_001) > 0.5,
+        "text": rng.choice(["a", "b", None], size=10_001)
+    })
+    df.loc[::7, "x"] = np.nan
+    stats = compute_partial_stats(df, chunk_rows=999, max_workers=1)
+    assert stats.rows == len(df)
+    for column in ("x", "n"):
+        result = stats.column_stats(column)
+        values = df[column].dropna().astype(float)
+        assert result["count"] == len(values)
+        assert result["nulls"] == len(df) - len(values)
+        assert result["mean"] == pytest.approx(values.mean(), rel=1e-12)
+        assert result["std"] == pytest.approx(values.std(), rel=1e-9)
+        assert (result["min"], result["max"]) == (values.min(), values.max())
+    assert "mean" not in stats.column_stats("flag")
+    assert stats.column_stats("text")["nulls"] == df["text"].isna().sum()
+
+def test_streamed_partials_match_the_whole_frame():
+    df = pd.DataFrame({"x": np.arange(1000, dtype=float)})
+    streamed = PartialStats({}, sketches=True)
+    for start in range(0, 1000, 128):
+        streamed.update(df.iloc[start:start + 128])
+    whole = PartialStats.from_frame(df, sketches=True)
+    assert streamed.column_stats("x") == pytest.approx(whole.column_stats("x"))
+    assert streamed.columns["x"]["distinct"].estimate() == whole.columns["x"]["distinct"].estimate()
+    assert streamed.sketches_dict(min_rows=1000)["rows"] == 1000
+    assert streamed.sketches_dict(min_rows=1001) is None
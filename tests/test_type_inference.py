@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from utils.type_inference import infer_column_type, coerce_column, infer_and_coerce_types
+
+def test_dot_decimals_with_three_digits_are_not_read_as_thousands():
+    series = pd.Series(["0.125", "1.700", "2.250", "3.500"])
+    inference = infer_column_type(series)
+    assert inference["formats"] == ["dot_decimal"]
+    assert coerce_column(series, inference).tolist() == [0.125, 1.7, 2.25, 3.5]
+
+@pytest.mark.parametrize("values, expected", [
+    (["12,5", "1,250"], [12.5, 1.25]),
+    (["1.234.567", "12"], [1234567.0, 12.0]),
+    (["1 234,56", "7"], [1234.56, 7.0]),
+    (["1.234,56 ₼", "AZN 3,5"], [1234.56, 3.5])
+])
+def test_comma_decimals_are_chosen_when_the_sample_shows_them(values, expected):
+    series = pd.Series(values)
+    inference = infer_column_type(series)
+    assert inference["formats"] == ["comma_decimal"]
+    assert coerce_column(series, inference).tolist() == expected
+
+def test_dot_decimals_with_thousands_commas():
+    series = pd.Series(["1,234.56", "3.5", "$10"])
+    inference = infer_column_type(series)
+    assert inference["formats"] == ["dot_decimal"]
+    assert coerce_column(series, inference).tolist() == [1234.56, 3.5, 10.0]
+
+def test_values_that_fit_no_layout_are_reported_as_invalid():
+    df = pd.DataFrame({"amount": ["1.5", "2.5", "3.5", "4.5", "5.5", "6.5", "7.5", "8.5", "9.5", "?!"]})
+    converted, report = infer_and_coerce_types(df, match_ratio=0.9)
+    assert report["amount"]["type"] == "numeric"
+    assert report["amount"]["invalid"] == 1
+    assert converted["amount"].isna().sum() == 1
+
+def test_dates_in_local_layout():
+    series = pd.Series(["15.01.2024", "03.02.2024", "15 yanvar 2024"])
+    inference = infer_column_type(series)
+    assert inference["type"] == "date"
+    assert coerce_column(series, inference).tolist() == [
+        pd.Timestamp("2024-01-15"), pd.Timestamp("2024-02-03"), pd.Timestamp("2024-01-15")
+    ]
@@ -0,0 +1,74 @@
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.workbook_cache import (
+    compute_file_hash, make_cache_key, load_cached_frame, save_cached_frame, prune_cache
+)
+
+def _round_trip(df, tmp_path, key="entry"):
+    save_cached_frame(key, df, cache_dir=tmp_path)
+    return load_cached_frame(key, cache_dir=tmp_path)
+
+@pytest.mark.parametrize("values", [
+    pd.Series([1, 2, 3], dtype="int32"),
+    pd.Series([1, None, 3], dtype="Int64"),
+    pd.Series([0.5, None, 1.5], dtype="float32"),
+    pd.Series([True, None, False], dtype="boolean"),
+    pd.Series([True, False, True]),
+    pd.Series(["a", "b", "a"], dtype="category"),
+    pd.Series(["Bakı", None, "😀 emoji"]),
+    pd.Series(pd.to_datetime(["2024-01-15", None, "2024-03-01"])),
+    pd.Series(pd.to_datetime(["2024-01-15 10:00", None, "2024-03-01 00:00"])).dt.tz_localize("Asia/Baku"),
+    pd.Series(pd.to_datetime(["2024-01-15T10:00+04:00", "2024-03-01T00:00+04:00"])),
+    pd.Series(pd.to_timedelta([1, 2, 3], unit="D"))
+], ids=lambda values: str(values.dtype))
+def test_round_trip_by_dtype(values, tmp_path):
+    df = pd.DataFrame({"sütun": values})
+    df.attrs["column_types"] = {"sütun": {"type": "text"}}
+    loaded = _round_trip(df, tmp_path)
+    assert loaded is not None
+    pd.testing.assert_frame_equal(loaded, df)
+    assert loaded.attrs["column_types"] == df.attrs["column_types"]
+
+@pytest.mark.parametrize("values", [
+    pd.Series(["a", 1, None], dtype=object),
+    pd.Series(pd.period_range("2024-01", periods=3, freq="M"))
+], ids=["mixed objects", "periods"])
+def test_columns_that_would_need_pickling_are_not_cached(values, tmp_path):
+    assert _round_trip(pd.DataFrame({"sütun": values}), tmp_path) is None
+    assert not list(tmp_path.iterdir())
+
+def test_corrupt_entries_are_misses(tmp_path):
+    df = pd.DataFrame({"a": np.arange(3)})
+    save_cached_frame("entry", df, cache_dir=tmp_path)
+    (tmp_path / "entry" / "0.npy").write_bytes(b"not numpy")
+    assert load_cached_frame("entry", cache_dir=tmp_path) is None
+    assert not (tmp_path / "entry").exists()
+
+def test_expired_and_excess_entries_are_pruned(tmp_path):
+    df = pd.DataFrame({"a": [1]})
+    for idx in range(3):
+        save_cached_frame(f"entry{idx}", df, cache_dir=tmp_path, max_entries=10)
+    old = time.time() - 100
+    os.utime(tmp_path / "entry0" / "meta.json", (old, old))
+    assert load_cached_frame("entry0", cache_dir=tmp_path, ttl=50) is None
+    assert prune_cache(tmp_path, max_entries=1) == 1
+    assert len(list(tmp_path.iterdir())) == 1
+
+def test_keys_depend_on_contents_and_options(workbook_path):
+    file_hash = compute_file_hash(workbook_path)
+    with open(workbook_path, "rb") as handle:
+        buffer = io.BytesIO(handle.read())
+    buffer.seek(5)
+    assert compute_file_hash(buffer) == file_hash
+    assert buffer.tell() == 5
+    assert compute_file_hash(io.BytesIO(b"other")) != file_hash
+    
+    key = make_cache_key(file_hash, sheet="Satışlar", engine="native")
+    assert key == make_cache_key(file_hash, engine="native", sheet="Satışlar")
+    assert key != make_cache_key(file_hash, sheet="Satışlar", engine="openpyxl")
@@ -2,12 +2,13 @@
 Utility modules for the Excel Summarization Chatbot.
 """
 
-from .excel_processor import process_excel_file, get_column_statistics, detect_column_types
+from .excel_processor import process_excel_file, process_excel_workbook, get_column_statistics, detect_column_types
 from .nlp_utils import process_query, detect_query_type, generate_summary, generate_statistics
 from .visualization import create_visualization
 
 __all__ = [
     'process_excel_file',
+    'process_excel_workbook',
     'get_column_statistics',
     'detect_column_types',
     'process_query',
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Tuple
+from config.settings import CUBE_MAX_CATEGORIES
+from .profiling import get_profile
+from .heavy_hitters import OTHER_LABEL, column_top_values, group_long_tail
+from .result_cache import memoize
+
+# Aggregates kept for every (dimension value, measure) cell
+CUBE_STATS = ("sum", "count", "min", "max")
+
+class AggregateCube:
+    """
+    Precomputed breakdowns of every numeric column by every categorical column.
+    
+    For each categorical dimension the cube holds one table indexed by the
+    dimension values, with the number of `rows` and, per numeric measure,
+    the `sum`, `count`, `min` and `max` of its values; means are derived from
+    sum and count. Dimensions with more than `max_categories` values keep the
+    most frequent ones and sum the rest into a "Digər" row.
+    """
+    
+    def __init__(self, tables: Dict[str, pd.DataFrame], measures: List[str]):
+        self.tables = tables
+        self.measures = measures
+    
+    @property
+    def dimensions(self) -> List[str]:
+        """Categorical columns the cube is broken down by."""
+        return list(self.tables)
+    
+    def __contains__(self, dimension: str) -> bool:
+        return dimension in self.tables
+    
+    def breakdown(self, dimension: str, measures: Optional[Sequence[str]] = None,
+                  stats: Sequence[str] = ("sum", "mean"), top_k: Optional[int] = None,
+                  other_label: str = OTHER_LABEL) -> pd.DataFrame:
+        """
+        Read a categorical × numeric breakdown from the cube.
+        
+        Args:
+            dimension: Categorical column to break down by
+            measures: Numeric columns to report (default: all)
+            stats: Aggregates per measure, from "sum", "count", "mean", "min", "max"
+            top_k: Keep the top_k most frequent values and merge the rest
+                into one `other_label` row
+            other_label: Label of the merged row
+        
+        Returns:
+            pd.DataFrame: One row per dimension value with the `dimension`
+            column, `rows`, and one column per measure and aggregate, named
+            after the measure for a single aggregate or "<measure>_<stat>"
+        """
+        table = self.tables[dimension]
+        measures = list(self.measures if measures is None else measures)
+        
+        if top_k is not None:
+            # An existing "other" row always belongs to the tail
+            ranked = table[table.index != other_label].sort_values(("rows", ""), ascending=False, kind="stable")
+            head = ranked.iloc[:top_k]
+            tail = table[~table.index.isin(head.index)]
+            if len(tail):
+                merged = {("rows", ""): tail[("rows", "")].sum()}
+                for measure in self.measures:
+                    merged[(measure, "sum")] = tail[(measure, "sum")].sum()
+                    merged[(measure, "count")] = tail[(measure, "count")].sum()
+                    merged[(measure, "min")] = tail[(measure, "min")].min()
+                    merged[(measure, "max")] = tail[(measure, "max")].max()
+                tail_row = pd.DataFrame([merged], index=[other_label], columns=table.columns)
+                table = pd.concat([head.set_axis(head.index.astype(object)), tail_row])
+        
+        result = pd.DataFrame({dimension: table.index, "rows": table[("rows", "")].to_numpy()})
+        for measure in measures:
+            for stat in stats:
+                if stat == "mean":
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        values = table[(measure, "sum")] / table[(measure, "count")].replace(0, np.nan)
+                else:
+                    values = table[(measure, stat)]
+                name = measure if len(stats) == 1 else f"{measure}_{stat}"
+                result[name] = values.to_numpy()
+        return result
+
+def build_cube(df: pd.DataFrame, max_categories: int = CUBE_MAX_CATEGORIES) -> AggregateCube:
+    """
+    Aggregate every numeric column by every categorical column.
+    
+    Each dimension costs one grouped pass over the rows that aggregates all
+    measures at once.
+    
+    Args:
+        df: Input DataFrame
+        max_categories: Largest number of values kept per dimension
+    
+    Returns:
+        AggregateCube: Cube of `df`
+    """
+    profile = get_profile(df)
+    measures = profile.numeric_columns()
+    dimensions = [column for column in df.columns
+                  if profile[column]["type"] == "categorical" and column not in measures]
+    tables = {}
+    if not measures:
+        return AggregateCube(tables, measures)
+    
+    for dimension in dimensions:
+        keys = df[dimension]
+        if profile[dimension]["distinct"] > max_categories:
+            top = column_top_values(df, dimension, max_categories)
+            keys = group_long_tail(keys, [value for value, _ in top["values"]])
+        
+        grouped = df[measures].groupby(keys, observed=True, sort=False)
+        table = grouped.agg(list(CUBE_STATS))
+        table.insert(0, ("rows", ""), grouped.size())
+        tables[dimension] = table
+    
+    return AggregateCube(tables, measures)
+
+@memoize
+def get_cube(df: pd.DataFrame) -> AggregateCube:
+    """Return the aggregate cube of a DataFrame, built once per dataset (see `build_cube`)."""
+    return build_cube(df)
+
+def find_breakdowns(cube: AggregateCube, query: str) -> List[Tuple[str, List[str]]]:
+    """
+    Find the "measure by dimension" breakdowns a question refers to.
+    
+    Args:
+        cube: Aggregate cube of the data
+        query: User's question
+    
+    Returns:
+        List of (dimension, measures) pairs for every cube dimension named in
+        the question, with the measures it names (all measures when none)
+    """
+    query = query.lower()
+    measures = [measure for measure in cube.measures if measure.lower() in query]
+    return [(dimension, measures or list(cube.measures))
+            for dimension in cube.dimensions if dimension.lower() in query]
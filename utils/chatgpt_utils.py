@@ -1,9 +1,16 @@
 import os
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List
 import openai
 from dotenv import load_dotenv
 import pandas as pd
-from config.settings import get_settings
+from config.settings import get_settings, CHART_TOP_K, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS
+from .sampling import is_approximate, population_size, approximate_column_stats
+from .profiling import get_profile
+from .aggregate_cube import get_cube, find_breakdowns
+from .correlation import strongest_relationships, describe_strength
+from .outliers import get_outliers
+from .result_cache import fingerprint_frame
+from .response_cache import RESPONSE_CACHE, response_key
 
 # Load environment variables
 load_dotenv()
@@ -33,7 +40,35 @@ def get_chatgpt_response(query: str, df: pd.DataFrame) -> str:
     Returns:
         str: ChatGPT's response
     """
+    return "".join(stream_chatgpt_response(query, df))
+
+def stream_chatgpt_response(query: str, df: pd.DataFrame) -> Iterator[str]:
+    """
+    Stream the response from ChatGPT piece by piece as it is generated.
+    
+    Answers about fully loaded data are kept in the on-disk response cache,
+    keyed by the normalized question, the model parameters and the dataset
+    fingerprint, so a repeated question is answered at once, in one piece,
+    without calling the API. An answer is cached only once it is complete.
+    
+    Args:
+        query: User's query in Azerbaijani
+        df: DataFrame containing the data
+        
+    Yields:
+        str: Consecutive pieces of the response (an error message on failure)
+    """
     try:
+        # Answers based on a sample of data still loading are not reused
+        parameters = {"temperature": LLM_TEMPERATURE, "max_tokens": LLM_MAX_TOKENS}
+        key = None
+        if not is_approximate(df):
+            key = response_key(query, LLM_MODEL, parameters, fingerprint_frame(df))
+            cached = RESPONSE_CACHE.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
         # Prepare the system message with context about the data
         system_message = prepare_system_message(df)
         
@@ -41,20 +76,29 @@ def get_chatgpt_response(query: str, df: pd.DataFrame) -> str:
         user_message = prepare_user_message(query, df)
         
         # Get response from ChatGPT
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        stream = client.chat.completions.create(
+            model=LLM_MODEL,
             messages=[
                 {"role": "system", "content": system_message},
                 {"role": "user", "content": user_message}
             ],
-            temperature=0.7,
-            max_tokens=500
+            stream=True,
+            **parameters
         )
         
-        return response.choices[0].message.content
+        pieces = []
+        for chunk in stream:
+            # The last chunk carries only the finish reason
+            piece = chunk.choices[0].delta.content if chunk.choices else None
+            if piece:
+                pieces.append(piece)
+                yield piece
+        
+        if key is not None and pieces:
+            RESPONSE_CACHE.put(key, "".join(pieces))
     
     except Exception as e:
-        return f"Xəta baş verdi: {str(e)}"
+        yield f"Xəta baş verdi: {str(e)}"
 
 def prepare_system_message(df: pd.DataFrame) -> str:
     """
@@ -66,27 +110,56 @@ def prepare_system_message(df: pd.DataFrame) -> str:
     Returns:
         str: System message
     """
-    # Get basic information about the DataFrame
-    num_rows = len(df)
+    # Get basic information about the DataFrame; a sample stands in for all rows seen so far
+    num_rows = population_size(df)
     num_cols = len(df.columns)
     column_info = []
+    profile = get_profile(df)
     
     for col in df.columns:
-        col_type = str(df[col].dtype)
-        unique_vals = df[col].nunique()
-        if pd.api.types.is_numeric_dtype(df[col]):
+        unique_vals = f"{'≈' if profile.approximate else ''}{profile[col]['distinct']}"
+        if "mean" in profile[col]:
             col_info = f"{col} (rəqəmsal): {unique_vals} unikal dəyər"
         else:
             col_info = f"{col} (mətn): {unique_vals} unikal dəyər"
         column_info.append(col_info)
     
+    relationships = strongest_relationships(df, top_n=CHART_TOP_K, min_abs=0.3)
+    relationship_info = ""
+    if relationships:
+        pairs = [f"{pair['x']} – {pair['y']}: r = {pair['r']:.2f} ({describe_strength(pair['r'])})"
+                 for pair in relationships]
+        relationship_info = f"""- Güclü əlaqələr (Pirson korrelyasiyası):
+{chr(10).join(pairs)}
+"""
+
+    outlier_lines = get_outliers(df).summary_lines()
+    outlier_info = ""
+    if outlier_lines:
+        outlier_info = f"""- Anomal dəyərlər (IQR / MAD qaydası üzrə say):
+{chr(10).join(outlier_lines)}
+"""
+
+    approximate_info = ""
+    if is_approximate(df):
+        estimates = [
+            f"{col}: ortalama ≈ {stats['mean']:,.2f} ± {stats['mean_error']:,.2f}, "
+            f"cəm ≈ {stats['total']:,.0f} ± {stats['total_error']:,.0f}"
+            for col, stats in approximate_column_stats(df).items()
+        ]
+        approximate_info = f"""- Qeyd: Məlumatlar hələ yüklənir. Statistika oxunmuş {num_rows} sətirdən götürülmüş {len(df)} sətirlik
+  təsadüfi seçməyə əsaslanır və təxminidir (95% etibarlılıq intervalı ilə). Cavabında bunu qeyd et.
+- Təxmini göstəricilər:
+{chr(10).join(estimates)}
+"""
+
     system_message = f"""Sən Excel məlumatlarını analiz edən Azərbaycan dilində chatbot-san. 
 Məlumatlar haqqında məlumat:
 - Ümumi sətir sayı: {num_rows}
-- Sütun sayı: {num_cols}
+{approximate_info}- Sütun sayı: {num_cols}
 - Sütunlar:
 {chr(10).join(column_info)}
-
+{relationship_info}{outlier_info}
 Sənin vəzifən:
 1. İstifadəçinin sualını başa düşmək
 2. Məlumatları analiz etmək
@@ -117,11 +190,23 @@ def prepare_user_message(query: str, df: pd.DataFrame) -> str:
     # Get a sample of the data (first 5 rows) to provide context
     sample_data = df.head().to_string()
     
+    # Breakdowns the question asks about ("X by Y") are read from the aggregate cube
+    cube = get_cube(df)
+    breakdowns = [
+        f"{', '.join(measures)} — {dimension} üzrə (cəm, ortalama):\n"
+        + cube.breakdown(dimension, measures, top_k=CHART_TOP_K).to_string(index=False)
+        for dimension, measures in find_breakdowns(cube, query)
+    ]
+    breakdown_info = ""
+    if breakdowns:
+        scope = "təsadüfi seçmə üzrə" if is_approximate(df) else "bütün məlumatlar üzrə"
+        breakdown_info = f"\nQruplaşdırılmış göstəricilər ({scope}):\n" + "\n\n".join(breakdowns) + "\n"
+    
     user_message = f"""İstifadəçi sualı: {query}
 
 Məlumatların nümunəsi (ilk 5 sətir):
 {sample_data}
-
+{breakdown_info}
 Zəhmət olmasa, bu suala Azərbaycan dilində cavab ver və lazım olduqda vizualizasiya təklif et."""
     
     return user_message
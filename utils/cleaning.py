@@ -0,0 +1,388 @@
+import numpy as np
+import pandas as pd
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from config.settings import (
+    CLEANING_TEXT_FILL, CLEANING_DECIMALS, CLEANING_DERIVED_RATIOS, CLEANING_SORT_COLUMN
+)
+from .profiling import get_profile
+from .type_inference import infer_column_type, coerce_column
+from .heavy_hitters import OTHER_LABEL
+from .row_hash import RowHashIndex, get_row_index, register_row_index
+from .near_duplicates import near_duplicate_clusters, cluster_mapping
+from .text_utils import normalize_text
+
+class CleaningStep(ABC):
+    """
+    One declarative step of a cleaning pipeline.
+    
+    Column steps (`row_step` False) override `apply` and rewrite single
+    columns in one pass over the columns they touch. Row steps override
+    `select` and/or `order`: they only choose which rows are kept and in
+    what order, and are applied together with a single row selection at the
+    end. Every step reports itself with `describe`.
+    """
+    
+    row_step = False
+    # Set by row steps that hash every column of every row, so the cleaned
+    # frame can inherit the row-hash index of the input
+    hashes_rows = False
+    
+    def apply(self, columns: Dict[str, pd.Series]) -> int:
+        """
+        Rewrite columns of the mapping in place.
+        
+        Args:
+            columns: Column name to values; changed columns are replaced
+        
+        Returns:
+            int: Number of values changed
+        """
+        return 0
+    
+    def select(self, df: pd.DataFrame, keep: np.ndarray) -> int:
+        """
+        Clear the `keep` flags of the rows the step drops.
+        
+        Args:
+            df: Frame after the column steps
+            keep: One flag per row of `df`, updated in place
+        
+        Returns:
+            int: Number of kept rows the step dropped
+        """
+        return 0
+    
+    def order(self, df: pd.DataFrame, positions: np.ndarray) -> np.ndarray:
+        """
+        Reorder the positions of the kept rows.
+        
+        Args:
+            df: Frame after the column steps
+            positions: Row positions of `df` kept so far, in their current order
+        
+        Returns:
+            np.ndarray: The same positions in the step's order
+        """
+        return positions
+    
+    @abstractmethod
+    def describe(self, count: int) -> Optional[str]:
+        """Report line of the step given its count, or None when there is nothing to report."""
+
+class CoerceNumbers(CleaningStep):
+    """Convert columns of numbers stored as text to numeric dtype."""
+    
+    def __init__(self, inferences: Dict[str, Dict[str, Any]]):
+        self.inferences = inferences
+    
+    def apply(self, columns: Dict[str, pd.Series]) -> int:
+        converted = 0
+        for column, inference in self.inferences.items():
+            values = coerce_column(columns[column], inference)
+            if pd.api.types.is_object_dtype(values):
+                values = pd.to_numeric(values, errors="coerce")
+            columns[column] = values
+            converted += int(values.notna().sum())
+        return converted
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ Mətn kimi saxlanmış {count} rəqəm ədədə çevrildi" if count else None
+
+class FillMissing(CleaningStep):
+    """Fill missing values column by column."""
+    
+    def __init__(self, values: Dict[str, Any]):
+        self.values = values
+    
+    def apply(self, columns: Dict[str, pd.Series]) -> int:
+        filled = 0
+        for column, value in self.values.items():
+            series = columns[column]
+            missing = series.isna()
+            count = int(missing.sum())
+            if not count:
+                continue
+            # Categorical columns only accept fill values that are known categories
+            if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+                series = series.cat.add_categories([value])
+            columns[column] = series.mask(missing, value)
+            filled += count
+        return filled
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ {count} boş dəyər dolduruldu" if count else None
+
+class TrimText(CleaningStep):
+    """Strip surrounding whitespace from the text values of columns."""
+    
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+    
+    def apply(self, columns: Dict[str, pd.Series]) -> int:
+        trimmed = 0
+        for column in self.columns:
+            series = columns[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Strip the categories once instead of every row
+                categories = series.cat.categories
+                stripped = pd.Index([_strip(value) for value in categories])
+                if stripped.equals(categories):
+                    continue
+                merged = stripped.unique()
+                remap = merged.get_indexer(stripped)
+                codes = series.cat.codes.to_numpy()
+                trimmed += int(np.isin(codes, np.flatnonzero(stripped != categories)).sum())
+                columns[column] = pd.Series(
+                    pd.Categorical.from_codes(np.where(codes >= 0, remap[codes], -1), categories=merged),
+                    index=series.index, name=series.name
+                )
+            else:
+                stripped = series.str.strip()
+                changed = stripped.notna() & stripped.ne(series)
+                count = int(changed.sum())
+                if count:
+                    columns[column] = series.mask(changed, stripped)
+                    trimmed += count
+        return trimmed
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ {count} mətn dəyərində artıq boşluqlar silindi" if count else None
+
+class MergeNearDuplicates(CleaningStep):
+    """Replace near-duplicate text values with the canonical value of their cluster."""
+    
+    def __init__(self, mappings: Dict[str, Dict[str, Any]]):
+        self.mappings = mappings
+    
+    def apply(self, columns: Dict[str, pd.Series]) -> int:
+        merged = 0
+        for column, mapping in self.mappings.items():
+            series = columns[column]
+            # Each distinct value is looked up once and the result spread by code
+            codes, uniques = pd.factorize(series)
+            replaced = np.array([mapping.get(normalize_text(value), value) for value in uniques], dtype=object)
+            changed = np.flatnonzero(replaced != uniques.astype(object))
+            if not len(changed):
+                continue
+            values = pd.Series(replaced[codes], index=series.index, name=series.name).where(codes >= 0)
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                values = values.astype("category")
+            columns[column] = values
+            merged += int(np.isin(codes, changed).sum())
+        return merged
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ {count} oxşar dəyər birləşdirildi" if count else None
+
+class RoundNumbers(CleaningStep):
+    """Round numeric columns to a number of decimals."""
+    
+    def __init__(self, columns: Sequence[str], decimals: int = CLEANING_DECIMALS):
+        self.columns = list(columns)
+        self.decimals = decimals
+    
+    def apply(self, columns: Dict[str, pd.Series]) -> int:
+        rounded = 0
+        for column in self.columns:
+            series = columns[column]
+            values = series.round(self.decimals)
+            changed = int((values.ne(series) & series.notna()).sum())
+            if changed:
+                columns[column] = values
+                rounded += changed
+        return rounded
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ {count} rəqəmsal dəyər yuvarlaqlaşdırıldı" if count else None
+
+class DeriveRatio(CleaningStep):
+    """Add a percentage column computed from two numeric columns."""
+    
+    def __init__(self, name: str, numerator: str, denominator: str, decimals: int = CLEANING_DECIMALS):
+        self.name = name
+        self.numerator = numerator
+        self.denominator = denominator
+        self.decimals = decimals
+    
+    def apply(self, columns: Dict[str, pd.Series]) -> int:
+        denominator = columns[self.denominator].astype(float).replace(0, np.nan)
+        ratio = (columns[self.numerator].astype(float) / denominator * 100).round(self.decimals)
+        columns[self.name] = ratio.rename(self.name)
+        return int(ratio.notna().sum())
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ {self.name} hesablandı"
+
+class DropDuplicates(CleaningStep):
+    """Drop rows that repeat an earlier row."""
+    
+    row_step = True
+    
+    def __init__(self, subset: Optional[Sequence[str]] = None):
+        self.subset = subset
+        self.hashes_rows = subset is None
+    
+    def select(self, df: pd.DataFrame, keep: np.ndarray) -> int:
+        index = get_row_index(df) if self.subset is None else RowHashIndex.from_frame(df, self.subset)
+        duplicated = index.duplicated()
+        count = int((duplicated & keep).sum())
+        keep &= ~duplicated
+        return count
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ {count} təkrarlanan qeyd silindi" if count else None
+
+class SortRows(CleaningStep):
+    """Order rows by one column, missing values last."""
+    
+    row_step = True
+    
+    def __init__(self, column: str, ascending: bool = False):
+        self.column = column
+        self.ascending = ascending
+    
+    def order(self, df: pd.DataFrame, positions: np.ndarray) -> np.ndarray:
+        keys = df[self.column].iloc[positions].reset_index(drop=True)
+        ranked = keys.sort_values(ascending=self.ascending, kind="stable", na_position="last")
+        return positions[ranked.index.to_numpy()]
+    
+    def describe(self, count: int) -> Optional[str]:
+        return f"✅ Məlumatlar {self.column} sütununa görə sıralandı"
+
+class CleaningPipeline:
+    """
+    Planned sequence of cleaning steps executed with as few full-frame passes as possible.
+    
+    Column steps run in order on a mapping of columns, so each touched
+    column is rewritten without copying the rest of the frame. Row steps
+    then narrow and order one array of row positions, and the result is
+    materialized with a single `take`. Every step counts its effect in the
+    same pass that applies it.
+    """
+    
+    def __init__(self, steps: List[CleaningStep]):
+        self.steps = steps
+    
+    def run(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """
+        Execute the pipeline.
+        
+        Args:
+            df: Input DataFrame (left unchanged)
+        
+        Returns:
+            Tuple of the cleaned DataFrame and one report per step with the
+            `step` name, its `count` and the `message` shown to the user
+            (None when the step changed nothing)
+        """
+        counts = {}
+        columns = dict(df.items())
+        for idx, step in enumerate(self.steps):
+            if not step.row_step:
+                counts[idx] = step.apply(columns)
+        cleaned = pd.DataFrame(columns, copy=False)
+        
+        # Every row step drops rows first, then the kept rows are ordered
+        row_steps = [(idx, step) for idx, step in enumerate(self.steps) if step.row_step]
+        keep = np.ones(len(cleaned), dtype=bool)
+        for idx, step in row_steps:
+            counts[idx] = step.select(cleaned, keep)
+        positions = np.flatnonzero(keep)
+        for _, step in row_steps:
+            positions = step.order(cleaned, positions)
+        if len(positions) != len(cleaned) or not np.array_equal(positions, np.arange(len(cleaned))):
+            hashed = cleaned
+            cleaned = cleaned.take(positions)
+            if any(step.hashes_rows for _, step in row_steps):
+                # The hashes of the kept rows describe the cleaned frame as well
+                register_row_index(cleaned, get_row_index(hashed).take(positions))
+        
+        report = [
+            {"step": type(step).__name__, "count": counts[idx], "message": step.describe(counts[idx])}
+            for idx, step in enumerate(self.steps)
+        ]
+        return cleaned, report
+
+def plan_cleaning(df: pd.DataFrame,
+                  merge_clusters: Optional[Dict[str, Sequence[str]]] = None) -> CleaningPipeline:
+    """
+    Plan the cleaning of any DataFrame from its profile.
+    
+    Fill values follow the profile type of each column: missing numbers are
+    filled with 0, missing categories with "Digər" and missing free text
+    with `CLEANING_TEXT_FILL`. Columns typed numeric but stored as text are
+    converted to numbers first, so their blanks (and values that are not
+    numbers) are filled with 0 as well; missing dates are kept. Text is
+    trimmed, floats are rounded to `CLEANING_DECIMALS`, the ratios of
+    `CLEANING_DERIVED_RATIOS` are added when their source columns exist,
+    duplicate rows are dropped and rows are sorted by `CLEANING_SORT_COLUMN`
+    (or the first numeric column) in descending order. Chosen clusters of
+    near-duplicate text values are merged before duplicates are dropped.
+    
+    Args:
+        df: Input DataFrame
+        merge_clusters: Per text column, the canonical values of the
+            near-duplicate clusters (see `find_near_duplicates`) whose
+            variants are replaced with the canonical value; other clusters
+            are left alone
+    
+    Returns:
+        CleaningPipeline: Planned steps
+    """
+    profile = get_profile(df)
+    text = profile.text_columns()
+    inferred = df.attrs.get("column_types", {})
+    stored_as_text = {
+        column: inferred[column] if column in inferred and inferred[column]["formats"]
+        else infer_column_type(df[column])
+        for column in df.columns
+        if profile[column]["type"] == "numeric" and pd.api.types.is_object_dtype(df[column])
+    }
+    numeric = [column for column in profile.numeric_columns()
+               if pd.api.types.is_numeric_dtype(df[column])] + list(stored_as_text)
+    
+    fill_values = {}
+    for column in df.columns:
+        if column in stored_as_text:
+            # Values that do not parse as numbers become missing during conversion
+            fill_values[column] = 0
+        elif not profile[column]["nulls"]:
+            continue
+        elif column in numeric:
+            fill_values[column] = 0
+        elif column in text:
+            fill_values[column] = OTHER_LABEL if profile[column]["type"] == "categorical" else CLEANING_TEXT_FILL
+    
+    steps: List[CleaningStep] = []
+    if stored_as_text:
+        steps.append(CoerceNumbers(stored_as_text))
+    if fill_values:
+        steps.append(FillMissing(fill_values))
+    if text:
+        steps.append(TrimText(text))
+    if merge_clusters:
+        mappings = {
+            column: cluster_mapping([cluster for cluster in near_duplicate_clusters(df, column)
+                                     if cluster["canonical"] in merge_clusters[column]])
+            for column in text if column in merge_clusters
+        }
+        mappings = {column: mapping for column, mapping in mappings.items() if mapping}
+        if mappings:
+            steps.append(MergeNearDuplicates(mappings))
+    floats = [column for column in numeric
+              if column in stored_as_text or pd.api.types.is_float_dtype(df[column])]
+    if floats:
+        steps.append(RoundNumbers(floats))
+    for name, (numerator, denominator) in CLEANING_DERIVED_RATIOS.items():
+        if numerator in numeric and denominator in numeric:
+            steps.append(DeriveRatio(name, numerator, denominator))
+    steps.append(DropDuplicates())
+    sort_column = CLEANING_SORT_COLUMN if CLEANING_SORT_COLUMN in numeric else next(iter(numeric), None)
+    if sort_column is not None:
+        steps.append(SortRows(sort_column))
+    return CleaningPipeline(steps)
+
+def _strip(value: Any) -> Any:
+    """Strip a string value; other values are returned as they are."""
+    return value.strip() if isinstance(value, str) else value
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+from config.settings import CORRELATION_BLOCK_SIZE, CORRELATION_MIN_PERIODS
+from .profiling import get_profile
+from .result_cache import memoize
+
+CORRELATION_METHODS = ("pearson", "spearman")
+
+def correlation_matrix(df: pd.DataFrame, method: str = "pearson",
+                       block_size: int = CORRELATION_BLOCK_SIZE,
+                       min_periods: int = CORRELATION_MIN_PERIODS) -> pd.DataFrame:
+    """
+    Compute pairwise correlations between the numeric columns of a DataFrame.
+    
+    Missing values are handled pairwise: each pair uses the rows where both
+    columns have a value, as `DataFrame.corr` does. All sums needed for the
+    pairs of a block of columns come from a few matrix products, and wide
+    sheets are processed block by block so memory stays bounded. Spearman
+    correlation is Pearson correlation of the ranks, each column ranked over
+    its own non-missing values.
+    
+    Args:
+        df: Input DataFrame
+        method: "pearson" or "spearman"
+        block_size: Number of columns processed together
+        min_periods: Minimum number of shared rows for a pair to get a value
+    
+    Returns:
+        pd.DataFrame: Symmetric correlation matrix indexed by column name;
+        pairs with too few shared rows or a constant column are NaN
+    
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Naməlum korrelyasiya metodu: {method}")
+    
+    columns = get_profile(df).numeric_columns()
+    data = df[columns].astype(float)
+    if method == "spearman":
+        data = data.rank(method="average")
+    values = data.to_numpy()
+    
+    # Centring on the column means keeps the sums of squares well conditioned
+    present = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        centred = np.where(present, values - np.nanmean(values, axis=0), 0.0) if values.size else values
+    weights = present.astype(float)
+    
+    result = np.full((len(columns), len(columns)), np.nan)
+    for start in range(0, len(columns), block_size):
+        rows = slice(start, start + block_size)
+        for other in range(start, len(columns), block_size):
+            cols = slice(other, other + block_size)
+            block = _pairwise_pearson(centred[:, rows], weights[:, rows],
+                                      centred[:, cols], weights[:, cols], min_periods)
+            result[rows, cols] = block
+            result[cols, rows] = block.T
+    
+    return pd.DataFrame(result, index=columns, columns=columns)
+
+@memoize
+def get_correlations(df: pd.DataFrame, method: str = "pearson") -> pd.DataFrame:
+    """Cached `correlation_matrix` of a DataFrame, computed once per dataset and method."""
+    return correlation_matrix(df, method)
+
+def strongest_relationships(df: pd.DataFrame, method: str = "pearson", top_n: Optional[int] = 5,
+                            min_abs: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    Rank column pairs by the strength of their correlation.
+    
+    Args:
+        df: Input DataFrame
+        method: "pearson" or "spearman"
+        top_n: Number of pairs returned (None for all)
+        min_abs: Smallest absolute correlation returned
+    
+    Returns:
+        List of dicts with the columns `x` and `y`, the correlation `r` and
+        the `method`, strongest (largest |r|) first
+    """
+    matrix = get_correlations(df, method)
+    upper = np.triu(np.ones(matrix.shape, dtype=bool), k=1)
+    pairs = matrix.where(upper).stack().dropna()
+    pairs = pairs[pairs.abs() >= min_abs]
+    pairs = pairs.reindex(pairs.abs().sort_values(ascending=False, kind="stable").index)
+    if top_n is not None:
+        pairs = pairs.head(top_n)
+    return [{"x": x, "y": y, "r": float(r), "method": method} for (x, y), r in pairs.items()]
+
+def describe_strength(r: float) -> str:
+    """Describe the strength and direction of a correlation coefficient in Azerbaijani."""
+    strength = abs(r)
+    if strength >= 0.7:
+        label = "güclü"
+    elif strength >= 0.4:
+        label = "orta"
+    elif strength >= 0.2:
+        label = "zəif"
+    else:
+        label = "çox zəif"
+    direction = "müsbət" if r >= 0 else "mənfi"
+    return f"{label} {direction}"
+
+def _pairwise_pearson(x: np.ndarray, x_present: np.ndarray, y: np.ndarray, y_present: np.ndarray,
+                      min_periods: int) -> np.ndarray:
+    """Pearson correlation of every column of x with every column of y over their shared rows."""
+    count = x_present.T @ y_present
+    sum_x = x.T @ y_present
+    sum_y = x_present.T @ y
+    sum_xx = (x * x).T @ y_present
+    sum_yy = x_present.T @ (y * y)
+    sum_xy = x.T @ y
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = sum_xy - sum_x * sum_y / count
+        variance_x = sum_xx - sum_x * sum_x / count
+        variance_y = sum_yy - sum_y * sum_y / count
+        r = covariance / np.sqrt(variance_x * variance_y)
+    
+    r[(count < min_periods) | ~(variance_x > 0) | ~(variance_y > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
@@ -1,13 +1,59 @@
 import pandas as pd
 import numpy as np
-from typing import Union, Dict, Any
+import shutil
+import tempfile
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from numbers import Number
+from pathlib import Path
+from typing import Union, Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple
+from openpyxl import load_workbook
+from config.settings import (
+    STREAM_BATCH_SIZE, CATEGORY_MAX_RATIO, MAX_PARSE_WORKERS, TEMP_DIR, XLSX_ENGINE,
+    MAX_FILE_SIZE, MAX_UNCOMPRESSED_SIZE, MAX_PARSE_CELLS, SAMPLE_ROWS,
+    PARSE_BYTES_PER_SECOND, MEMORY_BYTES_PER_CELL, PREVIEW_ROWS, RESERVOIR_SIZE, SKETCH_MIN_ROWS
+)
+from .xlsx_reader import iter_xlsx_rows, list_xlsx_sheets, inspect_xlsx_archive
+from .workbook_cache import compute_file_hash, make_cache_key, load_cached_frame, save_cached_frame
+from .sampling import ReservoirSample
+from .upload_spool import MappedUpload
+from .type_inference import infer_and_coerce_types
+from .profiling import get_profile
+from .result_cache import memoize
+from .partial_stats import PartialStats, compute_partial_stats
+from .process_pool import get_process_pool, reset_process_pool
 
-def process_excel_file(file: Any) -> pd.DataFrame:
+XLSX_SIGNATURE = b"PK\x03\x04"
+XML_BYTES_PER_CELL = 40  # Typical size of a <c> element, used when a sheet has no usable <dimension>
+
+# Background ingestion runs in threads; the heavy parsing itself happens in
+# the shared worker process pool
+_INGEST_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="excel-ingest")
+
+def process_excel_file(file: Any, streaming: bool = False,
+                       batch_size: int = STREAM_BATCH_SIZE, use_cache: bool = False,
+                       sheet_name: Optional[str] = None, engine: str = XLSX_ENGINE,
+                       max_rows: Optional[int] = None) -> pd.DataFrame:
     """
     Process uploaded Excel file and return a pandas DataFrame.
     
+    Blank cells stay missing values instead of being replaced, so numeric
+    columns keep a numeric dtype. Every column is stored in its most compact
+    safe dtype and the per-column savings are kept in
+    `df.attrs["memory_report"]`.
+    
     Args:
         file: Uploaded file object from Streamlit
+        streaming: Read .xlsx files in fixed-size row batches instead of
+            loading the whole workbook at once
+        batch_size: Number of rows per batch in streaming mode
+        use_cache: Look the file up by content hash in the parsed-workbook
+            cache and store the result there on a miss
+        sheet_name: Sheet to read; the first sheet is used by default
+        engine: .xlsx row reader, "openpyxl" or "native" (the native reader
+            always streams)
+        max_rows: Read at most this many data rows (sampled mode)
         
     Returns:
         pd.DataFrame: Processed DataFrame
@@ -16,46 +62,726 @@ def process_excel_file(file: Any) -> pd.DataFrame:
         ValueError: If file cannot be processed
     """
     try:
-        df = pd.read_excel(file)
+        if use_cache:
+            cache_key = make_cache_key(compute_file_hash(file), sheet=sheet_name, max_rows=max_rows,
+                                       streaming=streaming, engine=engine)
+            cached = load_cached_frame(cache_key)
+            if cached is not None:
+                return cached
         
-        # Basic data cleaning
-        df = df.replace([np.inf, -np.inf], np.nan)
-        df = df.fillna("")
+        df = _read_sheet(file, sheet_name, streaming, batch_size, engine, max_rows)
         
-        # Convert column names to string
-        df.columns = df.columns.astype(str)
+        if use_cache:
+            save_cached_frame(cache_key, df)
         
         return df
     except Exception as e:
         raise ValueError(f"Excel faylı emal edilə bilmədi: {str(e)}")
 
+def process_excel_workbook(file: Any, streaming: bool = False,
+                           batch_size: int = STREAM_BATCH_SIZE, use_cache: bool = False,
+                           max_workers: int = MAX_PARSE_WORKERS, engine: str = XLSX_ENGINE,
+                           max_rows: Optional[int] = None,
+                           progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                           on_batch: Optional[Callable[[str, pd.DataFrame], None]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Process every sheet of an Excel workbook, parsing sheets in parallel.
+    
+    Sheets are parsed concurrently in the shared worker pool
+    (`get_process_pool`), so ingest time scales with the number of cores
+    instead of the number of sheets. Cached sheets are loaded directly and
+    never reach the pool, and the first remaining sheet is parsed in the
+    calling process alongside the pool.
+    
+    Args:
+        file: Uploaded file object from Streamlit
+        streaming: Read .xlsx sheets in fixed-size row batches
+        batch_size: Number of rows per batch in streaming mode
+        use_cache: Use the parsed-workbook cache for each sheet
+        max_workers: 1 parses every sheet in this process; otherwise sheets
+            are spread over the shared worker pool
+        engine: .xlsx row reader, "openpyxl" or "native"
+        max_rows: Read at most this many data rows per sheet (sampled mode)
+        progress_callback: Called as `(completed, total, sheet_name)` after
+            each sheet is ready
+        on_batch: Called as `(sheet_name, batch)` with the cleaned row batches
+            of sheets parsed in this process (the first sheet that is not
+            cached is always parsed here), and once with the whole frame of
+            every cached sheet or sheet parsed by the pool
+        
+    Returns:
+        Dict mapping sheet names to processed DataFrames, in workbook order
+        
+    Raises:
+        ValueError: If the workbook cannot be processed
+    """
+    temp_path = None
+    try:
+        sheet_names = get_sheet_names(file)
+        total = len(sheet_names)
+        sheets: Dict[str, pd.DataFrame] = {}
+        cache_keys: Dict[str, str] = {}
+        
+        def sheet_done(sheet_name: str, df: pd.DataFrame, streamed: bool = False):
+            sheets[sheet_name] = df
+            if on_batch is not None and not streamed:
+                on_batch(sheet_name, df)
+            if progress_callback is not None:
+                progress_callback(len(sheets), total, sheet_name)
+        
+        if use_cache:
+            file_hash = compute_file_hash(file)
+            for sheet_name in sheet_names:
+                cache_keys[sheet_name] = make_cache_key(file_hash, sheet=sheet_name, max_rows=max_rows,
+                                                        streaming=streaming, engine=engine)
+                cached = load_cached_frame(cache_keys[sheet_name])
+                if cached is not None:
+                    sheet_done(sheet_name, cached)
+        
+        pending = [name for name in sheet_names if name not in sheets]
+        # The first pending sheet is parsed in this process, so `on_batch` can see
+        # its rows as they stream, while the pool works on the remaining sheets
+        local, remote = (pending, []) if max_workers <= 1 else (pending[:1], pending[1:])
+        futures = {}
+        executor = None
+        try:
+            if remote:
+                # Workers open the workbook from disk instead of receiving a copy of the bytes;
+                # a spooled upload is already on disk and is opened by path
+                source = file.name if isinstance(file, MappedUpload) else file
+                if hasattr(source, "read"):
+                    temp_path = _write_temp_copy(file)
+                    source = temp_path
+                executor = get_process_pool()
+                futures = {
+                    executor.submit(_read_sheet, source, sheet_name, streaming, batch_size, engine, max_rows): sheet_name
+                    for sheet_name in remote
+                }
+            
+            for sheet_name in local:
+                sheet_batch = None
+                if on_batch is not None:
+                    sheet_batch = lambda batch, name=sheet_name: on_batch(name, batch)
+                sheet_done(sheet_name, _read_sheet(file, sheet_name, streaming, batch_size,
+                                                   engine, max_rows, on_batch=sheet_batch),
+                           streamed=on_batch is not None)
+            for future in as_completed(futures):
+                sheet_done(futures[future], future.result())
+        except BrokenProcessPool:
+            # A worker died; the next upload starts with a fresh pool
+            reset_process_pool(executor)
+            raise
+        finally:
+            # Sheets still queued after a failure are not worth parsing
+            for future in futures:
+                future.cancel()
+        
+        if use_cache:
+            for sheet_name in pending:
+                save_cached_frame(cache_keys[sheet_name], sheets[sheet_name])
+        
+        return {sheet_name: sheets[sheet_name] for sheet_name in sheet_names}
+    except Exception as e:
+        raise ValueError(f"Excel faylı emal edilə bilmədi: {str(e)}")
+    finally:
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+
+def inspect_workbook(file: Any) -> Dict[str, Any]:
+    """
+    Estimate the cost of parsing a workbook before any cell is read.
+    
+    Only the zip central directory and the `<dimension>` tag of each sheet are
+    read. Workbooks over `MAX_FILE_SIZE` or `MAX_UNCOMPRESSED_SIZE` are
+    rejected; workbooks with a sheet over `MAX_PARSE_CELLS` cells are
+    downgraded to sampled mode, which reads the first `SAMPLE_ROWS` rows.
+    
+    Args:
+        file: File path or binary file-like object
+        
+    Returns:
+        Dict with file sizes, per-sheet rows, columns, sizes and estimates,
+        total estimated parse seconds and memory, the chosen `mode`
+        ("full", "sampled" or "rejected"), the `max_rows` to parse with and
+        the `reason` for a downgrade or rejection
+    """
+    inspection = {
+        "file_size": _file_size(file),
+        "uncompressed_size": None,
+        "sheets": [],
+        "estimated_seconds": None,
+        "estimated_memory": None,
+        "mode": "full",
+        "max_rows": None,
+        "reason": None
+    }
+    
+    if inspection["file_size"] > MAX_FILE_SIZE:
+        inspection["mode"] = "rejected"
+        inspection["reason"] = (f"Fayl çox böyükdür: {inspection['file_size'] / 1024 ** 2:.1f} MB "
+                                f"(maksimum {MAX_FILE_SIZE / 1024 ** 2:.0f} MB)")
+        return inspection
+    
+    # Legacy .xls files have no zip directory to inspect
+    if not is_xlsx_file(file):
+        return inspection
+    
+    _rewind(file)
+    archive = inspect_xlsx_archive(file)
+    _rewind(file)
+    inspection["uncompressed_size"] = archive["uncompressed_size"]
+    
+    for sheet in archive["sheets"]:
+        if sheet["rows"] is not None:
+            cells = sheet["rows"] * sheet["columns"]
+        else:
+            cells = sheet["uncompressed_size"] // XML_BYTES_PER_CELL
+        inspection["sheets"].append({
+            **sheet,
+            "cells": cells,
+            "estimated_seconds": sheet["uncompressed_size"] / PARSE_BYTES_PER_SECOND,
+            "estimated_memory": cells * MEMORY_BYTES_PER_CELL
+        })
+    
+    inspection["estimated_seconds"] = (
+        archive["shared_strings_size"] / PARSE_BYTES_PER_SECOND
+        + sum(sheet["estimated_seconds"] for sheet in inspection["sheets"])
+    )
+    inspection["estimated_memory"] = sum(sheet["estimated_memory"] for sheet in inspection["sheets"])
+    
+    largest = max(inspection["sheets"], key=lambda sheet: sheet["cells"], default=None)
+    if archive["uncompressed_size"] > MAX_UNCOMPRESSED_SIZE:
+        inspection["mode"] = "rejected"
+        inspection["reason"] = (f"Faylın açılmış həcmi çox böyükdür: "
+                                f"{archive['uncompressed_size'] / 1024 ** 2:,.0f} MB "
+                                f"(maksimum {MAX_UNCOMPRESSED_SIZE / 1024 ** 2:,.0f} MB)")
+    elif largest is not None and largest["cells"] > MAX_PARSE_CELLS:
+        inspection["mode"] = "sampled"
+        inspection["max_rows"] = SAMPLE_ROWS
+        inspection["reason"] = (f"'{largest['name']}' vərəqində təxminən {largest['cells']:,} xana var; "
+                                f"hər vərəqdən yalnız ilk {SAMPLE_ROWS:,} sətir oxunacaq")
+    
+    return inspection
+
+def read_excel_preview(file: Any, nrows: int = PREVIEW_ROWS, engine: str = XLSX_ENGINE) -> pd.DataFrame:
+    """
+    Read the header and first rows of the first sheet for an instant preview.
+    
+    Only the first `nrows` rows are parsed, so the preview is ready long before
+    the full workbook. The result is marked with `df.attrs["preview"]`.
+    
+    Args:
+        file: Uploaded file object from Streamlit
+        nrows: Number of data rows to read
+        engine: .xlsx row reader, "openpyxl" or "native"
+        
+    Returns:
+        pd.DataFrame: Processed preview DataFrame
+        
+    Raises:
+        ValueError: If file cannot be processed
+    """
+    try:
+        df = _read_sheet(file, None, True, nrows, engine, max_rows=nrows)
+    except Exception as e:
+        raise ValueError(f"Excel faylı emal edilə bilmədi: {str(e)}")
+    finally:
+        _rewind(file)
+    
+    df.attrs.pop("sampled_rows", None)
+    df.attrs["preview"] = True
+    return df
+
+def start_workbook_ingest(file: Any, sample_size: int = RESERVOIR_SIZE,
+                          close_file: bool = False, **options: Any) -> Dict[str, Any]:
+    """
+    Run `process_excel_workbook` in a background thread.
+    
+    A uniform reservoir sample of every sheet is kept in `progress["samples"]`
+    so the UI can show approximate results before the full pass completes.
+    The sheet parsed in this process is sampled batch by batch as it streams
+    in; cached sheets and sheets parsed by the pool are sampled once ready.
+    Samples get the column types and compact dtypes of the full parse.
+    
+    The caller owns `file` only until this returns; pass an object the
+    background thread can keep reading from, such as one returned by
+    `spool_upload`.
+    
+    Args:
+        file: File path or binary file-like object
+        sample_size: Rows kept in the reservoir sample of each sheet
+        close_file: Close `file` as soon as parsing finishes, releasing its buffer
+        **options: Keyword arguments for `process_excel_workbook`
+        
+    Returns:
+        Dict with the `future` resolving to the sheets dict and a `progress`
+        dict holding `completed`, `total`, the last finished `sheet`, the
+        `samples` (a `ReservoirSample` per sheet name) and the `sample` of
+        the first sheet (None for a workbook without sheets)
+    """
+    samples = {sheet_name: ReservoirSample(sample_size, prepare=_prepare_sample)
+               for sheet_name in get_sheet_names(file)}
+    progress = {"completed": 0, "total": None, "sheet": None, "samples": samples,
+                "sample": next(iter(samples.values()), None)}
+    
+    def update_progress(completed: int, total: int, sheet_name: str):
+        progress.update(completed=completed, total=total, sheet=sheet_name)
+    
+    def collect_sample(sheet_name: str, batch: pd.DataFrame):
+        samples[sheet_name].add(batch)
+    
+    future: Future = _INGEST_EXECUTOR.submit(
+        process_excel_workbook, file, progress_callback=update_progress,
+        on_batch=collect_sample, **options
+    )
+    if close_file:
+        future.add_done_callback(lambda _: file.close())
+    return {"future": future, "progress": progress}
+
+def _prepare_sample(sample: pd.DataFrame) -> pd.DataFrame:
+    """Give a reservoir sample the column types and compact dtypes of the full parse."""
+    sample, column_types = infer_and_coerce_types(sample)
+    sample, _ = compact_dtypes(sample)
+    sample.attrs["column_types"] = column_types
+    return sample
+
+def get_sheet_names(file: Any) -> List[str]:
+    """
+    List the sheet names of an Excel workbook without reading any cells.
+    
+    Args:
+        file: File path or binary file-like object
+        
+    Returns:
+        List of sheet names in workbook order
+    """
+    _rewind(file)
+    if is_xlsx_file(file):
+        # Only xl/workbook.xml is read; openpyxl would also load shared strings and styles
+        names = list_xlsx_sheets(file)
+    else:
+        with pd.ExcelFile(file) as workbook:
+            names = [str(name) for name in workbook.sheet_names]
+    _rewind(file)
+    return names
+
+def _read_sheet(file: Any, sheet_name: Optional[str], streaming: bool, batch_size: int,
+                engine: str = XLSX_ENGINE, max_rows: Optional[int] = None,
+                on_batch: Optional[Callable[[pd.DataFrame], None]] = None) -> pd.DataFrame:
+    """Read, clean and compact a single sheet, passing cleaned row batches to `on_batch`."""
+    _rewind(file)
+    if (streaming or engine == "native") and is_xlsx_file(file):
+        raw_batches = iter_excel_batches(file, batch_size=batch_size, sheet_name=sheet_name,
+                                         engine=engine, max_rows=max_rows)
+    else:
+        raw_batches = [pd.read_excel(file, sheet_name=0 if sheet_name is None else sheet_name, nrows=max_rows)]
+    
+    # Columns that arrive as numbers keep their values through type inference and
+    # compaction, so their sketches are built batch by batch as rows stream in. Only
+    # sheets of at least SKETCH_MIN_ROWS rows keep sketches, so building starts once
+    # the sheet reaches that size, with the batches read so far.
+    streamed: Optional[PartialStats] = None
+    text_columns = set()
+    batches = []
+    rows = 0
+    for batch in raw_batches:
+        # Basic data cleaning
+        batch = batch.replace([np.inf, -np.inf], np.nan)
+        # Convert column names to string
+        batch.columns = batch.columns.astype(str)
+        if on_batch is not None:
+            on_batch(batch)
+        text_columns.update(column for column in batch.columns if column not in _number_columns(batch))
+        batches.append(batch)
+        rows += len(batch)
+        if rows >= SKETCH_MIN_ROWS:
+            if streamed is None:
+                streamed, unsketched = PartialStats({}, sketches=True), batches
+            else:
+                unsketched = batches[-1:]
+            for part in unsketched:
+                streamed.merge(PartialStats.from_frame(part[_number_columns(part)], sketches=True))
+    df = _concat_batches(batches)
+    
+    # Numbers and dates stored as text are detected on a sample and converted in one pass
+    df, column_types = infer_and_coerce_types(df)
+    
+    df, memory_report = compact_dtypes(df)
+    df.attrs["memory_report"] = memory_report
+    df.attrs["column_types"] = column_types
+    # Distinct counts and quantiles of large sheets; columns that held text are only
+    # summarized once converted. Sheets are already parsed in parallel, so this stays in-process.
+    if streamed is not None:
+        converted = compute_partial_stats(df[[column for column in df.columns if column in text_columns]],
+                                          max_workers=1, sketches=True)
+        columns = {column: (converted if column in text_columns else streamed).columns[column]
+                   for column in df.columns}
+        df.attrs["sketches"] = PartialStats(columns, len(df), sketches=True).sketches_dict()
+    if max_rows is not None and len(df) >= max_rows:
+        df.attrs["sampled_rows"] = max_rows
+    
+    return df
+
+def _number_columns(batch: pd.DataFrame) -> List[str]:
+    """Columns of a batch whose values arrived as numbers (booleans excluded)."""
+    return [column for column in batch.columns
+            if pd.api.types.is_numeric_dtype(batch[column]) and not pd.api.types.is_bool_dtype(batch[column])]
+
+def _concat_batches(batches: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Join the row batches of a sheet into one DataFrame, column by column.
+    
+    Every column gets the dtype pandas gives it when reading the whole sheet:
+    batches where it is blank (or absent) do not count, int and float batches
+    give float64 and any other mix gives object. Each column is released from
+    the batches as soon as it is joined, so memory peaks at the sheet plus one
+    column instead of twice the sheet as with `pd.concat`.
+    
+    Args:
+        batches: Consecutive row batches; they are emptied
+    
+    Returns:
+        pd.DataFrame: All rows, with the columns of the last batch
+    """
+    if len(batches) == 1:
+        return batches[0]
+    
+    # Columns are only ever added, so the last batch has all of them
+    columns = list(batches[-1].columns)
+    data = {}
+    for column in columns:
+        parts = [batch.pop(column) if column in batch.columns else pd.Series(np.nan, index=batch.index)
+                 for batch in batches]
+        filled = [part.dtype for part in parts if part.notna().any()]
+        if not filled:
+            dtype = np.dtype(np.float64)
+        elif all(dtype == filled[0] for dtype in filled):
+            dtype = filled[0]
+        elif all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in filled):
+            dtype = np.dtype(np.float64)
+        else:
+            dtype = np.dtype(object)
+        if len(filled) < len(parts):
+            # Blank batches add missing values, which integers and booleans cannot hold
+            if pd.api.types.is_integer_dtype(dtype):
+                dtype = np.dtype(np.float64)
+            elif pd.api.types.is_bool_dtype(dtype):
+                dtype = np.dtype(object)
+        data[column] = pd.concat([part.astype(dtype, copy=False) for part in parts], ignore_index=True)
+    
+    # copy=False keeps the joined columns as they are instead of consolidating them into a second copy
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+def _file_size(file: Any) -> int:
+    """Return the size in bytes of a path, Streamlit upload or file-like object."""
+    if hasattr(file, "size"):
+        return file.size
+    if hasattr(file, "seek"):
+        position = file.tell()
+        size = file.seek(0, 2)
+        file.seek(position)
+        return size
+    return Path(file).stat().st_size
+
+def _rewind(file: Any):
+    """Move a file-like object back to its start; paths are left untouched."""
+    if hasattr(file, "seek"):
+        file.seek(0)
+
+def _write_temp_copy(file: Any) -> Path:
+    """Copy a file-like object into TEMP_DIR and return the path."""
+    _rewind(file)
+    with tempfile.NamedTemporaryFile(dir=TEMP_DIR, suffix=".xlsx", delete=False) as handle:
+        shutil.copyfileobj(file, handle)
+    _rewind(file)
+    return Path(handle.name)
+
+def compact_dtypes(df: pd.DataFrame,
+                   category_ratio: float = CATEGORY_MAX_RATIO) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Convert every column to the narrowest dtype that holds its values exactly.
+    
+    Integer-valued columns become int32 or int64, whichever fits (nullable
+    `Int*` when they contain blanks), floats become float32 when that is
+    lossless, and low-cardinality text columns become `category`.
+    
+    Args:
+        df: Input DataFrame
+        category_ratio: Maximum unique/non-null ratio for converting a text
+            column to `category`
+        
+    Returns:
+        Tuple of (compacted DataFrame, per-column memory report)
+    """
+    compacted = {}
+    report = {}
+    
+    for column in df.columns:
+        series = df[column]
+        converted = _compact_series(series, category_ratio)
+        bytes_before = int(series.memory_usage(index=False, deep=True))
+        bytes_after = int(converted.memory_usage(index=False, deep=True))
+        
+        compacted[column] = converted
+        report[column] = {
+            "dtype_before": str(series.dtype),
+            "dtype_after": str(converted.dtype),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after
+        }
+    
+    return pd.DataFrame(compacted, index=df.index), report
+
+def _compact_series(series: pd.Series, category_ratio: float) -> pd.Series:
+    """Return the series converted to its most compact lossless dtype."""
+    if pd.api.types.is_bool_dtype(series) or not len(series):
+        return series
+    
+    if pd.api.types.is_numeric_dtype(series):
+        values = series.dropna()
+        if values.empty:
+            return series
+        if pd.api.types.is_float_dtype(series) and not (values == np.round(values)).all():
+            as_float32 = series.astype(np.float32)
+            if np.array_equal(as_float32.to_numpy(np.float64), series.to_numpy(np.float64), equal_nan=True):
+                return as_float32
+            return series
+        int_dtype = _smallest_int_dtype(values.min(), values.max(), nullable=len(values) < len(series))
+        return series.astype(int_dtype) if int_dtype else series
+    
+    if pd.api.types.is_object_dtype(series):
+        values = series.dropna()
+        if values.empty or not values.map(type).eq(str).all():
+            return series
+        if values.nunique() <= len(values) * category_ratio:
+            return series.astype("category")
+    
+    return series
+
+def _smallest_int_dtype(low: float, high: float, nullable: bool) -> Optional[str]:
+    """Pick the narrowest (nullable) integer dtype of at least 32 bits that can hold [low, high]."""
+    # Reductions upcast, but element-wise arithmetic keeps the dtype and wraps
+    # silently (int8 100 + 100 == -56), e.g. in derived columns and user formulas
+    for bits in (32, 64):
+        info = np.iinfo(f"int{bits}")
+        if info.min <= low and high <= info.max:
+            return f"Int{bits}" if nullable else f"int{bits}"
+    return None
+
+def is_xlsx_file(file: Any) -> bool:
+    """
+    Check whether the file is a zip based .xlsx workbook (as opposed to legacy .xls).
+    
+    Args:
+        file: File path or binary file-like object
+        
+    Returns:
+        bool: True if the file starts with the zip signature
+    """
+    if hasattr(file, "read"):
+        position = file.tell()
+        signature = file.read(len(XLSX_SIGNATURE))
+        file.seek(position)
+    else:
+        with open(file, "rb") as handle:
+            signature = handle.read(len(XLSX_SIGNATURE))
+    return signature == XLSX_SIGNATURE
+
+def iter_excel_batches(file: Any, batch_size: int = STREAM_BATCH_SIZE,
+                       sheet_name: Optional[str] = None, engine: str = XLSX_ENGINE,
+                       max_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Stream an .xlsx sheet as DataFrames of at most `batch_size` rows.
+    
+    Rows come from openpyxl's read-only, values-only iterator or from the
+    native `iterparse` reader in `utils.xlsx_reader`, and every column is
+    accumulated in a typed buffer, so peak memory is bounded by the batch size
+    rather than by the size of the sheet.
+    
+    Args:
+        file: File path or binary file-like object of an .xlsx workbook
+        batch_size: Maximum number of rows per yielded DataFrame
+        sheet_name: Sheet to read; the first sheet is used by default
+        engine: Row reader to use, "openpyxl" or "native"
+        max_rows: Stop after this many data rows; the rest of the sheet is
+            never parsed
+        
+    Yields:
+        pd.DataFrame: Consecutive row batches with the header row as columns.
+        A column is added from the first row with a value right of the
+        header, so later batches may have more columns than earlier ones,
+        and a column may hold numbers in one batch and text in another
+        (`_concat_batches` reconciles both).
+    """
+    if batch_size < 1:
+        raise ValueError("Batch ölçüsü müsbət olmalıdır")
+    
+    rows = _iter_rows(file, sheet_name, engine)
+    try:
+        header = tuple(next(rows, ()))
+        columns = _make_column_names(header)
+        buffers = [_ColumnBuffer() for _ in columns]
+        width = len(columns)
+        buffered = 0
+        pending_empty = 0
+        remaining = max_rows if max_rows is not None else float("inf")
+        yielded = False
+        
+        for row in rows:
+            if remaining <= 0:
+                break
+            if len(row) > width and any(value is not None for value in row[width:]):
+                # Cells right of the header get "Unnamed: n" columns, like pd.read_excel gives them;
+                # rows already buffered are blank there
+                last = max(idx for idx, value in enumerate(row) if value is not None) + 1
+                header += (None,) * (last - len(header))
+                columns = _make_column_names(header)
+                for _ in range(last - width):
+                    buffer = _ColumnBuffer()
+                    for _ in range(buffered):
+                        buffer.append(None)
+                    buffers.append(buffer)
+                width = last
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if row.count(None) == width:
+                # Trailing blank rows are dropped, like pd.read_excel does
+                pending_empty += 1
+                continue
+            for _ in range(min(pending_empty, remaining - 1)):
+                for buffer in buffers:
+                    buffer.append(None)
+                buffered += 1
+                remaining -= 1
+            pending_empty = 0
+            for buffer, value in zip(buffers, row):
+                buffer.append(value)
+            buffered += 1
+            remaining -= 1
+            
+            if buffered >= batch_size:
+                yield _flush_buffers(columns, buffers)
+                yielded = True
+                buffered = 0
+        
+        if buffered or not yielded:
+            yield _flush_buffers(columns, buffers)
+    finally:
+        rows.close()
+
+def _iter_rows(file: Any, sheet_name: Optional[str], engine: str) -> Iterator[Sequence[Any]]:
+    """Yield the raw cell values of a sheet row by row with the chosen engine."""
+    if engine == "native":
+        yield from iter_xlsx_rows(file, sheet_name)
+        return
+    if engine != "openpyxl":
+        raise ValueError(f"Naməlum Excel mühərriki: {engine}")
+    
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+class _ColumnBuffer:
+    """Append-only column buffer that stays a packed float array while values are numeric."""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.numbers = array("d")
+        self.objects: Optional[List[Any]] = None
+        self.all_int = True
+        self.has_null = False
+    
+    def append(self, value: Any):
+        # Exact type checks first: this runs once per cell
+        value_type = type(value)
+        if self.objects is not None:
+            self.objects.append(value)
+        elif value_type is int:
+            self.numbers.append(value)
+        elif value_type is float:
+            self.numbers.append(value)
+            if self.all_int and not value.is_integer():
+                self.all_int = False
+        elif value is None:
+            self.numbers.append(np.nan)
+            self.has_null = True
+        elif isinstance(value, Number) and value_type is not bool:
+            self.numbers.append(value)
+            if self.all_int and not float(value).is_integer():
+                self.all_int = False
+        else:
+            # First non-numeric value: fall back to a generic object buffer
+            self.objects = [None if np.isnan(number) else number for number in self.numbers]
+            self.objects.append(value)
+            self.numbers = array("d")
+    
+    def flush(self) -> Union[np.ndarray, pd.Series]:
+        if self.objects is not None:
+            values = pd.Series(self.objects, dtype=object).infer_objects()
+        else:
+            values = np.array(self.numbers, dtype=np.float64)
+            if self.all_int and not self.has_null and len(values):
+                values = values.astype(np.int64)
+        self.reset()
+        return values
+
+def _flush_buffers(columns: List[str], buffers: List[_ColumnBuffer]) -> pd.DataFrame:
+    """Turn the filled column buffers into a DataFrame and empty them."""
+    data = {}
+    for column, buffer in zip(columns, buffers):
+        values = buffer.flush()
+        data[column] = values.to_numpy() if isinstance(values, pd.Series) else values
+    return pd.DataFrame(data, columns=columns)
+
+def _make_column_names(header: Sequence[Any]) -> List[str]:
+    """Build unique column names from the header row the same way pandas does."""
+    columns = []
+    seen: Dict[str, int] = {}
+    for idx, value in enumerate(header):
+        name = f"Unnamed: {idx}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+@memoize
 def get_column_statistics(df: pd.DataFrame) -> Dict[str, Any]:
     """
     Generate basic statistics for each column in the DataFrame.
     
+    The statistics are read from the shared dataset profile, so the data is
+    only scanned the first time any view asks for it.
+    
     Args:
         df: Input DataFrame
         
     Returns:
         Dict containing column statistics
     """
+    profile = get_profile(df)
     stats = {}
     
     for column in df.columns:
+        column_profile = profile[column]
         col_stats = {
-            "data_type": str(df[column].dtype),
-            "non_null_count": df[column].count(),
-            "null_count": df[column].isnull().sum(),
-            "unique_values": df[column].nunique()
+            "data_type": column_profile["dtype"],
+            "non_null_count": column_profile["count"],
+            "null_count": column_profile["nulls"],
+            "unique_values": column_profile["distinct"]
         }
         
         # Add numerical statistics if applicable
-        if pd.api.types.is_numeric_dtype(df[column]):
+        if "mean" in column_profile:
             col_stats.update({
-                "mean": df[column].mean(),
-                "std": df[column].std(),
-                "min": df[column].min(),
-                "max": df[column].max()
+                key: column_profile[key] for key in ("mean", "std", "min", "max")
             })
         
         stats[column] = col_stats
@@ -66,22 +792,15 @@ def detect_column_types(df: pd.DataFrame) -> Dict[str, str]:
     """
     Detect and categorize column types (numeric, categorical, date, text).
     
+    Types inferred during ingestion are reused; other columns are classified
+    by `infer_column_type` from a bounded sample of their values. Both are
+    kept in the shared dataset profile.
+    
     Args:
         df: Input DataFrame
         
     Returns:
         Dict mapping column names to their types
     """
-    column_types = {}
-    
-    for column in df.columns:
-        if pd.api.types.is_numeric_dtype(df[column]):
-            column_types[column] = "numeric"
-        elif pd.api.types.is_datetime64_dtype(df[column]):
-            column_types[column] = "date"
-        elif df[column].nunique() < len(df) * 0.5:  # Less than 50% unique values
-            column_types[column] = "categorical"
-        else:
-            column_types[column] = "text"
-    
-    return column_types 
\ No newline at end of file
+    profile = get_profile(df)
+    return {column: profile[column]["type"] for column in df.columns}
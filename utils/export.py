@@ -0,0 +1,264 @@
+import gzip
+import io
+import os
+import re
+import time
+import uuid
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from config.settings import EXPORT_DIR, EXPORT_CHUNK_ROWS, NUMBER_FORMATS, CACHE_TTL, MAX_CACHE_SIZE
+from .result_cache import fingerprint_frame
+
+# Label and MIME type of every export format, by file extension
+FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("CSV", "text/csv"),
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+    "csv.gz": ("CSV (gzip)", "application/gzip"),
+    "csv.zst": ("CSV (zstd)", "application/zstd")
+}
+
+# Rows of an Excel worksheet, header included
+_XLSX_MAX_ROWS = 1_048_576
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+# Inferred dtypes of object columns holding values of several types
+_MIXED_KINDS = {"mixed", "mixed-integer"}
+
+# Python number formats with an Excel equivalent: optional grouping, fixed decimals, literal suffix
+_PYTHON_NUMBER_FORMAT = re.compile(r"^\{:(,?)\.(\d+)f\}(.*)$")
+
+def export_path(df: pd.DataFrame, extension: str = "csv", export_dir: Path = EXPORT_DIR) -> Path:
+    """
+    Path of the export file of a DataFrame.
+    
+    Files are named by the DataFrame fingerprint, so equal data is written
+    once and shared by every rerun and session.
+    
+    Args:
+        df: Exported DataFrame
+        extension: File extension of the format
+        export_dir: Directory holding export files
+    
+    Returns:
+        Path: Location of the export file (which may not exist yet)
+    """
+    return Path(export_dir) / f"{fingerprint_frame(df)}.{extension}"
+
+def cached_export(df: pd.DataFrame, extension: str = "csv", export_dir: Path = EXPORT_DIR,
+                  ttl: int = CACHE_TTL) -> Optional[Path]:
+    """
+    Return the export file of a DataFrame if it has already been written.
+    
+    Args:
+        df: Exported DataFrame
+        extension: File extension of the format
+        export_dir: Directory holding export files
+        ttl: Seconds after the last use at which a file expires
+    
+    Returns:
+        Optional[Path]: Path of the file, or None when it must be written first
+    """
+    path = export_path(df, extension, export_dir)
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+    except OSError:
+        return None
+    # Touching the file marks it as recently used for pruning
+    os.utime(path)
+    return path
+
+def export_frame(df: pd.DataFrame, extension: str = "csv", export_dir: Path = EXPORT_DIR,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS, ttl: int = CACHE_TTL,
+                 max_entries: int = MAX_CACHE_SIZE) -> Path:
+    """
+    Write a DataFrame to its export file in one of `FORMATS`, unless it is already there.
+    
+    Every format is written `chunk_rows` rows at a time straight into the
+    file (CSV text through the compressor, Parquet row groups, streamed
+    Excel rows), so memory use does not grow with the number of rows.
+    
+    Args:
+        df: DataFrame to export
+        extension: Format, a key of `FORMATS`
+        export_dir: Directory holding export files
+        chunk_rows: Rows encoded at a time
+        ttl: Seconds after the last use at which a file expires
+        max_entries: Maximum number of export files kept after eviction
+    
+    Returns:
+        Path: File with the contents of `df`
+    
+    Raises:
+        ValueError: If the format is unknown or cannot hold the data
+    """
+    if extension not in _WRITERS:
+        raise ValueError(f"Dəstəklənməyən ixrac formatı: {extension}")
+    path = cached_export(df, extension, export_dir, ttl)
+    if path is not None:
+        return path
+    
+    path = export_path(df, extension, export_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write into a private file first so readers never see a partial export
+    staging = path.parent / f".{path.name}.{uuid.uuid4().hex}"
+    try:
+        _WRITERS[extension](df, staging, chunk_rows)
+        staging.replace(path)
+    except Exception:
+        staging.unlink(missing_ok=True)
+        raise
+    
+    prune_exports(export_dir, ttl=ttl, max_entries=max_entries)
+    return path
+
+def prune_exports(export_dir: Path = EXPORT_DIR, ttl: int = CACHE_TTL,
+                  max_entries: int = MAX_CACHE_SIZE) -> int:
+    """
+    Remove expired export files, then the least recently used ones above `max_entries`.
+    
+    Args:
+        export_dir: Directory holding export files
+        ttl: Seconds after the last use at which a file expires
+        max_entries: Maximum number of files to keep
+    
+    Returns:
+        int: Number of removed files
+    """
+    now = time.time()
+    entries = []
+    removed = 0
+    
+    for path in Path(export_dir).glob("[!.]*"):
+        try:
+            used = path.stat().st_mtime
+        except OSError:
+            continue
+        if now - used > ttl:
+            path.unlink(missing_ok=True)
+            removed += 1
+        else:
+            entries.append((used, path))
+    
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - max_entries)]:
+        path.unlink(missing_ok=True)
+        removed += 1
+    
+    return removed
+
+def excel_number_format(python_format: str) -> Optional[str]:
+    """
+    Translate a Python number format such as "{:,.0f}" or "{:.2f}%" to Excel's notation.
+    
+    Args:
+        python_format: `str.format` pattern of a fixed-point number
+    
+    Returns:
+        Optional[str]: Equivalent Excel number format, or None if there is none
+    """
+    match = _PYTHON_NUMBER_FORMAT.match(python_format)
+    if match is None:
+        return None
+    grouping, decimals, suffix = match.groups()
+    number = "#,##0" if grouping else "0"
+    if int(decimals):
+        number += "." + "0" * int(decimals)
+    # The suffix is quoted so that e.g. "%" is shown as is instead of scaling the value
+    return number + (f'"{suffix}"' if suffix else "")
+
+def _chunks(df: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Consecutive row slices of a DataFrame (views, not copies)."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+def _open_text(path: Path, compression: Optional[str]) -> io.TextIOBase:
+    """Open a UTF-8 text file for writing, compressed with gzip or zstd if asked."""
+    if compression == "gzip":
+        return gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=_GZIP_LEVEL)
+    if compression == "zstd":
+        # Imported on demand, so CSV and Excel exports do not load the codec
+        import zstandard
+        raw = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).stream_writer(open(path, "wb"))
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+def _write_csv(df: pd.DataFrame, path: Path, chunk_rows: int, compression: Optional[str] = None):
+    """Write CSV text chunk by chunk, through the compressor if any."""
+    with _open_text(path, compression) as handle:
+        df.iloc[:0].to_csv(handle, index=False)
+        for chunk in _chunks(df, chunk_rows):
+            chunk.to_csv(handle, index=False, header=False)
+
+def _write_parquet(df: pd.DataFrame, path: Path, chunk_rows: int):
+    """Write one Parquet row group per chunk, keeping the column dtypes."""
+    # Imported on demand: pyarrow is slow to import
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    # Arrow columns have one type, so object columns mixing e.g. text and numbers are written as text
+    mixed = [column for column in df.columns
+             if pd.api.types.is_object_dtype(df[column])
+             and pd.api.types.infer_dtype(df[column], skipna=True) in _MIXED_KINDS]
+    try:
+        # The schema is inferred from whole columns, so chunks with only missing values still fit it
+        schema = pa.schema([
+            pa.field(str(column), pa.string()) if column in mixed
+            else pa.Schema.from_pandas(df[[column]], preserve_index=False).field(0)
+            for column in df.columns
+        ])
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in _chunks(df, chunk_rows):
+                writer.write_table(pa.Table.from_pandas(_as_text(chunk, mixed), schema=schema, preserve_index=False))
+    except pa.ArrowException as e:
+        raise ValueError(f"Parquet faylı yazıla bilmədi: {e}") from e
+
+def _as_text(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Convert the values of some columns to strings, keeping missing values missing."""
+    if not columns:
+        return df
+    return df.assign(**{column: df[column].where(df[column].isna(), df[column].astype(str)) for column in columns})
+
+def _write_xlsx(df: pd.DataFrame, path: Path, chunk_rows: int):
+    """Stream rows into a write-only workbook, with the `NUMBER_FORMATS` of known columns."""
+    if len(df) >= _XLSX_MAX_ROWS:
+        raise ValueError(f"Excel vərəqi ən çox {_XLSX_MAX_ROWS - 1:,} sətir saxlaya bilər")
+    
+    # Write-only workbooks keep rows on disk until saving instead of as cell objects
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Məlumatlar")
+    sheet.append([str(column) for column in df.columns])
+    formats = {
+        position: excel_number_format(NUMBER_FORMATS[column])
+        for position, column in enumerate(df.columns) if column in NUMBER_FORMATS
+    }
+    formats = {position: number_format for position, number_format in formats.items() if number_format}
+    
+    for chunk in _chunks(df, chunk_rows):
+        # Object values are plain Python numbers, with None for missing cells
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            if formats:
+                row = list(row)
+                for position, number_format in formats.items():
+                    cell = WriteOnlyCell(sheet, row[position])
+                    cell.number_format = number_format
+                    row[position] = cell
+            sheet.append(row)
+    workbook.save(path)
+
+# Writer of every format in `FORMATS`
+_WRITERS = {
+    "csv": _write_csv,
+    "xlsx": _write_xlsx,
+    "parquet": _write_parquet,
+    "csv.gz": partial(_write_csv, compression="gzip"),
+    "csv.zst": partial(_write_csv, compression="zstd")
+}
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Sequence
+from config.settings import HEAVY_HITTERS_CAPACITY, CHART_TOP_K, STATS_CHUNK_ROWS
+from .result_cache import memoize
+
+# Label of the bucket that collects everything outside the top values
+OTHER_LABEL = "Digər"
+
+class SpaceSaving:
+    """
+    Bounded frequent-values summary (Space-Saving).
+    
+    At most `capacity` values are tracked. Rows arrive in batches: each batch
+    is counted exactly, then folded into the summary; a value that was not
+    tracked enters with the smallest tracked count as its possible
+    overestimate (`error`). Any value occurring more than total / capacity
+    times is guaranteed to be tracked, and counts are exact as long as the
+    column has no more than `capacity` distinct values.
+    """
+    
+    def __init__(self, capacity: int = HEAVY_HITTERS_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self.overflowed = False
+        self.counts = pd.Series(dtype="int64")
+        self.errors = pd.Series(dtype="int64")
+    
+    def update(self, values: pd.Series):
+        """Count a batch of values (missing values are ignored)."""
+        counts = values.value_counts(dropna=True)
+        counts = counts[counts > 0]
+        counts.index = counts.index.astype(object)
+        self.total += int(counts.sum())
+        self._fold(counts, pd.Series(0, index=counts.index, dtype="int64"), 0)
+    
+    def merge(self, other: "SpaceSaving"):
+        """Fold the summary of other, disjoint rows into this one."""
+        self.total += other.total
+        self.overflowed |= other.overflowed
+        self._fold(other.counts, other.errors, other._floor())
+    
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        """
+        Most frequent values, most frequent first.
+        
+        Args:
+            k: Number of values
+        
+        Returns:
+            List of dicts with the `value`, its estimated `count` and the
+            largest possible overestimate `error`
+        """
+        top = self.counts.sort_values(ascending=False, kind="stable").head(k)
+        return [{"value": value, "count": int(count), "error": int(self.errors[value])}
+                for value, count in top.items()]
+    
+    def _floor(self) -> int:
+        """Count any untracked value may have had (0 while the summary is not full)."""
+        return int(self.counts.min()) if self.overflowed and len(self.counts) else 0
+    
+    def _fold(self, counts: pd.Series, errors: pd.Series, their_floor: int):
+        """Add another set of counters, charging values missing on one side with that side's floor."""
+        our_floor = self._floor()
+        index = self.counts.index.union(counts.index, sort=False)
+        ours = self.counts.reindex(index)
+        theirs = counts.reindex(index)
+        combined = ours.fillna(our_floor) + theirs.fillna(their_floor)
+        combined_errors = (self.errors.reindex(index).fillna(our_floor)
+                           + errors.reindex(index).fillna(their_floor))
+        
+        if len(combined) > self.capacity:
+            self.overflowed = True
+            combined = combined.sort_values(ascending=False, kind="stable").head(self.capacity)
+        self.counts = combined.astype("int64")
+        self.errors = combined_errors.reindex(combined.index).astype("int64")
+
+def top_k_values(series: pd.Series, k: int = CHART_TOP_K, capacity: int = HEAVY_HITTERS_CAPACITY,
+                 chunk_rows: int = STATS_CHUNK_ROWS) -> Dict[str, Any]:
+    """
+    Find the most frequent values of a column without building a full count table.
+    
+    Categorical columns are counted exactly from their codes. Other columns
+    are counted chunk by chunk into a Space-Saving summary of `capacity`
+    values, which is exact for columns with at most `capacity` distinct values.
+    
+    Args:
+        series: Column to count
+        k: Number of top values returned
+        capacity: Values tracked by the Space-Saving summary
+        chunk_rows: Rows counted at a time
+    
+    Returns:
+        Dict with `values` (list of (value, count) pairs, most frequent
+        first), `other` (rows holding any other non-missing value), `total`
+        (non-missing rows), `exact` (whether the counts are exact) and, when
+        exact, `distinct` (number of distinct values)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+        order = np.argsort(-counts, kind="stable")[:k]
+        values = [(series.cat.categories[idx], int(counts[idx])) for idx in order if counts[idx] > 0]
+        total = int(counts.sum())
+        return {
+            "values": values,
+            "other": total - sum(count for _, count in values),
+            "total": total,
+            "exact": True,
+            "distinct": int(np.count_nonzero(counts))
+        }
+    
+    summary = SpaceSaving(capacity)
+    for start in range(0, len(series), chunk_rows):
+        summary.update(series.iloc[start:start + chunk_rows])
+    
+    values = [(item["value"], item["count"]) for item in summary.top(k)]
+    result = {
+        "values": values,
+        "other": max(0, summary.total - sum(count for _, count in values)),
+        "total": summary.total,
+        "exact": not summary.overflowed
+    }
+    if not summary.overflowed:
+        result["distinct"] = len(summary.counts)
+    return result
+
+@memoize
+def column_top_values(df: pd.DataFrame, column: str, k: int = CHART_TOP_K) -> Dict[str, Any]:
+    """
+    Cached `top_k_values` of a DataFrame column.
+    
+    Args:
+        df: Input DataFrame
+        column: Column to count
+        k: Number of top values returned
+    
+    Returns:
+        Dict as returned by `top_k_values`
+    """
+    return top_k_values(df[column], k)
+
+def group_long_tail(series: pd.Series, keep: Sequence[Any], other_label: str = OTHER_LABEL) -> pd.Series:
+    """
+    Replace every value outside `keep` with a single "other" label.
+    
+    Args:
+        series: Column to relabel
+        keep: Values kept as they are
+        other_label: Label of all remaining non-missing values
+    
+    Returns:
+        pd.Series: Categorical column with the kept values and `other_label`
+    """
+    keep = [value for value in keep if value != other_label]
+    grouped = pd.Series(pd.Categorical(series, categories=keep + [other_label]),
+                        index=series.index, name=series.name)
+    return grouped.mask(grouped.isna() & series.notna(), other_label)
+
+def top_k_frame(df: pd.DataFrame, column: str, k: int = CHART_TOP_K, name: str = "count",
+                other_label: str = OTHER_LABEL) -> pd.DataFrame:
+    """
+    Count table of the top values of a column, with the long tail in one row.
+    
+    Args:
+        df: Input DataFrame
+        column: Column to count
+        k: Number of values shown individually
+        name: Name of the count column
+        other_label: Label of the row collecting all other values
+    
+    Returns:
+        pd.DataFrame: Columns `column` and `name`, at most k + 1 rows
+    """
+    top = column_top_values(df, column, k)
+    rows = list(top["values"])
+    if top["other"] > 0:
+        rows.append((other_label, top["other"]))
+    return pd.DataFrame(rows, columns=[column, name])
@@ -0,0 +1,201 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List
+from config.settings import NEAR_DUPLICATE_THRESHOLD, SHINGLE_SIZE, MINHASH_PERMUTATIONS, LSH_BANDS
+from .result_cache import memoize
+from .text_utils import collapse_whitespace, normalize_text
+
+# Text × shingle cells processed together
+_BATCH_CELLS = 1 << 18
+# Hash functions evaluated at once, bounding the temporary shingle × hash matrix
+_PERMUTATION_BLOCK = 16
+# Multiplier folding the signature rows of a band into one bucket key
+_BAND_PRIME = np.uint64(0x100000001B3)
+# Base of the polynomial packing the code points of a shingle into one integer
+_SHINGLE_BASE = np.uint64(1 << 21)
+# Longest shingle whose 21-bit code points fit in 64 bits
+_MAX_SHINGLE_SIZE = 3
+
+_DIGITS = re.compile(r"\d+")
+
+def minhash_signatures(texts: List[str], shingle_size: int = SHINGLE_SIZE,
+                       permutations: int = MINHASH_PERMUTATIONS, seed: int = 0) -> np.ndarray:
+    """
+    Compute MinHash signatures of the character shingles of texts.
+    
+    Every text is cut into overlapping `shingle_size`-character shingles
+    (padded with a space on both sides, so short texts still have one).
+    Shingles are packed into 64-bit integers and each of the `permutations`
+    hash functions (multiply-shift with random odd multipliers) keeps its
+    smallest value per text. Two signatures agree in a position with
+    probability equal to the Jaccard similarity of the shingle sets.
+    
+    Args:
+        texts: Normalized, non-empty texts
+        shingle_size: Characters per shingle
+        permutations: Length of the signatures
+        seed: Seed of the hash functions
+    
+    Returns:
+        np.ndarray: uint32 array of shape (len(texts), permutations)
+    
+    Raises:
+        ValueError: If `shingle_size` is above 3, as shingles would no longer
+            fit in a 64-bit integer
+    """
+    if not 1 <= shingle_size <= _MAX_SHINGLE_SIZE:
+        raise ValueError(f"Şinql ölçüsü 1 ilə {_MAX_SHINGLE_SIZE} arasında olmalıdır: {shingle_size}")
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 2 ** 63, permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    offsets = rng.integers(0, 2 ** 63, permutations, dtype=np.uint64)
+    signatures = np.empty((len(texts), permutations), dtype=np.uint32)
+    
+    # Texts are batched by shingle count, so each batch is a dense texts × shingles matrix
+    counts = np.array([max(1, len(text) + 3 - shingle_size) for text in texts])
+    order = np.argsort(counts, kind="stable")
+    start = 0
+    while start < len(order):
+        end = min(len(order), start + max(1, _BATCH_CELLS // counts[order[start]]))
+        while end - start > 1 and (end - start) * counts[order[end - 1]] > _BATCH_CELLS:
+            end = start + (end - start) // 2
+        batch = order[start:end]
+        lengths = counts[batch]
+        width = lengths.max()
+        
+        # Shingles are read as integers from the code points of a fixed-width array
+        # (exact for up to three characters) instead of being built as strings
+        chars = width + shingle_size - 1
+        padded = np.array([f" {texts[idx]} " for idx in batch], dtype=f"<U{chars}")
+        points = padded.view(np.uint32).reshape(len(batch), chars).astype(np.uint64)
+        shingles = np.zeros((len(batch), width), dtype=np.uint64)
+        for offset in range(shingle_size):
+            shingles = shingles * _SHINGLE_BASE + points[:, offset:offset + width]
+        valid = np.arange(width) < lengths[:, None]
+        # Texts share most of their shingles, so each distinct shingle is hashed once
+        codes, distinct = pd.factorize(shingles[valid])
+        
+        # Positions past the end of a text point at an extra value larger than any hash
+        matrix = np.full((len(batch), width), len(distinct), dtype=np.intp)
+        matrix[valid] = codes
+        
+        for block in range(0, permutations, _PERMUTATION_BLOCK):
+            columns = slice(block, block + _PERMUTATION_BLOCK)
+            # Unsigned overflow wraps around, which is the multiply-shift hash modulo 2**64
+            values = (multipliers[columns, None] * distinct + offsets[columns, None]) >> np.uint64(32)
+            values = np.hstack([values.astype(np.uint32),
+                                np.full((len(values), 1), np.iinfo(np.uint32).max, dtype=np.uint32)])
+            signatures[batch, columns] = values[:, matrix].min(axis=2).T
+        start = end
+    
+    return signatures
+
+def find_near_duplicates(series: pd.Series, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                         bands: int = LSH_BANDS) -> List[Dict[str, Any]]:
+    """
+    Group the values of a text column that are near-duplicates of each other.
+    
+    Values are compared by the character shingles of their normalized form
+    (see `normalize_text`), so variants in case and spacing always match.
+    Instead of comparing all pairs, MinHash signatures are split into
+    `bands` bands; values sharing a band are candidates, and a candidate
+    pair is kept when its signatures agree in at least `threshold` of the
+    positions. Values with different numbers in them ("Python Basics" and
+    "Python Basics 2", "Q1" and "Q2") are never paired, since the numbers
+    usually tell distinct items apart. Kept pairs are joined into clusters.
+    The work grows about linearly with the number of distinct values.
+    
+    Args:
+        series: Text column
+        threshold: Minimum estimated Jaccard similarity of near-duplicates
+        bands: Number of LSH bands
+    
+    Returns:
+        List of clusters, largest first, each a dict with the `canonical`
+        value (the most frequent variant, whitespace collapsed), the
+        variant `values` as (value, count) pairs and the number of `rows`
+    """
+    counts = series.dropna().astype(object).value_counts()
+    counts = counts[counts > 0]
+    keys = np.array([normalize_text(value) for value in counts.index], dtype=object)
+    filled = keys != ""
+    counts, keys = counts[filled], keys[filled]
+    if not len(keys):
+        return []
+    
+    codes, texts = pd.factorize(keys)
+    labels = np.arange(len(texts))
+    if len(texts) > 1:
+        signatures = minhash_signatures(list(texts))
+        rows_per_band = signatures.shape[1] // bands
+        edges = []
+        for band in range(bands):
+            bucket = np.zeros(len(texts), dtype=np.uint64)
+            for column in range(band * rows_per_band, (band + 1) * rows_per_band):
+                bucket = bucket * _BAND_PRIME ^ signatures[:, column].astype(np.uint64)
+            # Every member of a bucket is checked against the bucket's first member
+            order = np.argsort(bucket, kind="stable")
+            sorted_bucket = bucket[order]
+            starts = np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]]
+            first = order[np.maximum.accumulate(np.where(starts, np.arange(len(order)), 0))]
+            members = ~starts
+            edges.append(np.column_stack([first[members], order[members]]))
+        edges = np.unique(np.concatenate(edges), axis=0)
+        numbers, _ = pd.factorize(np.array([" ".join(_DIGITS.findall(text)) for text in texts], dtype=object))
+        edges = edges[numbers[edges[:, 0]] == numbers[edges[:, 1]]]
+        if len(edges):
+            similarity = (signatures[edges[:, 0]] == signatures[edges[:, 1]]).mean(axis=1)
+            labels = _connected_components(len(texts), edges[similarity >= threshold])
+    
+    frame = pd.DataFrame({"value": counts.index, "count": counts.to_numpy(), "cluster": labels[codes]})
+    frame = frame[frame["cluster"].duplicated(keep=False)]
+    clusters = []
+    for _, members in frame.groupby("cluster", sort=False):
+        # Among equally frequent variants, one already free of stray whitespace is preferred
+        tidy = [collapse_whitespace(value) for value in members["value"]]
+        members = members.assign(tidy=tidy, clean=[str(value) == text for value, text in zip(members["value"], tidy)])
+        members = members.sort_values(["count", "clean"], ascending=False, kind="stable")
+        clusters.append({
+            "canonical": members["tidy"].iloc[0],
+            "values": list(zip(members["value"], members["count"].astype(int))),
+            "rows": int(members["count"].sum())
+        })
+    clusters.sort(key=lambda cluster: cluster["rows"], reverse=True)
+    return clusters
+
+@memoize
+def near_duplicate_clusters(df: pd.DataFrame, column: str) -> List[Dict[str, Any]]:
+    """Cached `find_near_duplicates` of a DataFrame column."""
+    return find_near_duplicates(df[column])
+
+def cluster_mapping(clusters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Map the normalized form of every clustered value to its cluster's canonical value.
+    
+    Keying by normalized form keeps the mapping valid after whitespace
+    has been trimmed.
+    
+    Args:
+        clusters: Result of `find_near_duplicates`
+    
+    Returns:
+        Dict from `normalize_text` of each variant to the canonical value
+    """
+    return {normalize_text(value): cluster["canonical"]
+            for cluster in clusters for value, _ in cluster["values"]}
+
+def _connected_components(size: int, edges: np.ndarray) -> np.ndarray:
+    """Label the connected components of a graph by their smallest node, by label propagation."""
+    labels = np.arange(size)
+    if not len(edges):
+        return labels
+    while True:
+        lowest = np.minimum(labels[edges[:, 0]], labels[edges[:, 1]])
+        updated = labels.copy()
+        np.minimum.at(updated, edges[:, 0], lowest)
+        np.minimum.at(updated, edges[:, 1], lowest)
+        # Pointer jumping shortcuts long chains
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
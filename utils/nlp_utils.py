@@ -1,8 +1,8 @@
 import pandas as pd
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, Iterator, List, Tuple
 import re
 from resources.az_language import get_az_translations
-from .chatgpt_utils import get_chatgpt_response, process_visualization_request
+from .chatgpt_utils import get_chatgpt_response, stream_chatgpt_response, process_visualization_request
 
 def process_query(query: str, df: pd.DataFrame) -> str:
     """
@@ -27,6 +27,22 @@ def process_query(query: str, df: pd.DataFrame) -> str:
     except Exception as e:
         return f"Xəta baş verdi: {str(e)}"
 
+def stream_query(query: str, df: pd.DataFrame) -> Iterator[str]:
+    """
+    Process user query like `process_query`, yielding the response as it is generated.
+
+    The caller checks the complete text with `process_visualization_request`
+    once the stream has ended.
+
+    Args:
+        query: User's query in Azerbaijani
+        df: DataFrame containing the data
+
+    Yields:
+        str: Consecutive pieces of the response
+    """
+    yield from stream_chatgpt_response(query, df)
+
 def detect_query_type(query: str, columns: List[str], translations: Dict[str, str]) -> Tuple[str, List[str]]:
     """
     Detect the type of query and relevant columns.
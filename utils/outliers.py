@@ -0,0 +1,120 @@
+import warnings
+import numpy as np
+import pandas as pd
+from typing import List
+from config.settings import (
+    OUTLIER_IQR_FACTOR, OUTLIER_MAD_THRESHOLD, OUTLIER_ISOLATION_FOREST, OUTLIER_SAMPLE_ROWS,
+    STATS_CHUNK_ROWS
+)
+from .profiling import get_profile
+from .result_cache import memoize
+
+# Scale turning a median absolute deviation into a standard-deviation estimate (0.6745 = Φ⁻¹(0.75))
+_MAD_SCALE = 0.6745
+# Same for the mean absolute deviation, used when more than half the values equal the median
+_MEAN_AD_SCALE = 1.253314
+
+class OutlierReport:
+    """
+    Outlying values of the numeric columns of a DataFrame.
+    
+    `columns` has one row per numeric column with the IQR fences `lower`
+    and `upper` and the number of values outside them (`iqr_outliers`) or
+    with a robust z-score above the threshold (`mad_outliers`). `flags` has
+    one boolean column per method, aligned with the rows of the DataFrame,
+    set when any value of the row is an outlier by that method.
+    """
+    
+    def __init__(self, columns: pd.DataFrame, flags: pd.DataFrame):
+        self.columns = columns
+        self.flags = flags
+    
+    @property
+    def flagged(self) -> pd.Series:
+        """Rows flagged by any method."""
+        return self.flags.any(axis=1)
+    
+    @property
+    def row_count(self) -> int:
+        """Number of rows flagged by any method."""
+        return int(self.flagged.sum())
+    
+    def summary_lines(self) -> List[str]:
+        """Compact per-column counts for the LLM context, only for columns with outliers."""
+        lines = [
+            f"{column}: IQR {int(stats['iqr_outliers']):,}, MAD {int(stats['mad_outliers']):,} "
+            f"(normal aralıq: {stats['lower']:,.2f} – {stats['upper']:,.2f})"
+            for column, stats in self.columns.iterrows()
+            if stats["iqr_outliers"] or stats["mad_outliers"]
+        ]
+        if "isolation_forest" in self.flags:
+            lines.append(f"IsolationForest: {int(self.flags['isolation_forest'].sum()):,} sətir")
+        return lines
+
+def detect_outliers(df: pd.DataFrame, iqr_factor: float = OUTLIER_IQR_FACTOR,
+                    mad_threshold: float = OUTLIER_MAD_THRESHOLD,
+                    isolation_forest: bool = OUTLIER_ISOLATION_FOREST,
+                    sample_rows: int = OUTLIER_SAMPLE_ROWS) -> OutlierReport:
+    """
+    Detect outliers in every numeric column at once.
+    
+    The numeric columns are compared in one block against broadcast bounds:
+    Tukey's fences from the profile quartiles (IQR rule) and the robust
+    z-score 0.6745 · |x − median| / MAD (Iglewicz–Hoaglin). Optionally an
+    IsolationForest trained on a sample of `sample_rows` rows scores all
+    rows, with missing values replaced by the column median.
+    
+    Args:
+        df: Input DataFrame
+        iqr_factor: Fence distance in interquartile ranges
+        mad_threshold: Robust z-score above which a value is an outlier
+        isolation_forest: Also flag rows with an IsolationForest (scikit-learn)
+        sample_rows: Rows the IsolationForest is trained on
+    
+    Returns:
+        OutlierReport: Per-column counts and per-row flags
+    """
+    profile = get_profile(df)
+    numeric = [column for column in profile.numeric_columns() if pd.api.types.is_numeric_dtype(df[column])]
+    values = df[numeric].to_numpy(dtype=float, na_value=np.nan)
+    q25 = np.array([profile[column]["q25"] for column in numeric], dtype=float)
+    q75 = np.array([profile[column]["q75"] for column in numeric], dtype=float)
+    median = np.array([profile[column]["median"] for column in numeric], dtype=float)
+    lower = q25 - iqr_factor * (q75 - q25)
+    upper = q75 + iqr_factor * (q75 - q25)
+    
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        # Columns without values have no median or deviation
+        warnings.simplefilter("ignore", RuntimeWarning)
+        iqr_mask = (values < lower) | (values > upper)
+        deviation = np.abs(values - median)
+        mad = np.nanmedian(deviation, axis=0) if len(values) else np.full(len(numeric), np.nan)
+        mean_ad = np.nanmean(deviation, axis=0) if len(values) else np.full(len(numeric), np.nan)
+        scale = np.where(mad > 0, mad / _MAD_SCALE, _MEAN_AD_SCALE * mean_ad)
+        mad_mask = (deviation / scale > mad_threshold) & (scale > 0)
+    
+    columns = pd.DataFrame({
+        "lower": lower,
+        "upper": upper,
+        "iqr_outliers": iqr_mask.sum(axis=0),
+        "mad_outliers": mad_mask.sum(axis=0)
+    }, index=pd.Index(numeric, dtype=object))
+    flags = pd.DataFrame({"iqr": iqr_mask.any(axis=1), "mad": mad_mask.any(axis=1)}, index=df.index)
+    
+    if isolation_forest and numeric and len(df):
+        # Imported on demand: the forest is optional and scikit-learn is slow to import
+        from sklearn.ensemble import IsolationForest
+        filled = np.where(np.isnan(values), np.nan_to_num(median), values)
+        rng = np.random.default_rng(0)
+        sample = filled[rng.choice(len(filled), min(sample_rows, len(filled)), replace=False)]
+        model = IsolationForest(random_state=0).fit(sample)
+        predictions = [model.predict(filled[start:start + STATS_CHUNK_ROWS])
+                       for start in range(0, len(filled), STATS_CHUNK_ROWS)]
+        flags["isolation_forest"] = np.concatenate(predictions) == -1
+    
+    return OutlierReport(columns, flags)
+
+@memoize
+def get_outliers(df: pd.DataFrame, isolation_forest: bool = OUTLIER_ISOLATION_FOREST) -> OutlierReport:
+    """Cached `detect_outliers` of a DataFrame, computed once per dataset."""
+    return detect_outliers(df, isolation_forest=isolation_forest)
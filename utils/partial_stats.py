@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional
+from config.settings import STATS_CHUNK_ROWS, STATS_WORKERS, SKETCH_MIN_ROWS
+from .sketches import HyperLogLog, QuantileSketch
+from .process_pool import get_process_pool, reset_process_pool
+
+class PartialStats:
+    """
+    Mergeable per-column aggregates of a block of rows.
+    
+    Every column has its `count` of non-missing values and `nulls`. Numeric
+    columns also keep `mean` and `m2` (sum of squared deviations, as in
+    Welford's algorithm), `min` and `max`. With sketches enabled every column
+    has a `distinct` HyperLogLog and numeric columns a `quantiles` sketch.
+    
+    Partials of disjoint row blocks combine with `merge` in any order, so
+    they can be computed on chunks in parallel or batch by batch as rows
+    stream in.
+    """
+    
+    def __init__(self, columns: Dict[str, Dict[str, Any]], rows: int = 0, sketches: bool = False):
+        self.columns = columns
+        self.rows = rows
+        self.sketches = sketches
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, sketches: bool = False) -> "PartialStats":
+        """
+        Aggregate a block of rows.
+        
+        Args:
+            df: Row block
+            sketches: Also build distinct-count and quantile sketches
+        
+        Returns:
+            PartialStats: Aggregates of `df`
+        """
+        counts = df.notna().sum()
+        columns = {
+            column: {"count": int(counts[column]), "nulls": int(len(df) - counts[column])}
+            for column in df.columns
+        }
+        
+        numeric = _numeric_columns(df)
+        if numeric:
+            block = df[numeric].to_numpy(dtype=float, na_value=np.nan)
+            filled = counts[numeric].to_numpy() > 0
+            with np.errstate(invalid="ignore"):
+                means = np.where(filled, np.nansum(block, axis=0) / np.maximum(counts[numeric].to_numpy(), 1), np.nan)
+                m2 = np.nansum((block - means) ** 2, axis=0)
+            lowest = np.full(len(numeric), np.nan)
+            highest = np.full(len(numeric), np.nan)
+            if filled.any():
+                lowest[filled] = np.nanmin(block[:, filled], axis=0)
+                highest[filled] = np.nanmax(block[:, filled], axis=0)
+            for idx, column in enumerate(numeric):
+                columns[column].update({
+                    "mean": float(means[idx]),
+                    "m2": float(m2[idx]),
+                    "min": float(lowest[idx]),
+                    "max": float(highest[idx])
+                })
+        
+        if sketches:
+            for column in df.columns:
+                distinct = HyperLogLog()
+                distinct.add(df[column])
+                columns[column]["distinct"] = distinct
+            for column in numeric:
+                quantiles = QuantileSketch(seed=0)
+                quantiles.add(df[column])
+                columns[column]["quantiles"] = quantiles
+        
+        return cls(columns, len(df), sketches)
+    
+    def update(self, batch: pd.DataFrame) -> "PartialStats":
+        """Fold a newly arrived batch of rows into the aggregates."""
+        return self.merge(PartialStats.from_frame(batch, sketches=self.sketches))
+    
+    def merge(self, other: "PartialStats") -> "PartialStats":
+        """
+        Combine the aggregates of another, disjoint block of rows into this one.
+        
+        Means and squared deviations are combined with Chan's parallel
+        update, so no precision is lost against a single pass.
+        
+        Args:
+            other: Aggregates of other rows with the same columns
+        
+        Returns:
+            PartialStats: self, for chaining
+        """
+        for column, theirs in other.columns.items():
+            ours = self.columns.get(column)
+            if ours is None:
+                self.columns[column] = theirs
+                continue
+            
+            count = ours["count"] + theirs["count"]
+            if "mean" in theirs:
+                if "mean" not in ours or not ours["count"]:
+                    ours.update({key: theirs[key] for key in ("mean", "m2", "min", "max")})
+                elif theirs["count"]:
+                    delta = theirs["mean"] - ours["mean"]
+                    ours["mean"] += delta * theirs["count"] / count
+                    ours["m2"] += theirs["m2"] + delta * delta * ours["count"] * theirs["count"] / count
+                    ours["min"] = min(ours["min"], theirs["min"])
+                    ours["max"] = max(ours["max"], theirs["max"])
+            ours["count"] = count
+            ours["nulls"] += theirs["nulls"]
+            
+            for key in ("distinct", "quantiles"):
+                if key not in theirs:
+                    continue
+                if key in ours:
+                    ours[key].merge(theirs[key])
+                else:
+                    ours[key] = theirs[key]
+        
+        self.rows += other.rows
+        return self
+    
+    def column_stats(self, column: str) -> Dict[str, Any]:
+        """
+        Final statistics of one column.
+        
+        Args:
+            column: Column name
+        
+        Returns:
+            Dict with `count` and `nulls`, plus `mean`, `std` (sample
+            standard deviation), `min` and `max` for numeric columns
+        """
+        partial = self.columns[column]
+        stats = {"count": partial["count"], "nulls": partial["nulls"]}
+        if "mean" in partial:
+            count = partial["count"]
+            stats.update({
+                "mean": partial["mean"] if count else np.nan,
+                "std": float(np.sqrt(partial["m2"] / (count - 1))) if count > 1 else np.nan,
+                "min": partial["min"],
+                "max": partial["max"]
+            })
+        return stats
+
+    def sketches_dict(self, min_rows: int = SKETCH_MIN_ROWS) -> Optional[Dict[str, Any]]:
+        """
+        Serialize the sketches in the format `load_sketches` reads from `df.attrs["sketches"]`.
+        
+        Args:
+            min_rows: Smallest number of rows worth keeping sketches for
+        
+        Returns:
+            Optional[Dict[str, Any]]: Serialized sketches with the row count
+            they describe, or None without sketches or below `min_rows` rows
+        """
+        if not self.sketches or self.rows < min_rows:
+            return None
+        columns = {}
+        for column, partial in self.columns.items():
+            if "distinct" not in partial:
+                continue
+            columns[column] = {"distinct": partial["distinct"].to_dict()}
+            if "quantiles" in partial:
+                columns[column]["quantiles"] = partial["quantiles"].to_dict()
+        return {"rows": self.rows, "columns": columns}
+
+def compute_partial_stats(df: pd.DataFrame, chunk_rows: int = STATS_CHUNK_ROWS,
+                          max_workers: int = STATS_WORKERS, sketches: bool = False) -> PartialStats:
+    """
+    Aggregate a DataFrame chunk by chunk, in parallel when it is large.
+    
+    The rows are split into chunks of `chunk_rows`; each chunk is aggregated
+    in the shared worker pool (`get_process_pool`) and the partials are
+    merged in order. Frames of a single chunk never leave this process.
+    
+    Args:
+        df: Input DataFrame
+        chunk_rows: Rows per chunk
+        max_workers: 1 aggregates every chunk in this process
+        sketches: Also build distinct-count and quantile sketches
+    
+    Returns:
+        PartialStats: Aggregates of the whole DataFrame
+    """
+    chunks = [df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows)]
+    partials = None
+    if len(chunks) > 1 and max_workers > 1:
+        pool = get_process_pool()
+        try:
+            partials = list(pool.map(PartialStats.from_frame, chunks, [sketches] * len(chunks)))
+        except BrokenProcessPool:
+            # A worker died; start over with a fresh pool next time and finish here
+            reset_process_pool(pool)
+    if partials is None:
+        partials = [PartialStats.from_frame(chunk, sketches) for chunk in chunks]
+    
+    result = PartialStats({column: {"count": 0, "nulls": 0} for column in df.columns}, sketches=sketches)
+    for partial in partials:
+        result.merge(partial)
+    return result
+
+def _numeric_columns(df: pd.DataFrame) -> List[str]:
+    """Numeric columns with moments; booleans are counted but not averaged."""
+    return [column for column in df.columns
+            if pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column])]
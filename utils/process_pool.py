@@ -0,0 +1,44 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from config.settings import MAX_PARSE_WORKERS, STATS_WORKERS
+
+# Pool shared by sheet parsing and chunked statistics, started on first use
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the worker process pool shared by every session of the app.
+    
+    Workers are started once and reused, so a profile build or an upload does
+    not pay for process start-up. They are started with the "forkserver"
+    method (or "spawn" where it is unavailable) rather than forked from the
+    Streamlit server, whose threads may hold locks at fork time.
+    
+    Returns:
+        ProcessPoolExecutor: Pool with the larger of `MAX_PARSE_WORKERS` and
+        `STATS_WORKERS` workers
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _POOL = ProcessPoolExecutor(max_workers=max(MAX_PARSE_WORKERS, STATS_WORKERS),
+                                        mp_context=multiprocessing.get_context(method))
+        return _POOL
+
+def reset_process_pool(pool: ProcessPoolExecutor):
+    """
+    Discard a pool that stopped working (e.g. a worker was killed), so the next
+    `get_process_pool` call starts a new one.
+    
+    Args:
+        pool: Pool returned by `get_process_pool`
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
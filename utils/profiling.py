@@ -0,0 +1,282 @@
+import weakref
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Tuple
+from config.settings import PROFILE_TOP_K, EXACT_STATISTICS, CATEGORY_MAX_RATIO
+from .type_inference import infer_column_type
+from .sketches import load_sketches
+from .partial_stats import compute_partial_stats
+from .heavy_hitters import top_k_values
+
+QUANTILES = (0.25, 0.5, 0.75)
+# Row × column hashes sorted at once when counting distinct values (128 MB)
+_DISTINCT_BLOCK_CELLS = 1 << 24
+
+# Profiles of live DataFrames, keyed by object id and then by the `exact` flag, dropped with the frame
+_PROFILES: Dict[int, Dict[bool, "DatasetProfile"]] = {}
+
+class DatasetProfile:
+    """
+    Per-column statistics of a DataFrame, computed once and shared by every view.
+    
+    Each column entry holds `dtype`, `type`, `count`, `nulls`, `distinct`,
+    `top_values` (list of (value, count) pairs, most frequent first) and, for
+    numeric columns, `mean`, `std`, `min`, `max`, `q25`, `median`, `q75` and
+    `max_index` (index label of the largest value). Date columns have `min`
+    and `max`.
+    
+    When `approximate` is set, distinct counts and quartiles come from the
+    sketches built during ingestion, and high-cardinality columns have no
+    `top_values`.
+    """
+    
+    def __init__(self, rows: int, columns: Dict[str, Dict[str, Any]],
+                 approximate: bool = False, exact: bool = EXACT_STATISTICS):
+        self.rows = rows
+        self.columns = columns
+        self.approximate = approximate
+        self.exact = exact
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, top_k: int = PROFILE_TOP_K,
+                   exact: bool = EXACT_STATISTICS) -> "DatasetProfile":
+        """
+        Profile every column of a DataFrame.
+        
+        Null counts and moments are computed on row chunks in parallel and
+        merged (`compute_partial_stats`); quantiles are computed for all
+        numeric columns at once, and top values come from a bounded
+        heavy-hitters count (`top_k_values`) per column, which also gives the
+        distinct count of columns with few values. The distinct counts of the
+        remaining columns come from one sort of all their value hashes
+        (`_distinct_counts`). Unless `exact` is set,
+        frames with ingestion sketches take distinct counts and quartiles from
+        the sketches and skip counting high-cardinality columns.
+        
+        Args:
+            df: Input DataFrame
+            top_k: Number of most frequent values kept per column
+            exact: Ignore sketches and compute every statistic exactly
+        
+        Returns:
+            DatasetProfile: Profile of `df`
+        """
+        partial = compute_partial_stats(df)
+        inferred = df.attrs.get("column_types", {})
+        sketches = None if exact else load_sketches(df)
+        columns = {}
+        uncounted = []
+        
+        for column in df.columns:
+            series = df[column]
+            column_stats = partial.column_stats(column)
+            count = column_stats["count"]
+            sketch = sketches.get(column) if sketches else None
+            estimate = min(count, sketch["distinct"].estimate()) if sketch is not None else None
+            # Top values only matter for repetitive columns, where counting them is cheap
+            if estimate is not None and estimate > count * CATEGORY_MAX_RATIO:
+                top = {"values": []}
+            else:
+                top = top_k_values(series, top_k)
+            if "distinct" in top:
+                distinct = top["distinct"]
+            elif estimate is not None:
+                distinct = estimate
+            else:
+                distinct = 0
+                uncounted.append(column)
+            column_type = (inferred[column]["type"] if column in inferred
+                           else infer_column_type(series)["type"])
+            columns[column] = {
+                "dtype": str(series.dtype),
+                "type": column_type,
+                "count": count,
+                "nulls": column_stats["nulls"],
+                "distinct": int(distinct),
+                "top_values": top["values"]
+            }
+        
+        if uncounted:
+            for column, distinct in _distinct_counts(df[uncounted]).items():
+                columns[column]["distinct"] = distinct
+        
+        numeric = df.select_dtypes(include=[np.number])
+        if not numeric.empty:
+            sketched = [column for column in numeric.columns
+                        if sketches and "quantiles" in sketches.get(column, {})]
+            unsketched = [column for column in numeric.columns if column not in sketched]
+            quantiles = pd.DataFrame({
+                column: sketches[column]["quantiles"].quantiles(QUANTILES) for column in sketched
+            }, index=list(QUANTILES))
+            if unsketched:
+                quantiles = pd.concat([quantiles, numeric[unsketched].quantile(list(QUANTILES))], axis=1)
+            quartiles = {"q25": quantiles.loc[0.25], "median": quantiles.loc[0.5], "q75": quantiles.loc[0.75]}
+            filled = [column for column in numeric.columns if columns[column]["count"]]
+            max_index = numeric[filled].idxmax() if filled else pd.Series(dtype=object)
+            for column in numeric.columns:
+                moments = partial.column_stats(column)
+                columns[column].update({name: _scalar(moments[name]) for name in ("mean", "std", "min", "max")})
+                columns[column].update({name: _scalar(values[column]) for name, values in quartiles.items()})
+                columns[column]["max_index"] = max_index.get(column)
+        
+        dates = df.select_dtypes(include=["datetime", "datetimetz"])
+        if not dates.empty:
+            lowest, highest = dates.min(), dates.max()
+            for column in dates.columns:
+                columns[column].update({"min": lowest[column], "max": highest[column]})
+        
+        return cls(len(df), columns, approximate=bool(sketches), exact=exact)
+    
+    def __getitem__(self, column: str) -> Dict[str, Any]:
+        return self.columns[column]
+    
+    def __contains__(self, column: str) -> bool:
+        return column in self.columns
+    
+    @property
+    def total_nulls(self) -> int:
+        """Number of missing cells in the whole DataFrame."""
+        return sum(stats["nulls"] for stats in self.columns.values())
+    
+    @property
+    def total_distinct(self) -> int:
+        """Sum of the distinct counts of all columns."""
+        return sum(stats["distinct"] for stats in self.columns.values())
+    
+    def numeric_columns(self) -> List[str]:
+        """Columns with numeric statistics, in DataFrame order."""
+        return [column for column, stats in self.columns.items() if "mean" in stats]
+    
+    def text_columns(self) -> List[str]:
+        """Categorical and free-text columns stored as strings, in DataFrame order."""
+        return [column for column, stats in self.columns.items()
+                if stats["type"] in ("categorical", "text") and stats["dtype"] in ("object", "category", "string")]
+    
+    def most_frequent(self, column: str) -> Optional[Tuple[Any, int]]:
+        """
+        Most frequent value of a column with its count.
+        
+        Args:
+            column: Column name
+        
+        Returns:
+            Optional[Tuple[Any, int]]: (value, count) pair, or None when the
+            column has no values (or, in approximate profiles, is too varied
+            to have top values)
+        """
+        top_values = self.columns[column]["top_values"]
+        return top_values[0] if top_values else None
+
+def get_profile(df: pd.DataFrame, exact: bool = EXACT_STATISTICS) -> DatasetProfile:
+    """
+    Return the profile of a DataFrame, computing it on first use.
+    
+    The profile is remembered for as long as the DataFrame object lives, so
+    Streamlit reruns that reuse the same DataFrame only pay for a lookup.
+    Exact and sketch-based profiles are kept side by side, so callers asking
+    for different `exact` flags do not evict each other; frames without
+    sketches have a single profile serving both. Profiles are rebuilt when
+    the frame's shape or columns changed.
+    
+    Args:
+        df: Input DataFrame
+        exact: Compute distinct counts and quantiles exactly instead of from sketches
+    
+    Returns:
+        DatasetProfile: Profile of `df`
+    """
+    key = id(df)
+    profiles = _PROFILES.get(key)
+    if profiles is None:
+        weakref.finalize(df, _PROFILES.pop, key, None)
+        profiles = _PROFILES[key] = {}
+    elif any(profile.rows != len(df) or list(profile.columns) != list(df.columns)
+             for profile in profiles.values()):
+        profiles.clear()
+
+    profile = profiles.get(exact)
+    if profile is None:
+        profile = DatasetProfile.from_frame(df, exact=exact)
+        profiles[exact] = profile
+        # Without sketches every statistic is exact either way
+        if not profile.approximate:
+            profiles[not exact] = profile
+    return profile
+
+def suggest_bin_count(df: pd.DataFrame, column: str, exact: bool = EXACT_STATISTICS,
+                      min_bins: int = 10, max_bins: int = 100) -> int:
+    """
+    Choose a histogram bin count with the Freedman-Diaconis rule.
+    
+    The interquartile range comes from the dataset profile, so large sheets
+    use their quantile sketch instead of sorting the column.
+    
+    Args:
+        df: Input DataFrame
+        column: Numeric column to bin
+        exact: Compute the quartiles exactly instead of from sketches
+        min_bins: Smallest bin count returned
+        max_bins: Largest bin count returned
+    
+    Returns:
+        int: Number of bins
+    """
+    stats = get_profile(df, exact=exact)[column]
+    if "q75" not in stats or not stats["count"]:
+        return min_bins
+    
+    width = 2 * (stats["q75"] - stats["q25"]) / stats["count"] ** (1 / 3)
+    spread = stats["max"] - stats["min"]
+    if not width > 0 or not spread > 0:
+        return min_bins
+    return int(np.clip(np.ceil(spread / width), min_bins, max_bins))
+
+def _distinct_counts(df: pd.DataFrame, block_cells: int = _DISTINCT_BLOCK_CELLS) -> Dict[str, int]:
+    """
+    Count the distinct non-missing values of every column in one vectorized pass.
+    
+    Each column is hashed to 64 bits (numbers as float64, so 1 and 1.0 are
+    one value) into a rows × columns matrix, which is sorted along the rows
+    once; distinct values are the changes between neighbours. Columns are
+    processed in blocks of at most `block_cells` hashes to bound the memory.
+    
+    Args:
+        df: Columns to count
+        block_cells: Largest number of hashes sorted at once
+    
+    Returns:
+        Dict[str, int]: Distinct count per column
+    """
+    counts = {}
+    if not len(df):
+        return {column: 0 for column in df.columns}
+    
+    width = max(1, block_cells // len(df))
+    for start in range(0, len(df.columns), width):
+        block = df.iloc[:, start:start + width]
+        hashes = np.empty((len(block), len(block.columns)), dtype=np.uint64)
+        empty = np.zeros(len(block.columns), dtype=bool)
+        for position in range(len(block.columns)):
+            series = block.iloc[:, position]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                series = series.astype(np.float64)
+            column_hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+            # Missing cells repeat a present value, so they add no distinct value of their own
+            missing = series.isna().to_numpy()
+            if missing.all():
+                empty[position] = True
+            elif missing.any():
+                column_hashes[missing] = column_hashes[np.argmin(missing)]
+            hashes[:, position] = column_hashes
+        hashes.sort(axis=0)
+        changes = np.count_nonzero(hashes[1:] != hashes[:-1], axis=0) + 1
+        changes[empty] = 0
+        for column, count in zip(block.columns, changes):
+            counts[column] = int(count)
+    return counts
+
+def _scalar(value: Any) -> Any:
+    """Convert numpy and pandas scalars to plain Python numbers, mapping NA to NaN."""
+    if pd.isna(value):
+        return np.nan
+    return value.item() if hasattr(value, "item") else value
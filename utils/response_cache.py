@@ -0,0 +1,173 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.settings import RESPONSE_CACHE_PATH, RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES
+from .text_utils import normalize_text
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.,;:…]+$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_used ON responses (used);
+"""
+
+def normalize_query(query: str) -> str:
+    """Lower-case a question, collapse its whitespace and drop trailing punctuation."""
+    return _TRAILING_PUNCTUATION.sub("", normalize_text(query))
+
+def response_key(query: str, model: str, parameters: Dict[str, Any], fingerprint: str) -> str:
+    """
+    Cache key of a model response.
+    
+    Args:
+        query: User's question (normalized here, see `normalize_query`)
+        model: Model name
+        parameters: Request parameters that change the answer (temperature, ...)
+        fingerprint: Fingerprint of the dataset the question is about
+    
+    Returns:
+        str: Hex digest identifying the request
+    """
+    parts = [normalize_query(query), model, json.dumps(parameters, sort_keys=True), fingerprint]
+    return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+class ResponseCache:
+    """
+    On-disk cache of model responses in a SQLite database, with TTL and LRU eviction.
+    
+    Entries expire `ttl` seconds after they were stored. When there are more
+    than `max_entries`, the least recently used ones are evicted first. The
+    database is shared by every session and process of the app and survives
+    restarts; hit counters are kept per process. Database errors never
+    reach callers: a failing lookup is a miss and a failing store is skipped.
+    """
+    
+    def __init__(self, path: Path = RESPONSE_CACHE_PATH, ttl: int = RESPONSE_CACHE_TTL,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response.
+        
+        Args:
+            key: Cache key (see `response_key`)
+        
+        Returns:
+            Optional[str]: Cached response, or None when there is none
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                row = connection.execute(
+                    "SELECT response FROM responses WHERE key = ? AND created >= ?", (key, now - self.ttl)
+                ).fetchone()
+                if row is not None:
+                    with connection:
+                        connection.execute("UPDATE responses SET used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+    
+    def put(self, key: str, response: str):
+        """
+        Store a response, evicting expired and least recently used entries.
+        
+        Args:
+            key: Cache key (see `response_key`)
+            response: Model response
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO responses (key, response, created, used) VALUES (?, ?, ?, ?)",
+                        (key, response, now, now)
+                    )
+                    expired = connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                    excess = connection.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    )
+                self.evictions += expired.rowcount + excess.rowcount
+            except sqlite3.Error:
+                pass
+    
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.execute("DELETE FROM responses")
+            except sqlite3.Error:
+                pass
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the cache usage.
+        
+        Returns:
+            Dict with `hits`, `misses`, `hit_rate` and `evictions` of this
+            process and the number of stored `entries`
+        """
+        with self._lock:
+            try:
+                entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            except sqlite3.Error:
+                entries = 0
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries
+            }
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use; the caller holds the lock."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Streamlit runs sessions in threads, which share the connection under the lock
+            connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            # Write-ahead logging lets other processes read while one writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+# Cache shared by every session of the process
+RESPONSE_CACHE = ResponseCache()
+
+def response_cache_stats() -> Dict[str, Any]:
+    """Report the usage of the shared response cache (see `ResponseCache.stats`)."""
+    return RESPONSE_CACHE.stats()
@@ -0,0 +1,267 @@
+import copy
+import functools
+import hashlib
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CACHE_TTL, MAX_CACHE_SIZE, CACHE_MAX_MEMORY
+
+# Fingerprints of live DataFrames, keyed by object id and dropped with the frame
+_FINGERPRINTS: Dict[int, Tuple[Tuple[int, ...], str]] = {}
+_FINGERPRINT_LOCK = threading.Lock()
+
+# Attributes telling which rows a frame stands for, so results computed on a
+# reservoir sample or a preview are never served for the full data
+_PROVENANCE_ATTRS = ("approximate", "rows_seen", "sample_size", "preview", "sampled_rows")
+
+def fingerprint_frame(df: Union[pd.DataFrame, pd.Series]) -> str:
+    """
+    Compute a content fingerprint of a DataFrame or Series.
+
+    The fingerprint digests the 64-bit hash of every row (index included)
+    together with the schema and the attributes that mark samples and
+    previews (`approximate`, `rows_seen`, ...), so equal data in equal
+    columns always gets the same fingerprint, whichever object holds it. The
+    result is remembered for as long as the object lives and is recomputed
+    when its shape, column names, dtypes or those attributes change.
+
+    Fingerprinted frames are treated as immutable: an in-place edit of values
+    that keeps shape, columns and dtypes is not noticed, and memoized results
+    and export files of the old contents would be served for it. Derive a new
+    frame instead (e.g. with `assign`).
+    
+    Args:
+        df: Input DataFrame or Series
+
+    Returns:
+        str: Hex digest identifying the contents of `df`
+    """
+    key = id(df)
+    if isinstance(df, pd.Series):
+        schema = [(str(df.name), str(df.dtype))]
+    else:
+        schema = [(str(column), str(dtype)) for column, dtype in df.dtypes.items()]
+    provenance = [(name, df.attrs[name]) for name in _PROVENANCE_ATTRS if name in df.attrs]
+    shape = (type(df).__name__, len(df), hash(repr(schema)), hash(repr(provenance)))
+    with _FINGERPRINT_LOCK:
+        remembered = _FINGERPRINTS.get(key)
+    if remembered is not None and remembered[0] == shape:
+        return remembered[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((type(df).__name__, schema, provenance)).encode("utf-8"))
+    if len(df):
+        row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        digest.update(np.ascontiguousarray(row_hashes).tobytes())
+    fingerprint = digest.hexdigest()
+    
+    with _FINGERPRINT_LOCK:
+        if key not in _FINGERPRINTS:
+            weakref.finalize(df, _FINGERPRINTS.pop, key, None)
+        _FINGERPRINTS[key] = (shape, fingerprint)
+    return fingerprint
+
+class ResultCache:
+    """
+    In-memory cache of computed results with LRU and TTL eviction.
+    
+    Entries expire `ttl` seconds after they were stored. When the number of
+    entries exceeds `max_entries` or their estimated size exceeds
+    `max_memory` bytes, the least recently used entries are evicted first.
+    """
+    
+    def __init__(self, ttl: int = CACHE_TTL, max_entries: int = MAX_CACHE_SIZE,
+                 max_memory: int = CACHE_MAX_MEMORY):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.memory = 0
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up a result.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            Tuple of (found, value); value is None when not found
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+    
+    def put(self, key: str, value: Any):
+        """
+        Store a result, evicting older entries to stay within the limits.
+        
+        Results larger than the whole memory budget are not stored.
+        
+        Args:
+            key: Cache key
+            value: Result to store
+        """
+        size = estimate_size(value)
+        if size > self.max_memory:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.time(), size)
+            self.memory += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self.memory > self.max_memory):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.memory = 0
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the cache usage.
+        
+        Returns:
+            Dict with `hits`, `misses`, `hit_rate`, `evictions`, `entries`
+            and `memory` (estimated bytes held)
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "memory": self.memory
+            }
+    
+    def _remove(self, key: str):
+        """Remove an entry; the caller holds the lock."""
+        _, _, size = self._entries.pop(key)
+        self.memory -= size
+
+# Cache shared by every memoized function; it lives as long as the process,
+# so results survive Streamlit reruns of the app script
+RESULT_CACHE = ResultCache()
+
+def memoize(func: Optional[Callable] = None, *, cache: Optional[ResultCache] = None) -> Callable:
+    """
+    Cache the results of a function keyed by the fingerprints of its DataFrame arguments.
+    
+    DataFrame and Series arguments are identified by `fingerprint_frame`
+    (so a sample or preview never shares results with the full data),
+    other arguments by their `repr`. Every caller gets its own copy of
+    figures, lists, tuples and dicts in a result, so styling a returned
+    figure does not change the cached one. DataFrames, Series and arrays are
+    shared without copying (a copy per rerun would defeat the caches keyed by
+    frame identity) and, like every fingerprinted frame, must not be modified
+    in place.
+    
+    Can be used as `@memoize` or `@memoize(cache=...)`.
+    
+    Args:
+        func: Function to wrap
+        cache: Cache holding the results (default: the shared `RESULT_CACHE`)
+    
+    Returns:
+        Callable: Wrapped function
+    """
+    if func is None:
+        return functools.partial(memoize, cache=cache)
+    
+    name = f"{func.__module__}.{func.__qualname__}"
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = cache if cache is not None else RESULT_CACHE
+        key_parts = [name]
+        key_parts.extend(_argument_key(arg) for arg in args)
+        key_parts.extend(f"{key}={_argument_key(value)}" for key, value in sorted(kwargs.items()))
+        key = hashlib.blake2b("\x1f".join(key_parts).encode("utf-8"), digest_size=16).hexdigest()
+        
+        found, result = store.get(key)
+        if not found:
+            result = func(*args, **kwargs)
+            store.put(key, result)
+        return _detach(result)
+    
+    return wrapper
+
+def cache_stats() -> Dict[str, Any]:
+    """Report the usage of the shared result cache (see `ResultCache.stats`)."""
+    return RESULT_CACHE.stats()
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory held by a cached result in bytes.
+    
+    Args:
+        value: Cached result (DataFrame, figure, bytes, containers, ...)
+    
+    Returns:
+        int: Approximate size in bytes
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if hasattr(value, "to_plotly_json"):
+        return estimate_size(value.to_plotly_json())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value))
+    return sys.getsizeof(value)
+
+def _detach(value: Any) -> Any:
+    """Copy the mutable containers and figures of a cached result; frames and arrays are shared."""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value
+    if hasattr(value, "to_plotly_json"):
+        return copy.deepcopy(value)
+    if isinstance(value, tuple):
+        return tuple(_detach(item) for item in value)
+    if isinstance(value, list):
+        return [_detach(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _detach(item) for key, item in value.items()}
+    return value
+
+def _argument_key(value: Any) -> str:
+    """Identify an argument in a cache key."""
+    if isinstance(value, pd.DataFrame):
+        return f"frame:{fingerprint_frame(value)}"
+    if isinstance(value, pd.Series):
+        return f"series:{fingerprint_frame(value)}"
+    return f"{type(value).__name__}:{value!r}"
@@ -0,0 +1,202 @@
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Callable, Optional
+from config.settings import RESERVOIR_SIZE
+from .type_inference import infer_and_coerce_types
+
+# Two-sided 95% normal quantile used for the error bounds
+Z_95 = 1.96
+
+class ReservoirSample:
+    """
+    Uniform random sample of fixed size over a stream of row batches.
+    
+    Implements reservoir sampling (Algorithm R) one batch at a time with
+    vectorized slot selection, so every row seen so far has the same
+    probability of being in the sample.
+    
+    Snapshots convert the sampled rows with `prepare` (by default the type
+    inference of the full parse) and are reused until new rows arrive.
+    """
+    
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: Optional[int] = None,
+                 prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None):
+        self.size = size
+        self.seen = 0
+        self.frame: Optional[pd.DataFrame] = None
+        self.prepare = prepare if prepare is not None else _infer_types
+        self._snapshot: Optional[pd.DataFrame] = None
+        self._snapshot_seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+    
+    def add(self, batch: pd.DataFrame):
+        """Offer a batch of rows to the reservoir."""
+        if batch.empty:
+            return
+        
+        positions = np.arange(len(batch))
+        stream_index = self.seen + positions
+        
+        # Rows that arrive while the reservoir is not yet full are always kept
+        fill = positions[stream_index < self.size]
+        
+        # Later rows replace a random slot with probability size / (index + 1)
+        rest = positions[stream_index >= self.size]
+        slots = self._rng.integers(0, stream_index[rest] + 1) if len(rest) else rest
+        chosen = slots < self.size
+        slots, rows = slots[chosen], rest[chosen]
+        
+        # When several rows hit the same slot the last one wins, as in the sequential algorithm
+        unique_slots, last = np.unique(slots[::-1], return_index=True)
+        rows = rows[::-1][last]
+        
+        with self._lock:
+            # Fill first, so rows later in the same batch can replace the ones just added
+            if self.frame is None:
+                reservoir = batch.iloc[fill]
+            else:
+                reservoir = pd.concat([self.frame, batch.iloc[fill]], ignore_index=True)
+            if len(unique_slots):
+                keep = np.ones(len(reservoir), dtype=bool)
+                keep[unique_slots] = False
+                reservoir = pd.concat([reservoir[keep], batch.iloc[rows]], ignore_index=True)
+            self.frame = reservoir.reset_index(drop=True)
+            self.seen += len(batch)
+    
+    def snapshot(self) -> Optional[pd.DataFrame]:
+        """
+        Return the current sample, converted by `prepare` and marked as approximate.
+        
+        The same DataFrame is returned until new rows arrive, so polling
+        callers neither convert the sample again nor lose the statistics
+        cached for it; like other shared frames it must not be modified.
+        
+        Returns:
+            Optional[pd.DataFrame]: Sample with `attrs` holding `approximate`,
+            `rows_seen` and `sample_size`, or None before the first batch
+        """
+        with self._lock:
+            if self.frame is None:
+                return None
+            if self._snapshot is not None and self._snapshot_seen == self.seen:
+                return self._snapshot
+            sample = self.frame.copy()
+            seen = self.seen
+        
+        # Attributes carried over from the batches describe whole sheets, not the sample
+        sample.attrs.clear()
+        sample = self.prepare(sample)
+        sample.attrs.update({
+            "approximate": True,
+            "rows_seen": seen,
+            "sample_size": len(sample)
+        })
+        with self._lock:
+            if seen >= self._snapshot_seen:
+                self._snapshot, self._snapshot_seen = sample, seen
+        return sample
+
+def _infer_types(sample: pd.DataFrame) -> pd.DataFrame:
+    """Give a sample the column types the full parse will produce."""
+    sample, column_types = infer_and_coerce_types(sample)
+    sample.attrs["column_types"] = column_types
+    return sample
+
+def is_approximate(df: pd.DataFrame) -> bool:
+    """Check whether a DataFrame is a reservoir sample standing in for the full data."""
+    return bool(df.attrs.get("approximate"))
+
+def population_size(df: pd.DataFrame) -> int:
+    """Number of rows the DataFrame represents (rows seen for a sample)."""
+    return int(df.attrs.get("rows_seen", len(df)))
+
+def estimate_mean(series: pd.Series, population: int) -> Dict[str, float]:
+    """
+    Estimate a column mean from a simple random sample with a 95% error bound.
+    
+    Args:
+        series: Sampled numeric values
+        population: Number of rows the sample was drawn from
+    
+    Returns:
+        Dict with the `mean` estimate and its `error` (half-width of the 95%
+        confidence interval, including the finite population correction)
+    """
+    values = series.dropna().astype(float)
+    n = len(values)
+    if n == 0:
+        return {"mean": np.nan, "error": np.nan}
+    if n == 1:
+        return {"mean": float(values.iloc[0]), "error": 0.0}
+    
+    # Blank cells are not part of the mean, so the population shrinks in the same proportion
+    population = max(n, round(population * n / len(series)))
+    correction = max(0.0, (population - n) / (population - 1))
+    error = Z_95 * values.std(ddof=1) / np.sqrt(n) * np.sqrt(correction)
+    return {"mean": float(values.mean()), "error": float(error)}
+
+def estimate_total(series: pd.Series, population: int) -> Dict[str, float]:
+    """
+    Estimate a column sum over the population from a sample.
+    
+    Args:
+        series: Sampled numeric values
+        population: Number of rows the sample was drawn from
+    
+    Returns:
+        Dict with the `total` estimate and its 95% `error`
+    """
+    sample_size = len(series)
+    if sample_size == 0:
+        return {"total": 0.0, "error": 0.0}
+    
+    # Treat blanks as zeros so the estimate matches Series.sum() on the full data
+    estimate = estimate_mean(series.fillna(0), population)
+    return {"total": estimate["mean"] * population, "error": estimate["error"] * population}
+
+def estimate_share(count: int, sample_size: int) -> Dict[str, float]:
+    """
+    Estimate the share of rows in a category with a 95% error bound.
+    
+    Args:
+        count: Number of sampled rows in the category
+        sample_size: Number of sampled rows
+    
+    Returns:
+        Dict with the `share` (0-1) and its `error`
+    """
+    if sample_size == 0:
+        return {"share": np.nan, "error": np.nan}
+    share = count / sample_size
+    return {"share": share, "error": Z_95 * np.sqrt(share * (1 - share) / sample_size)}
+
+def approximate_column_stats(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """
+    Estimate per-column statistics of the full data from a sample.
+    
+    Args:
+        df: Sample returned by `ReservoirSample.snapshot`
+    
+    Returns:
+        Dict mapping numeric column names to mean/total estimates with errors
+        and the sample minimum, maximum and median
+    """
+    population = population_size(df)
+    stats = {}
+    
+    for column in df.select_dtypes(include=[np.number]).columns:
+        mean = estimate_mean(df[column], population)
+        total = estimate_total(df[column], population)
+        stats[column] = {
+            "mean": mean["mean"],
+            "mean_error": mean["error"],
+            "total": total["total"],
+            "total_error": total["error"],
+            "min": df[column].min(),
+            "max": df[column].max(),
+            "median": df[column].median()
+        }
+    
+    return stats
@@ -0,0 +1,224 @@
+import base64
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional, Sequence
+from config.settings import HLL_PRECISION, QUANTILE_SKETCH_K
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch (HyperLogLog).
+    
+    Values are hashed to 64 bits with the pandas row hash (numbers as
+    float64, so sketches of int and float batches of a column agree); the first
+    `precision` bits pick a register and the register keeps the longest run
+    of leading zeros seen in the remaining bits. With the default precision of
+    14 the sketch takes 16 KB and the relative error is about 0.8%.
+    """
+    
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    def add(self, values: pd.Series):
+        """Add the non-missing values of a column to the sketch."""
+        values = values.dropna()
+        if values.empty:
+            return
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            values = values.astype(np.float64)
+        
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        suffix_bits = 64 - self.precision
+        slots = (hashes >> np.uint64(suffix_bits)).astype(np.intp)
+        suffix = hashes & np.uint64((1 << suffix_bits) - 1)
+        
+        # Rank = position of the first set bit of the suffix, counted from its top
+        rank = (suffix_bits - _bit_length(suffix) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, slots, rank)
+    
+    def merge(self, other: "HyperLogLog"):
+        """Fold another sketch of the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("Fərqli dəqiqlikli HyperLogLog eskizləri birləşdirilə bilməz")
+        np.maximum(self.registers, other.registers, out=self.registers)
+    
+    def estimate(self) -> int:
+        """Estimated number of distinct values added so far."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        
+        # Linear counting is more accurate while many registers are still empty
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch to JSON-compatible values."""
+        return {"precision": self.precision, "registers": _encode(self.registers)}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HyperLogLog":
+        """Rebuild a sketch serialized by `to_dict`."""
+        sketch = cls(data["precision"])
+        sketch.registers = _decode(data["registers"], np.uint8).copy()
+        return sketch
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch in the style of KLL.
+    
+    Values are kept in levels of compactors; an item at level h stands for
+    2**h input values. When a level outgrows its capacity it is sorted and
+    every other item (random offset) is promoted to the next level. Level
+    capacities shrink geometrically towards the bottom, so the sketch holds
+    O(k) items and answers rank queries with an error of about 1.7 / k.
+    """
+    
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    def add(self, values: pd.Series):
+        """Add the non-missing values of a numeric column to the sketch."""
+        values = pd.Series(values).dropna().to_numpy(dtype=float)
+        if len(values) == 0:
+            return
+        
+        self.count += len(values)
+        self.min = np.nanmin([self.min, values.min()])
+        self.max = np.nanmax([self.max, values.max()])
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch into this one."""
+        if other.count == 0:
+            return
+        
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for height, items in enumerate(other.levels):
+            self.levels[height] = np.concatenate([self.levels[height], items])
+        self.count += other.count
+        self.min = np.nanmin([self.min, other.min])
+        self.max = np.nanmax([self.max, other.max])
+        self._compress()
+    
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """
+        Estimate quantiles of the values added so far.
+        
+        Args:
+            qs: Quantile levels between 0 and 1
+        
+        Returns:
+            List of estimated values, NaN when the sketch is empty
+        """
+        if self.count == 0:
+            return [np.nan] * len(qs)
+        
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** height, dtype=np.int64)
+                                  for height, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        estimates = items[np.clip(positions, 0, len(items) - 1)]
+        # The extremes are tracked exactly
+        estimates = np.where(np.asarray(qs) <= 0, self.min, estimates)
+        estimates = np.where(np.asarray(qs) >= 1, self.max, estimates)
+        return [float(value) for value in estimates]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch to JSON-compatible values."""
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": None if np.isnan(self.min) else float(self.min),
+            "max": None if np.isnan(self.max) else float(self.max),
+            "levels": [_encode(level) for level in self.levels]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        """Rebuild a sketch serialized by `to_dict`."""
+        sketch = cls(data["k"])
+        sketch.count = data["count"]
+        sketch.min = np.nan if data["min"] is None else data["min"]
+        sketch.max = np.nan if data["max"] is None else data["max"]
+        sketch.levels = [_decode(level, np.float64) for level in data["levels"]]
+        return sketch
+    
+    def _capacity(self, height: int) -> int:
+        """Number of items level `height` may hold before it is compacted."""
+        depth = len(self.levels) - 1 - height
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+    
+    def _compress(self):
+        """Compact levels until every level is within its capacity."""
+        height = 0
+        while height < len(self.levels):
+            level = self.levels[height]
+            if len(level) <= self._capacity(height):
+                height += 1
+                continue
+            
+            if height + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(level)
+            # An odd item out stays behind so the promoted half keeps the total weight
+            kept, items = items[:len(items) % 2], items[len(items) % 2:]
+            promoted = items[self._rng.integers(2)::2]
+            self.levels[height] = kept
+            self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            # A new top level lowers the capacity of every level below it
+            height = 0
+
+def load_sketches(df: pd.DataFrame) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Return the sketches built for a DataFrame during ingestion.
+    
+    Args:
+        df: Parsed DataFrame
+    
+    Returns:
+        Optional[Dict[str, Dict[str, Any]]]: Per sketched column `distinct`
+        (HyperLogLog) and, for numeric columns, `quantiles` (QuantileSketch);
+        None when the frame has no sketches or its rows changed since they
+        were built. Columns added later have no entry.
+    """
+    data = df.attrs.get("sketches")
+    if not data or data.get("rows") != len(df):
+        return None
+    
+    sketches = {}
+    for column in df.columns:
+        entry = data["columns"].get(column)
+        if entry is None:
+            continue
+        sketches[column] = {"distinct": HyperLogLog.from_dict(entry["distinct"])}
+        if "quantiles" in entry:
+            sketches[column]["quantiles"] = QuantileSketch.from_dict(entry["quantiles"])
+    return sketches
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Exact bit length of unsigned 64-bit integers (0 for 0)."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    # frexp is exact for 32-bit halves and returns exponent 0 for 0
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+def _encode(values: np.ndarray) -> str:
+    """Encode a numeric array as base64 text."""
+    return base64.b64encode(np.ascontiguousarray(values).tobytes()).decode("ascii")
+
+def _decode(text: str, dtype: Any) -> np.ndarray:
+    """Decode an array encoded by `_encode`."""
+    return np.frombuffer(base64.b64decode(text), dtype=dtype)
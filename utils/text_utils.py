@@ -0,0 +1,12 @@
+import re
+from typing import Any
+
+_WHITESPACE = re.compile(r"\s+")
+
+def collapse_whitespace(value: Any) -> str:
+    """Convert a value to a string with runs of whitespace reduced to one space and the ends trimmed."""
+    return _WHITESPACE.sub(" ", str(value)).strip()
+
+def normalize_text(value: Any) -> str:
+    """Lower-case a value and collapse its whitespace, the form texts are compared and cached in."""
+    return collapse_whitespace(value).casefold()
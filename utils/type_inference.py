@@ -0,0 +1,278 @@
+import re
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Tuple
+from config.settings import TYPE_SAMPLE_SIZE, TYPE_MATCH_RATIO, CATEGORY_MAX_RATIO
+
+# Number layouts: "1 234,56" / "1.234,56" / "12,5" and "1,234.56" / "12.5".
+# An optional currency sign or code may precede or follow the number. Values
+# such as "1.250" fit both; see `_select_number_format` for how ties are broken.
+CURRENCY = r"(?i:₼|\$|€|azn|manat)"
+NUMBER_FORMATS = {
+    "comma_decimal": re.compile(rf"\s*(?:{CURRENCY}\s*)?[+-]?(?:\d{{1,3}}(?:[\s.]\d{{3}})+|\d+)(?:,\d+)?(?:\s*{CURRENCY})?\s*"),
+    "dot_decimal": re.compile(rf"\s*(?:{CURRENCY}\s*)?[+-]?(?:\d{{1,3}}(?:,\d{{3}})+|\d+)(?:\.\d+)?(?:[eE][+-]?\d+)?(?:\s*{CURRENCY})?\s*")
+}
+# Characters dropped before conversion: spaces, currency signs and codes, and
+# the thousands separator of each layout
+NUMBER_NOISE = " \u00a0\u202f₼$€aznmtAZNMT"
+NUMBER_TRANSLATIONS = {
+    "comma_decimal": str.maketrans(",", ".", NUMBER_NOISE + "."),
+    "dot_decimal": str.maketrans("", "", NUMBER_NOISE + ",")
+}
+
+# Date layouts, most local first. "%d %B %Y" stands for Azerbaijani month
+# names ("15 yanvar 2024"), which are replaced by their number before parsing.
+MONTH_NAME_FORMAT = "%d %B %Y"
+DATE_FORMATS = [
+    "%d.%m.%Y", "%d.%m.%Y %H:%M", "%d.%m.%Y %H:%M:%S", "%d.%m.%y",
+    "%d/%m/%Y", "%d/%m/%Y %H:%M", "%d-%m-%Y", MONTH_NAME_FORMAT, "ISO8601"
+]
+AZ_MONTHS = {
+    "yanvar": 1, "fevral": 2, "mart": 3, "aprel": 4, "may": 5, "iyun": 6,
+    "iyul": 7, "avqust": 8, "sentyabr": 9, "oktyabr": 10, "noyabr": 11, "dekabr": 12
+}
+MONTH_PATTERN = re.compile(r"\s*\b(" + "|".join(AZ_MONTHS) + r")\w*\s*")
+
+# Inferred dtypes on which the pandas `.str` accessor is allowed
+TEXT_KINDS = {"string", "mixed", "mixed-integer", "empty"}
+
+def infer_column_type(series: pd.Series, sample_size: int = TYPE_SAMPLE_SIZE,
+                      match_ratio: float = TYPE_MATCH_RATIO,
+                      category_ratio: float = CATEGORY_MAX_RATIO,
+                      seed: int = 0) -> Dict[str, Any]:
+    """
+    Classify a column as numeric, date, categorical or text from a bounded sample.
+    
+    Columns that already have a numeric or datetime dtype are classified from
+    the dtype alone. Other columns are classified from at most `sample_size`
+    random values: every number layout and every date layout is tried on the
+    sample, so the cost does not grow with the number of rows. A column whose
+    dates are written in several layouts keeps all layouts that parse some of
+    the sampled values.
+    
+    Args:
+        series: Column to classify
+        sample_size: Maximum number of values examined
+        match_ratio: Share of sampled values that must coerce for a numeric
+            or date classification
+        category_ratio: Maximum unique/non-null ratio of the sample for a
+            categorical classification
+        seed: Seed of the random sample
+        
+    Returns:
+        Dict with the `type`, the detected `formats` (empty when not
+        applicable) and the `match_ratio` of those formats on the sample
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return {"type": "numeric", "formats": [], "match_ratio": 1.0}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return {"type": "date", "formats": [], "match_ratio": 1.0}
+    
+    values = series.dropna()
+    if len(values) > sample_size:
+        values = values.sample(sample_size, random_state=seed)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # String methods on a categorical work on every category, not just the sampled values
+        values = values.astype(object)
+    values = values[_text_values(values).ne("")]
+    if values.empty:
+        return {"type": "text", "formats": [], "match_ratio": 0.0}
+    
+    number_format, number_ratio = _select_number_format(values)
+    date_formats, date_ratio = _select_date_formats(values)
+    
+    if number_ratio >= match_ratio and number_ratio >= date_ratio:
+        return {"type": "numeric", "formats": [number_format], "match_ratio": float(number_ratio)}
+    if date_ratio >= match_ratio:
+        return {"type": "date", "formats": date_formats, "match_ratio": float(date_ratio)}
+    
+    ratio = float(max(number_ratio, date_ratio))
+    if isinstance(series.dtype, pd.CategoricalDtype) or values.nunique() <= len(values) * category_ratio:
+        return {"type": "categorical", "formats": [], "match_ratio": ratio}
+    return {"type": "text", "formats": [], "match_ratio": ratio}
+
+def coerce_column(series: pd.Series, inference: Dict[str, Any]) -> pd.Series:
+    """
+    Convert a whole column to the type chosen by `infer_column_type`.
+    
+    Numeric and date columns are converted with vectorized string operations
+    over the whole column; values that fit none of the detected formats become
+    missing. Text and categorical columns holding a mix of strings and other
+    values are converted to strings so the column has a single type.
+    
+    Args:
+        series: Column to convert
+        inference: Result of `infer_column_type` for the column
+        
+    Returns:
+        pd.Series: Converted column
+    """
+    if not inference["formats"]:
+        if pd.api.types.is_object_dtype(series) and pd.api.types.infer_dtype(series, skipna=True) != "string":
+            return series.where(series.isna(), series.astype(str))
+        return series
+    if inference["type"] == "numeric":
+        return _coerce_numeric(series, inference["formats"][0])
+    return _coerce_dates(series, inference["formats"])
+
+def infer_and_coerce_types(df: pd.DataFrame, sample_size: int = TYPE_SAMPLE_SIZE,
+                           match_ratio: float = TYPE_MATCH_RATIO) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Infer the type of every column and convert the columns accordingly.
+    
+    Args:
+        df: Input DataFrame
+        sample_size: Maximum number of values examined per column
+        match_ratio: Share of sampled values that must coerce for a numeric
+            or date classification
+        
+    Returns:
+        Tuple of (converted DataFrame, per-column inference report with the
+        `type`, `formats`, `match_ratio` and the number of `invalid` values
+        that did not fit the detected formats and became missing)
+    """
+    converted = {}
+    report = {}
+    
+    for column in df.columns:
+        series = df[column]
+        inference = infer_column_type(series, sample_size, match_ratio)
+        result = coerce_column(series, inference)
+        
+        inference["invalid"] = 0
+        if inference["formats"]:
+            # Blank strings were missing values before conversion too
+            failed = series[result.isna() & series.notna()]
+            inference["invalid"] = int(_text_values(failed).ne("").sum())
+        
+        converted[column] = result
+        report[column] = inference
+    
+    return pd.DataFrame(converted, index=df.index), report
+
+def _select_number_format(values: pd.Series) -> Tuple[str, float]:
+    """
+    Pick the number layout that parses the most sampled values.
+    
+    When both layouts parse equally many values, the comma layout is only
+    chosen if the sample shows it: a value with a comma that it reads as a
+    decimal separator ("12,5", "1,250"), or with dot groups the dot layout
+    cannot parse ("1.234.567"). Otherwise dot decimals such as "0.125" are
+    kept as they are rather than read as thousands.
+    
+    Args:
+        values: Non-empty sampled values of a column
+    
+    Returns:
+        Tuple of (layout name, share of values it parses)
+    """
+    parsed = {fmt: _coerce_numeric(values, fmt).notna() for fmt in NUMBER_FORMATS}
+    ratios = {fmt: float(mask.mean()) for fmt, mask in parsed.items()}
+    if ratios["comma_decimal"] != ratios["dot_decimal"]:
+        best = max(ratios, key=ratios.get)
+        return best, ratios[best]
+    
+    has_comma = _text_values(values).str.contains(",", regex=False).eq(True)
+    comma_evidence = parsed["comma_decimal"] & (has_comma | ~parsed["dot_decimal"])
+    fmt = "comma_decimal" if comma_evidence.any() else "dot_decimal"
+    return fmt, ratios[fmt]
+
+def _select_date_formats(values: pd.Series) -> Tuple[List[str], float]:
+    """Pick the date layouts that together parse the most sampled values, best first."""
+    parsed = {fmt: _coerce_dates(values, [fmt]).notna() for fmt in DATE_FORMATS}
+    covered = pd.Series(False, index=values.index)
+    formats = []
+    
+    for fmt in sorted(DATE_FORMATS, key=lambda fmt: parsed[fmt].sum(), reverse=True):
+        new = parsed[fmt] & ~covered
+        if new.any():
+            formats.append(fmt)
+            covered |= new
+    
+    return formats, float(covered.mean())
+
+def _text_values(series: pd.Series) -> pd.Series:
+    """Return the stripped string entries of a column, with NaN in place of every other value."""
+    if pd.api.types.infer_dtype(series, skipna=True) not in TEXT_KINDS:
+        return pd.Series(np.nan, index=series.index, dtype=object)
+    return series.str.strip()
+
+def _split_text(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """Split a column into its string entries and a mask of where they are, without copying all-text columns."""
+    kind = pd.api.types.infer_dtype(series, skipna=True)
+    if kind == "string":
+        return series, series.notna()
+    if kind not in TEXT_KINDS:
+        return series.iloc[:0], pd.Series(False, index=series.index)
+    # .str methods return NaN for the entries that are not strings
+    is_text = series.str.len().notna()
+    return series[is_text], is_text
+
+def _coerce_numeric(series: pd.Series, fmt: str) -> pd.Series:
+    """Convert strings in the given number layout, and values that are already numbers, to floats."""
+    text, is_text = _split_text(series)
+    others = series[~is_text & series.notna()]
+    parsed = [pd.to_numeric(others, errors="coerce").astype(float)]
+    
+    # Plain integers need no validation. isdecimal (unlike isdigit) rejects
+    # superscripts and other digit signs that float() cannot read
+    plain = text.str.isdecimal().eq(True)
+    parsed.append(_to_float(text[plain]))
+    text = text[~plain]
+
+    # The rest is validated against the layout, then separators and currency are
+    # removed in a single translate pass, leaving valid float literals
+    if not text.empty:
+        valid = text.str.fullmatch(NUMBER_FORMATS[fmt]).eq(True)
+        parsed.append(_to_float(text[valid].str.translate(NUMBER_TRANSLATIONS[fmt])))
+    
+    parsed = [part for part in parsed if not part.empty]
+    if not parsed:
+        return pd.Series(np.nan, index=series.index)
+    return pd.concat(parsed).reindex(series.index)
+
+def _to_float(text: pd.Series) -> pd.Series:
+    """Cast validated number strings to floats; any string that still fails becomes missing."""
+    try:
+        # numpy's float cast is much faster than to_numeric
+        return text.astype(float)
+    except ValueError:
+        return pd.to_numeric(text, errors="coerce").astype(float)
+
+def _coerce_dates(series: pd.Series, formats: List[str]) -> pd.Series:
+    """Convert strings in the given date layouts, and values that are already dates, to timestamps."""
+    text, is_text = _split_text(series)
+    dates = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+    
+    others = series[~is_text & series.notna()]
+    if not others.empty:
+        others = others[others.map(_is_date_like).astype(bool)]
+        dates = dates.fillna(pd.to_datetime(others, errors="coerce").reindex(series.index))
+    
+    # Each layout only sees the values the previous layouts could not parse;
+    # padded values get a second try once stripped
+    remaining = text.dropna()
+    for attempt in range(2):
+        for fmt in formats:
+            if remaining.empty:
+                break
+            candidates = remaining
+            if fmt == MONTH_NAME_FORMAT:
+                # Python lowercases "İ" to "i" plus a combining dot, which month names do not contain
+                candidates = candidates.str.lower().str.replace("i\u0307", "i", regex=False)
+                candidates = candidates.str.replace(
+                    MONTH_PATTERN, lambda match: f" {AZ_MONTHS[match.group(1)]:02d} ", regex=True
+                ).str.strip()
+                fmt = "%d %m %Y"
+            parsed = pd.to_datetime(candidates, format=fmt, errors="coerce")
+            dates = dates.fillna(parsed.reindex(series.index))
+            remaining = remaining[parsed.isna()]
+        if attempt == 0:
+            remaining = remaining.str.strip()
+            remaining = remaining[remaining.ne("")]
+    
+    return dates
+
+def _is_date_like(value: Any) -> bool:
+    """Check whether a non-string cell value already holds a date."""
+    return isinstance(value, (pd.Timestamp, np.datetime64)) or hasattr(value, "year")
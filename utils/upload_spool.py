@@ -0,0 +1,107 @@
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO
+from config.settings import TEMP_DIR, SPOOL_MAX_MEMORY
+
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+class MappedUpload(io.RawIOBase):
+    """
+    Read-only, seekable view of an upload spooled to disk.
+    
+    Reads are served from a memory map of the spool file, so the operating
+    system pages the file in on demand instead of the process holding a copy of
+    every byte. Closing the object unmaps and deletes the spool file.
+    """
+    
+    def __init__(self, path: Path):
+        super().__init__()
+        self.name = str(path)
+        self._handle = open(path, "rb")
+        self._map = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._position = 0
+    
+    @property
+    def size(self) -> int:
+        """Size of the upload in bytes."""
+        return len(self._map)
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer: Any) -> int:
+        view = memoryview(buffer).cast("B")
+        count = max(0, min(len(view), len(self._map) - self._position))
+        view[:count] = self._map[self._position:self._position + count]
+        self._position += count
+        return count
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._map) + offset
+        else:
+            raise ValueError(f"Yanlış whence dəyəri: {whence}")
+        if position < 0:
+            raise ValueError("Mənfi mövqe")
+        self._position = position
+        return position
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._handle.close()
+            Path(self.name).unlink(missing_ok=True)
+        super().close()
+
+def spool_upload(file: Any, max_memory: int = SPOOL_MAX_MEMORY,
+                 spool_dir: Path = TEMP_DIR) -> BinaryIO:
+    """
+    Copy an uploaded file into a private buffer the parser can own.
+    
+    Uploads up to `max_memory` bytes are kept in memory; larger ones are copied
+    into `spool_dir` in fixed-size chunks and read back through a memory map.
+    Close the returned object as soon as parsing finishes to release the
+    buffer and delete the spool file.
+    
+    Args:
+        file: Uploaded file object from Streamlit or any binary file-like object
+        max_memory: Largest upload kept in memory, in bytes
+        spool_dir: Directory for spool files
+    
+    Returns:
+        BinaryIO: Seekable binary file positioned at the start
+    """
+    size = file.size if hasattr(file, "size") else file.seek(0, os.SEEK_END)
+    file.seek(0)
+    
+    if size <= max_memory:
+        buffer = io.BytesIO(file.read())
+        file.seek(0)
+        return buffer
+    
+    with tempfile.NamedTemporaryFile(dir=spool_dir, prefix="upload-", suffix=".spool",
+                                     delete=False) as handle:
+        try:
+            shutil.copyfileobj(file, handle, SPOOL_CHUNK_SIZE)
+        except BaseException:
+            handle.close()
+            Path(handle.name).unlink(missing_ok=True)
+            raise
+        finally:
+            file.seek(0)
+    
+    return MappedUpload(Path(handle.name))
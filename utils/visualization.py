@@ -3,7 +3,14 @@ import plotly.express as px
 import plotly.graph_objects as go
 from typing import List, Optional
 import numpy as np
+from config.settings import CHART_TOP_K
+from .result_cache import memoize
+from .profiling import suggest_bin_count
+from .heavy_hitters import column_top_values, group_long_tail, top_k_frame
+from .aggregate_cube import get_cube
+from .correlation import strongest_relationships
 
+@memoize
 def create_visualization(df: pd.DataFrame, query: str) -> go.Figure:
     """
     Create appropriate visualization based on the query and data.
@@ -43,6 +50,7 @@ def create_histogram(df: pd.DataFrame, query: str) -> go.Figure:
     fig = px.histogram(
         df,
         x=column,
+        nbins=suggest_bin_count(df, column),
         title=f"{column} sütununun paylanması",
         labels={column: column},
         template="plotly_white"
@@ -88,7 +96,7 @@ def create_line_plot(df: pd.DataFrame, query: str) -> go.Figure:
 def create_bar_plot(df: pd.DataFrame, query: str) -> go.Figure:
     """Create bar plot."""
     # Try to find categorical and numeric columns
-    categorical_columns = df.select_dtypes(include=['object']).columns
+    categorical_columns = df.select_dtypes(include=['object', 'category']).columns
     numeric_columns = df.select_dtypes(include=[np.number]).columns
     
     if len(categorical_columns) == 0 or len(numeric_columns) == 0:
@@ -97,8 +105,15 @@ def create_bar_plot(df: pd.DataFrame, query: str) -> go.Figure:
     category_column = categorical_columns[0]
     value_column = numeric_columns[0]
     
-    # Group by category and calculate mean
-    grouped_df = df.groupby(category_column)[value_column].mean().reset_index()
+    # Group by category and calculate mean; categories outside the top ones share one bar
+    cube = get_cube(df)
+    if category_column in cube:
+        grouped_df = cube.breakdown(category_column, [value_column], stats=("mean",),
+                                    top_k=CHART_TOP_K).drop(columns="rows")
+    else:
+        top_categories = [value for value, _ in column_top_values(df, category_column)["values"]]
+        categories = group_long_tail(df[category_column], top_categories)
+        grouped_df = df[value_column].groupby(categories, observed=True).mean().reset_index()
     
     fig = px.bar(
         grouped_df,
@@ -120,16 +135,15 @@ def create_bar_plot(df: pd.DataFrame, query: str) -> go.Figure:
 
 def create_pie_chart(df: pd.DataFrame, query: str) -> go.Figure:
     """Create pie chart."""
-    categorical_columns = df.select_dtypes(include=['object']).columns
+    categorical_columns = df.select_dtypes(include=['object', 'category']).columns
     
     if len(categorical_columns) == 0:
         raise ValueError("Pasta diaqramı üçün kateqoriyal sütunlar tələb olunur")
     
     column = categorical_columns[0]
     
-    # Count values
-    value_counts = df[column].value_counts().reset_index()
-    value_counts.columns = [column, 'count']
+    # Count the most frequent values; the long tail is one "Digər" slice
+    value_counts = top_k_frame(df, column)
     
     fig = px.pie(
         value_counts,
@@ -147,14 +161,18 @@ def create_pie_chart(df: pd.DataFrame, query: str) -> go.Figure:
     return fig
 
 def create_scatter_plot(df: pd.DataFrame, query: str) -> go.Figure:
-    """Create scatter plot."""
+    """Create scatter plot of the most strongly correlated pair of numeric columns."""
     numeric_columns = df.select_dtypes(include=[np.number]).columns
     
     if len(numeric_columns) < 2:
         raise ValueError("Nöqtəli qrafik üçün ən azı iki rəqəmsal sütun tələb olunur")
     
-    x_column = numeric_columns[0]
-    y_column = numeric_columns[1]
+    strongest = strongest_relationships(df, top_n=1)
+    if strongest:
+        x_column, y_column = strongest[0]["x"], strongest[0]["y"]
+    else:
+        x_column = numeric_columns[0]
+        y_column = numeric_columns[1]
     
     fig = px.scatter(
         df,
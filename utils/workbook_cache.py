@@ -0,0 +1,244 @@
+import hashlib
+import json
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.settings import UPLOAD_DIR, CACHE_TTL, MAX_CACHE_SIZE
+
+CACHE_FORMAT_VERSION = 4
+HASH_CHUNK_SIZE = 1024 * 1024
+META_FILE = "meta.json"
+
+def compute_file_hash(file: Any) -> str:
+    """
+    Compute a content hash of an uploaded file without changing its position.
+    
+    Args:
+        file: File path or binary file-like object
+    
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    
+    if hasattr(file, "read"):
+        position = file.tell()
+        file.seek(0)
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        file.seek(position)
+    else:
+        with open(file, "rb") as handle:
+            for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    
+    return digest.hexdigest()
+
+def make_cache_key(file_hash: str, **options: Any) -> str:
+    """
+    Build a cache key from the file hash and the parse options that affect the result.
+    
+    Args:
+        file_hash: Content hash from `compute_file_hash`
+        **options: Parse options (sheet name, engine, ...)
+    
+    Returns:
+        str: Cache key usable as a directory name
+    """
+    payload = json.dumps({"hash": file_hash, "version": CACHE_FORMAT_VERSION, **options},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_cached_frame(key: str, cache_dir: Path = UPLOAD_DIR,
+                      ttl: int = CACHE_TTL) -> Optional[pd.DataFrame]:
+    """
+    Load a previously parsed DataFrame from the cache.
+    
+    Numeric columns are memory-mapped `.npy` files, so a hit costs little more
+    than reading the column files from disk.
+    
+    Args:
+        key: Cache key from `make_cache_key`
+        cache_dir: Directory holding cache entries
+        ttl: Seconds after the last access at which an entry expires
+    
+    Returns:
+        Optional[pd.DataFrame]: Cached DataFrame, or None on a miss
+    """
+    entry = Path(cache_dir) / key
+    meta_path = entry / META_FILE
+    if not meta_path.exists():
+        return None
+    
+    if time.time() - meta_path.stat().st_mtime > ttl:
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+    
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        data = {
+            spec["name"]: _load_column(entry, idx, spec)
+            for idx, spec in enumerate(meta["columns"])
+        }
+        df = pd.DataFrame(data, columns=[spec["name"] for spec in meta["columns"]])
+        df.attrs.update(meta.get("attrs", {}))
+    except (OSError, ValueError, KeyError):
+        # A corrupt entry is treated as a miss and rebuilt by the caller
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+    
+    # Touch the entry so eviction is least-recently-used
+    meta_path.touch()
+    return df
+
+def save_cached_frame(key: str, df: pd.DataFrame, cache_dir: Path = UPLOAD_DIR,
+                      ttl: int = CACHE_TTL, max_entries: int = MAX_CACHE_SIZE) -> None:
+    """
+    Store a parsed DataFrame in the cache as one binary file per column.
+
+    Nothing is pickled, so loading an entry never runs code. Frames with a
+    column that cannot be stored that way (an object column holding anything
+    but strings, a time zone pandas cannot name, ...) are not cached.
+
+    Args:
+        key: Cache key from `make_cache_key`
+        df: Parsed DataFrame
+        cache_dir: Directory holding cache entries
+        ttl: Seconds after the last access at which an entry expires
+        max_entries: Maximum number of entries kept after eviction
+    """
+    cache_dir = Path(cache_dir)
+    entry = cache_dir / key
+    if (entry / META_FILE).exists():
+        return
+    
+    # Write into a private directory first so readers never see a partial entry
+    staging = cache_dir / f".{key}.{uuid.uuid4().hex}"
+    staging.mkdir(parents=True)
+    try:
+        columns = [_save_column(staging, idx, name, df[name])
+                   for idx, name in enumerate(df.columns)]
+        meta = {
+            "version": CACHE_FORMAT_VERSION,
+            "rows": len(df),
+            "columns": columns,
+            "attrs": _json_safe(df.attrs)
+        }
+        (staging / META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+        staging.rename(entry)
+    except (OSError, TypeError, ValueError):
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    
+    prune_cache(cache_dir, ttl=ttl, max_entries=max_entries)
+
+def prune_cache(cache_dir: Path = UPLOAD_DIR, ttl: int = CACHE_TTL,
+                max_entries: int = MAX_CACHE_SIZE) -> int:
+    """
+    Remove expired entries, then the least recently used ones above `max_entries`.
+    
+    Args:
+        cache_dir: Directory holding cache entries
+        ttl: Seconds after the last access at which an entry expires
+        max_entries: Maximum number of entries to keep
+    
+    Returns:
+        int: Number of removed entries
+    """
+    now = time.time()
+    entries = []
+    removed = 0
+    
+    for meta_path in Path(cache_dir).glob(f"*/{META_FILE}"):
+        try:
+            accessed = meta_path.stat().st_mtime
+        except OSError:
+            continue
+        if now - accessed > ttl:
+            shutil.rmtree(meta_path.parent, ignore_errors=True)
+            removed += 1
+        else:
+            entries.append((accessed, meta_path.parent))
+    
+    entries.sort()
+    for _, entry in entries[:max(0, len(entries) - max_entries)]:
+        shutil.rmtree(entry, ignore_errors=True)
+        removed += 1
+    
+    return removed
+
+def _save_column(entry: Path, idx: int, name: str, series: pd.Series) -> Dict[str, Any]:
+    """Write one column to `.npy` files and return its metadata."""
+    spec = {"name": name, "dtype": str(series.dtype)}
+    
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        spec["kind"] = "category"
+        spec["categories"] = series.cat.categories.tolist()
+        np.save(entry / f"{idx}.npy", series.cat.codes.to_numpy())
+    elif isinstance(series.dtype, pd.api.extensions.ExtensionDtype) and pd.api.types.is_numeric_dtype(series):
+        # Nullable Int*/Float*/boolean: values plus a missing-value mask
+        spec["kind"] = "masked"
+        mask = series.isna().to_numpy()
+        np.save(entry / f"{idx}.npy", series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0))
+        np.save(entry / f"{idx}.mask.npy", mask)
+    elif series.dtype == object:
+        # Text is stored as one UTF-8 buffer with the character offsets of the
+        # values and a missing-value mask
+        spec["kind"] = "text"
+        mask = series.isna().to_numpy()
+        strings = series.to_numpy()[~mask]
+        if not all(type(value) is str for value in strings):
+            raise TypeError(f"'{name}' sütununda mətn olmayan obyektlər var")
+        offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, strings), dtype=np.int64, count=len(strings)), out=offsets[1:])
+        text = "".join(strings).encode("utf-8", "surrogatepass")
+        np.save(entry / f"{idx}.npy", np.frombuffer(text, dtype=np.uint8))
+        np.save(entry / f"{idx}.offsets.npy", offsets)
+        np.save(entry / f"{idx}.mask.npy", mask)
+    elif isinstance(series.dtype, pd.DatetimeTZDtype):
+        # Time zone aware dates: UTC datetime64 values, converted back with the zone in `dtype`
+        if pd.api.types.pandas_dtype(spec["dtype"]) != series.dtype:
+            raise TypeError(f"'{name}' sütununun saat qurşağı saxlanıla bilmir")
+        spec["kind"] = "datetime_tz"
+        np.save(entry / f"{idx}.npy", series.dt.tz_convert(None).to_numpy(), allow_pickle=False)
+    else:
+        spec["kind"] = "plain"
+        # Anything that would need pickling (e.g. Period or Interval values) raises instead
+        np.save(entry / f"{idx}.npy", series.to_numpy(), allow_pickle=False)
+    
+    return spec
+
+def _load_column(entry: Path, idx: int, spec: Dict[str, Any]) -> Any:
+    """Read one column written by `_save_column`."""
+    kind = spec["kind"]
+    
+    if kind == "category":
+        codes = np.load(entry / f"{idx}.npy")
+        return pd.Categorical.from_codes(codes, categories=spec["categories"])
+    if kind == "masked":
+        values = pd.array(np.load(entry / f"{idx}.npy"), dtype=spec["dtype"])
+        values[np.load(entry / f"{idx}.mask.npy")] = pd.NA
+        return values
+    if kind == "text":
+        text = np.load(entry / f"{idx}.npy").tobytes().decode("utf-8", "surrogatepass")
+        offsets = np.load(entry / f"{idx}.offsets.npy")
+        mask = np.load(entry / f"{idx}.mask.npy")
+        values = np.full(len(mask), None, dtype=object)
+        values[~mask] = [text[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+        return values
+    if kind == "datetime_tz":
+        dtype = pd.api.types.pandas_dtype(spec["dtype"])
+        return pd.DatetimeIndex(np.load(entry / f"{idx}.npy")).tz_localize("UTC").tz_convert(dtype.tz).array
+    if kind != "plain":
+        raise ValueError(f"Naməlum sütun növü: {kind}")
+    return np.load(entry / f"{idx}.npy", mmap_mode="r")
+
+def _json_safe(attrs: Dict[str, Any]) -> Dict[str, Any]:
+    """Round-trip DataFrame attrs through JSON, stringifying unsupported values."""
+    return json.loads(json.dumps(attrs, default=str))
@@ -0,0 +1,293 @@
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, CALENDAR_WINDOWS_1900, CALENDAR_MAC_1904
+
+MAIN_NAMESPACES = (
+    "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "http://purl.oclc.org/ooxml/spreadsheetml/main"
+)
+REL_NAMESPACES = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "http://purl.oclc.org/ooxml/officeDocument/relationships"
+)
+PACKAGE_REL_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+def list_xlsx_sheets(file: Any) -> List[str]:
+    """
+    List the sheet names of an .xlsx workbook by reading only `xl/workbook.xml`.
+    
+    Args:
+        file: File path or binary file-like object of an .xlsx workbook
+    
+    Returns:
+        List of sheet names in workbook order
+    """
+    with zipfile.ZipFile(file) as archive:
+        return [name for name, _ in _read_sheet_index(archive)]
+
+def inspect_xlsx_archive(file: Any) -> Dict[str, Any]:
+    """
+    Describe an .xlsx workbook from its zip directory and sheet headers only.
+    
+    Sizes come from the zip central directory and sheet extents from the
+    `<dimension>` tag at the top of each sheet part, so no cell is parsed and
+    only the first few kilobytes of each sheet are decompressed.
+    
+    Args:
+        file: File path or binary file-like object of an .xlsx workbook
+    
+    Returns:
+        Dict with the total uncompressed size, the shared-strings size and a
+        list of sheets with their dimension, rows, columns and part sizes.
+        Rows and columns are None when a sheet has no `<dimension>` tag or
+        one naming a single cell, which many writers emit whatever the size
+        of the sheet.
+    """
+    with zipfile.ZipFile(file) as archive:
+        members = {info.filename: info for info in archive.infolist()}
+        shared_strings = members.get("xl/sharedStrings.xml")
+        sheets = []
+        for name, path in _read_sheet_index(archive):
+            info = members.get(path)
+            if info is None:
+                continue
+            ref = _read_dimension(archive, path)
+            rows, columns = _dimension_size(ref) if ref and ":" in ref else (None, None)
+            sheets.append({
+                "name": name,
+                "dimension": ref,
+                "rows": rows,
+                "columns": columns,
+                "compressed_size": info.compress_size,
+                "uncompressed_size": info.file_size
+            })
+    
+    return {
+        "uncompressed_size": sum(info.file_size for info in members.values()),
+        "shared_strings_size": shared_strings.file_size if shared_strings else 0,
+        "sheets": sheets
+    }
+
+def iter_xlsx_rows(file: Any, sheet_name: Optional[str] = None) -> Iterator[List[Any]]:
+    """
+    Stream the rows of an .xlsx sheet without building openpyxl cell objects.
+    
+    The zip archive is opened directly, the shared-strings table is parsed once
+    and the sheet XML is read incrementally with `iterparse`, clearing every row
+    element as soon as its values are extracted. Cell values are converted the
+    same way openpyxl's values-only mode converts them.
+    
+    Args:
+        file: File path or binary file-like object of an .xlsx workbook
+        sheet_name: Sheet to read; the first sheet is used by default
+    
+    Yields:
+        List of cell values for each row, starting with the header row. Rows
+        that are missing from the XML are yielded as empty lists.
+    
+    Raises:
+        ValueError: If the sheet does not exist
+    """
+    with zipfile.ZipFile(file) as archive:
+        sheets = _read_sheet_index(archive)
+        if not sheets:
+            raise ValueError("İş kitabında vərəq tapılmadı")
+        if sheet_name is None:
+            sheet_path = sheets[0][1]
+        else:
+            paths = dict(sheets)
+            if sheet_name not in paths:
+                raise ValueError(f"'{sheet_name}' vərəqi tapılmadı")
+            sheet_path = paths[sheet_name]
+        
+        shared_strings = _read_shared_strings(archive)
+        date_styles, timedelta_styles = _read_date_styles(archive)
+        epoch = CALENDAR_MAC_1904 if _uses_1904_dates(archive) else CALENDAR_WINDOWS_1900
+        
+        with archive.open(sheet_path) as sheet_xml:
+            yield from _iter_sheet_rows(sheet_xml, shared_strings, date_styles, timedelta_styles, epoch)
+
+def _iter_sheet_rows(sheet_xml: Any, shared_strings: List[str], date_styles: Set[str],
+                     timedelta_styles: Set[str], epoch: datetime) -> Iterator[List[Any]]:
+    """Parse `<row>` elements of a worksheet part into lists of values."""
+    row_tags = {f"{{{ns}}}row" for ns in MAIN_NAMESPACES}
+    data_tags = {f"{{{ns}}}sheetData" for ns in MAIN_NAMESPACES}
+    column_cache: Dict[str, int] = {}
+    sheet_data = None
+    ns = None
+    next_row = 1
+    
+    for event, elem in ET.iterparse(sheet_xml, events=("start", "end")):
+        if event == "start":
+            if sheet_data is None and elem.tag in data_tags:
+                sheet_data = elem
+                ns = elem.tag[:elem.tag.index("}") + 1]
+                value_tag, inline_tag, text_tag = f"{ns}v", f"{ns}is", f"{ns}t"
+            continue
+        if elem.tag not in row_tags:
+            continue
+        
+        row_number = int(elem.get("r", next_row))
+        while next_row < row_number:
+            yield []
+            next_row += 1
+        next_row = row_number + 1
+        
+        values: List[Any] = []
+        for cell in elem:
+            ref = cell.get("r")
+            if ref is not None:
+                letters = ref.rstrip("0123456789")
+                column = column_cache.get(letters)
+                if column is None:
+                    column = column_cache[letters] = _column_index(letters)
+                if column > len(values):
+                    values.extend([None] * (column - len(values)))
+            
+            cell_type = cell.get("t", "n")
+            value = None
+            if cell_type == "inlineStr":
+                inline = cell.find(inline_tag)
+                if inline is not None:
+                    value = "".join(text.text or "" for text in inline.iter(text_tag))
+            else:
+                raw = cell.findtext(value_tag)
+                if raw:
+                    if cell_type == "n":
+                        value = float(raw) if "." in raw or "E" in raw or "e" in raw else int(raw)
+                        style = cell.get("s")
+                        if style in date_styles:
+                            try:
+                                value = from_excel(value, epoch, timedelta=style in timedelta_styles)
+                            except (OverflowError, ValueError):
+                                value = "#VALUE!"
+                    elif cell_type == "s":
+                        value = shared_strings[int(raw)]
+                    elif cell_type == "b":
+                        value = bool(int(raw))
+                    elif cell_type == "d":
+                        value = datetime.fromisoformat(raw.rstrip("Z"))
+                    else:
+                        # "str" (cached formula result) and "e" (error) keep the text
+                        value = raw
+            values.append(value)
+        
+        # Drop the parsed row so memory stays flat regardless of sheet size
+        elem.clear()
+        if sheet_data is not None:
+            sheet_data.clear()
+        yield values
+
+def _read_sheet_index(archive: zipfile.ZipFile) -> List[Tuple[str, str]]:
+    """Return (sheet name, part path) pairs from the workbook part and its relationships."""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {
+        rel.get("Id"): rel.get("Target")
+        for rel in rels.iter(f"{{{PACKAGE_REL_NAMESPACE}}}Relationship")
+    }
+    
+    sheets = []
+    for ns in MAIN_NAMESPACES:
+        for sheet in workbook.iter(f"{{{ns}}}sheet"):
+            rel_id = next((sheet.get(f"{{{rel_ns}}}id") for rel_ns in REL_NAMESPACES
+                           if sheet.get(f"{{{rel_ns}}}id")), None)
+            target = targets.get(rel_id)
+            if target is None:
+                continue
+            if target.startswith("/"):
+                path = target.lstrip("/")
+            else:
+                path = posixpath.normpath(posixpath.join("xl", target))
+            sheets.append((sheet.get("name"), path))
+    return sheets
+
+def _read_dimension(archive: zipfile.ZipFile, path: str) -> Optional[str]:
+    """Read the `<dimension ref>` of a sheet, stopping before any cell data."""
+    with archive.open(path) as sheet_xml:
+        for _, elem in ET.iterparse(sheet_xml, events=("start",)):
+            tag = elem.tag.rpartition("}")[2]
+            if tag == "dimension":
+                return elem.get("ref")
+            if tag == "sheetData":
+                return None
+    return None
+
+def _dimension_size(ref: str) -> Tuple[int, int]:
+    """Convert a dimension reference such as "A1:G100" to (rows, columns)."""
+    first, _, last = ref.upper().partition(":")
+    last = last or first
+    first_letters, last_letters = first.rstrip("0123456789"), last.rstrip("0123456789")
+    first_row = int(first[len(first_letters):] or 1)
+    last_row = int(last[len(last_letters):] or first_row)
+    return (last_row - first_row + 1,
+            _column_index(last_letters) - _column_index(first_letters) + 1)
+
+def _read_shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    """Parse the shared-strings table once, ignoring phonetic runs."""
+    try:
+        part = archive.open("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    
+    strings = []
+    with part:
+        for _, elem in ET.iterparse(part, events=("end",)):
+            if not elem.tag.endswith("}si"):
+                continue
+            ns = elem.tag[:-2]
+            text_tag, run_tag = f"{ns}t", f"{ns}r"
+            parts = []
+            for child in elem:
+                if child.tag == text_tag:
+                    parts.append(child.text or "")
+                elif child.tag == run_tag:
+                    parts.extend(text.text or "" for text in child.iter(text_tag))
+            strings.append("".join(parts))
+            elem.clear()
+    return strings
+
+def _read_date_styles(archive: zipfile.ZipFile) -> Tuple[Set[str], Set[str]]:
+    """Return the cell style indexes that format numbers as dates and as durations."""
+    try:
+        styles = ET.fromstring(archive.read("xl/styles.xml"))
+    except KeyError:
+        return set(), set()
+    
+    ns = styles.tag[:styles.tag.index("}") + 1] if styles.tag.startswith("{") else ""
+    formats = dict(BUILTIN_FORMATS)
+    for num_fmt in styles.iter(f"{ns}numFmt"):
+        formats[int(num_fmt.get("numFmtId"))] = num_fmt.get("formatCode", "")
+    
+    date_styles, timedelta_styles = set(), set()
+    cell_xfs = styles.find(f"{ns}cellXfs")
+    if cell_xfs is None:
+        return date_styles, timedelta_styles
+    for idx, xf in enumerate(cell_xfs.iter(f"{ns}xf")):
+        code = formats.get(int(xf.get("numFmtId", 0)))
+        if code and is_date_format(code):
+            # Kept as strings so cells can be matched on their raw `s` attribute
+            date_styles.add(str(idx))
+            if is_timedelta_format(code):
+                timedelta_styles.add(str(idx))
+    return date_styles, timedelta_styles
+
+def _uses_1904_dates(archive: zipfile.ZipFile) -> bool:
+    """Check the workbook properties for the 1904 date system."""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    for ns in MAIN_NAMESPACES:
+        properties = workbook.find(f"{{{ns}}}workbookPr")
+        if properties is not None:
+            return properties.get("date1904", "0").lower() in ("1", "true")
+    return False
+
+def _column_index(letters: str) -> int:
+    """Convert column letters (A, B, ..., AA) to a zero-based index."""
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter.upper()) - 64
+    return index - 1